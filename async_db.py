@@ -0,0 +1,63 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from supabase_client import SupabaseDB
+from metrics import DB_CALL_DURATION, DB_CALL_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Threads serving slash commands and button callbacks
+DB_COMMAND_WORKERS = int(os.environ.get('DB_COMMAND_WORKERS', '4'))
+# Threads reserved for the scrape/notify pipeline so command bursts cannot queue ahead of it
+DB_PIPELINE_WORKERS = int(os.environ.get('DB_PIPELINE_WORKERS', '2'))
+
+_command_executor = ThreadPoolExecutor(max_workers=DB_COMMAND_WORKERS, thread_name_prefix='supabase-cmd')
+_pipeline_executor = ThreadPoolExecutor(max_workers=DB_PIPELINE_WORKERS, thread_name_prefix='supabase-pipeline')
+
+
+class AsyncSupabaseDB:
+    """Awaitable view of SupabaseDB.
+
+    Every method of the wrapped SupabaseDB is exposed as a coroutine that runs
+    the blocking PostgREST call on a bounded thread pool, keeping the event
+    loop shared by both bots free while the HTTPS round trip is in flight.
+    """
+
+    def __init__(self, db: SupabaseDB, pipeline: bool = False):
+        self.db = db
+        self._executor = _pipeline_executor if pipeline else _command_executor
+        self._pool = 'pipeline' if pipeline else 'command'
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if not callable(method):
+            return method
+
+        pool = self._pool
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+            except Exception:
+                # Failures the method answers with a fallback value are counted where it catches them
+                DB_CALL_ERRORS.inc(method=name)
+                raise
+            finally:
+                # Includes time queued for a worker thread, which is what the caller waits for
+                DB_CALL_DURATION.observe(time.perf_counter() - start, method=name, pool=pool)
+
+        # Cache so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+def shutdown_executors():
+    _command_executor.shutdown(wait=False, cancel_futures=True)
+    _pipeline_executor.shutdown(wait=False, cancel_futures=True)
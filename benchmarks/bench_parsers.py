@@ -0,0 +1,94 @@
+"""Compare the parsers module against the previous inline parsing on large payloads.
+
+Run from the repository root: python benchmarks/bench_parsers.py [--events N] [--shows N]
+"""
+import os
+import re
+import sys
+import json
+import html
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsers  # noqa: E402
+
+
+def make_jsonp(events: int) -> bytes:
+    rows = [
+        {
+            'id': str(100000 + i),
+            'name': f"Event {i} &amp; Friends",
+            'date': '2024-06-01 19:30:00',
+            'venue': 'Some Showroom',
+            'description': 'x' * 200,
+        }
+        for i in range(events)
+    ]
+    return b'getEventsSelect_cb(' + json.dumps(rows).encode() + b')'
+
+
+def make_listing(shows: int) -> str:
+    block = '<div class="panel"><h1><a href="./tickets/view/?showid={id}">{name}</a></h1>' + '<p>filler</p>' * 20 + '</div>\n'
+    # Roughly one title in ten carries an HTML entity
+    return ''.join(
+        block.format(id=i, name=f"Show {i} &amp; More" if i % 10 == 0 else f"Show {i}")
+        for i in range(shows)
+    )
+
+
+def old_events(body: bytes):
+    text = body.decode('utf-8')
+    if "login.php" in text or 'type="password"' in text.lower():
+        raise AssertionError
+    match = re.search(r'getEventsSelect_cb\((.*)\)', text, re.DOTALL)
+    return json.loads(match.group(1))
+
+
+def new_events(body: bytes):
+    if parsers.looks_like_login_page(body):
+        raise AssertionError
+    return parsers.parse_fillaseat_events(body)
+
+
+def old_shows(text: str):
+    pattern = r'<h1><a href="./tickets/view/\?showid=(\d+)">(.*?)</a></h1>'
+    return [(show_id, html.unescape(name.strip())) for show_id, name in re.findall(pattern, text)]
+
+
+def timed(func, payload, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--shows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    body = make_jsonp(args.events)
+    listing = make_listing(args.shows)
+    assert old_events(body) == new_events(body)
+    assert old_shows(listing) == parsers.parse_houseseats_shows(listing)
+
+    decoder = 'orjson' if parsers.orjson is not None else 'json'
+    print(f"JSON decoder: {decoder}")
+    for name, old, new, payload in (
+        ('FillASeat JSONP', old_events, new_events, body),
+        ('HouseSeats listing', old_shows, parsers.parse_houseseats_shows, listing),
+    ):
+        old_time = timed(old, payload, args.repeat)
+        new_time = timed(new, payload, args.repeat)
+        size = len(payload) / 1e6
+        print(f"{name} ({size:.1f} MB): old {old_time * 1000:.1f} ms, new {new_time * 1000:.1f} ms, {old_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
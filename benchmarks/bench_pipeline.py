@@ -0,0 +1,389 @@
+"""End-to-end benchmark of both bots against local fakes, with no network access.
+
+Each scenario starts a fake Discord guild with the given number of members,
+runs the real SourceEngine for each site against the fake ticket sites and
+a fake Supabase, drops the given number of new shows at a random point
+between two polls and records:
+
+  - cycle time of an unchanged listing and of the cycle that finds the drop
+  - detection latency from the drop to the listing fetch that saw it, the
+    commit, the channel posts and the first and last DM
+  - DM fan-out throughput under Discord's rate limits
+
+Results are written as a JSON baseline; pass --compare with an earlier
+baseline to print the change per scenario.
+
+Run from the repository root:
+  python benchmarks/bench_pipeline.py [--members 10 100 1000 10000] [--shows 1 10 50]
+      [--platforms houseseats fillaseat] [--output benchmarks/baseline.json] [--compare OLD.json]
+
+Large member counts take minutes per scenario, as the fake Discord paces
+DMs like the real one.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform as host_platform
+import statistics
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeTicketSite, FakePostgREST, FakeDiscord  # noqa: E402
+
+TOKENS = {'houseseats': 'bench-houseseats-token', 'fillaseat': 'bench-fillaseat-token'}
+# Any JWT-shaped string passes supabase-py's key check
+SERVICE_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.benchmark'
+
+
+def configure_environment(workdir: str, supabase_url: str, channel_id: str):
+    """Point the bots' configuration at the fakes; must run before the bot modules are imported"""
+    os.environ.update({
+        'SUPABASE_URL': supabase_url,
+        'SUPABASE_SERVICE_KEY': SERVICE_KEY,
+        'HOUSESEATS_DISCORD_BOT_TOKEN': TOKENS['houseseats'],
+        'FILLASEAT_DISCORD_BOT_TOKEN': TOKENS['fillaseat'],
+        'HOUSESEATS_DISCORD_CHANNEL_ID': channel_id,
+        'FILLASEAT_DISCORD_CHANNEL_ID': channel_id,
+        'MEDIA_CACHE_DIR': os.path.join(workdir, 'media'),
+        'DROP_TRACE_PATH': os.path.join(workdir, 'drop_traces.jsonl'),
+        'OUTBOX_PATH': os.path.join(workdir, 'outbox.sqlite3'),
+        'HOUSESEATS_EMAIL': 'bench@example.com',
+        'HOUSESEATS_PASSWORD': 'bench',
+        'FILLASEAT_USERNAME': 'bench',
+        'FILLASEAT_PASSWORD': 'bench',
+    })
+    for name in ('HOUSESEATS_PUSHOVER_API_TOKEN', 'FILLASEAT_PUSHOVER_API_TOKEN', 'PUSHOVER_USER_KEYS'):
+        os.environ.pop(name, None)
+
+
+def point_sources_at(site_url: str, workdir: str):
+    """Rewrite the sites' URL constants to the fake ticket site"""
+    import house_seats_bot
+    import fill_a_seat_bot
+
+    hs = f"{site_url}/hs/"
+    house_seats_bot.BASE_URL = hs
+    house_seats_bot.LOGIN_URL = f"{hs}member/index.bv"
+    house_seats_bot.BASE_IMG_URL = f"{hs}media/"
+    house_seats_bot.BASE_SHOW_URL = f"{hs}member/tickets/view/"
+    house_seats_bot.SHOWS_URL_TEMPLATE = f"{hs}member/ajax/upcoming-shows.bv?search=&start={{start}}"
+    house_seats_bot.SHOWS_URL = house_seats_bot.SHOWS_URL_TEMPLATE.format(start=0)
+    house_seats_bot.COOKIES_PATH = os.path.join(workdir, 'houseseats_cookies.json')
+
+    fas = f"{site_url}/fas/"
+    fill_a_seat_bot.BASE_URL = fas
+    fill_a_seat_bot.LOGIN_PAGE_URL = f"{fas}login2.php"
+    fill_a_seat_bot.LOGIN_ACTION_URL = f"{fas}login.php"
+    fill_a_seat_bot.DASHBOARD_URL = f"{fas}account/index.php"
+    fill_a_seat_bot.EVENTS_URL_TEMPLATE = f"{fas}account/event_json.php?callback=getEventsSelect_cb&_={{timestamp}}"
+    fill_a_seat_bot.EVENT_INFO_URL_TEMPLATE = f"{fas}account/event_info.php?eid={{event_id}}"
+    fill_a_seat_bot.EVENT_IMAGE_URL_TEMPLATE = f"{fas}images/{{event_id}}_std.jpg"
+    fill_a_seat_bot.COOKIES_PATH = os.path.join(workdir, 'fillaseat_cookies.json')
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {'median': round(statistics.median(values), 4), 'max': round(max(values), 4)}
+
+
+class Scenario:
+    """One bot engine in one guild, driven poll by poll instead of by its scheduler"""
+
+    def __init__(self, engine, site: FakeTicketSite, discord_fake: FakeDiscord, postgrest: FakePostgREST):
+        self.engine = engine
+        self.site = site
+        self.discord = discord_fake
+        self.postgrest = postgrest
+        self.traces = {}
+        self.fanouts = []
+        self._wrap_engine()
+
+    def _wrap_engine(self):
+        engine = self.engine
+        notify = engine.notify_users_about_new_shows
+        run_fanout = engine.dm_fanout.run
+
+        async def capture_notify(new_shows, traces=None):
+            self.traces.update(traces or {})
+            await notify(new_shows, traces)
+
+        async def capture_fanout(deliveries, **callbacks):
+            result = await run_fanout(deliveries, **callbacks)
+            self.fanouts.append(result)
+            return result
+
+        engine.notify_users_about_new_shows = capture_notify
+        engine.dm_fanout.run = capture_fanout
+
+    async def timed_cycle(self) -> float:
+        start = time.perf_counter()
+        await self.engine.scrape_and_process()
+        return time.perf_counter() - start
+
+    async def settle(self):
+        while self.engine.background_tasks:
+            await asyncio.gather(*list(self.engine.background_tasks), return_exceptions=True)
+
+    async def baseline(self, listed: int):
+        """Publish the standing listing and commit it without notifying anyone"""
+        platform = self.engine.source.platform
+        self.site.add_shows(platform, listed, at=0)
+        marks = {}
+        shows = await self.engine.fetch_shows(marks)
+        await self.engine.commit_shows(shows or {})
+        self.engine.source.fingerprint.commit()
+
+    async def unchanged_cycles(self, cycles: int):
+        return [await self.timed_cycle() for _ in range(cycles)]
+
+    async def drop(self, new_shows: int, poll_interval: float, timeout: float):
+        """Drop shows between two polls, poll until they are found and wait for the notifications"""
+        platform = self.engine.source.platform
+        self.traces.clear()
+        self.fanouts.clear()
+        requests_before = sum(self.discord.requests.values())
+        limited_before = dict(self.discord.rate_limited)
+        db_before = sum(self.postgrest.requests.values())
+
+        published_at = time.time() + random.uniform(0, poll_interval)
+        show_ids = self.site.add_shows(platform, new_shows, at=published_at)
+        detect_cycle = None
+        deadline = time.monotonic() + timeout
+        while not self.traces and time.monotonic() < deadline:
+            next_poll = time.monotonic() + poll_interval
+            seconds = await self.timed_cycle()
+            if self.traces:
+                detect_cycle = seconds
+                break
+            await asyncio.sleep(max(0.0, next_poll - time.monotonic()))
+        await asyncio.wait_for(self.settle(), timeout)
+
+        traces = [self.traces[show_id] for show_id in show_ids if show_id in self.traces]
+        if len(traces) != len(show_ids):
+            raise RuntimeError(f"{platform}: detected {len(traces)} of {len(show_ids)} dropped shows")
+
+        def after_drop(stage, pick=max):
+            values = [trace.marks[stage] - published_at for trace in traces if stage in trace.marks]
+            return round(pick(values), 4) if values else None
+
+        fanout = self.fanouts[-1] if self.fanouts else None
+        return {
+            'cycle_s': round(detect_cycle, 4) if detect_cycle is not None else None,
+            'detection_s': {
+                # The listing request that saw the drop returned; the rest is the poll wait
+                'fetched': after_drop('fetched'),
+                'committed': after_drop('committed'),
+                'channel_posted_first': after_drop('channel_posted', min),
+                'channel_posted_last': after_drop('channel_posted'),
+                'dm_first': after_drop('dm_first', min),
+                'dm_last': after_drop('dm_last'),
+            },
+            'fanout': {
+                'recipients': fanout.recipients,
+                'sent': fanout.sent,
+                'failed': fanout.failed,
+                'forbidden': fanout.forbidden,
+                'rate_limited': fanout.rate_limited,
+                'elapsed_s': round(fanout.elapsed, 4),
+                'dms_per_s': round(fanout.send_rate, 2),
+            } if fanout is not None else None,
+            'discord_requests': sum(self.discord.requests.values()) - requests_before,
+            'discord_429s': {
+                scope: count - limited_before.get(scope, 0)
+                for scope, count in self.discord.rate_limited.items()
+                if count - limited_before.get(scope, 0)
+            },
+            'db_requests': sum(self.postgrest.requests.values()) - db_before,
+        }
+
+
+async def run_member_count(args, members: int, site, postgrest, db, sources):
+    from source_engine import SourceEngine
+
+    discord_fake = FakeDiscord(members, global_rate=args.discord_rate)
+    await discord_fake.start()
+    discord_fake.patch_pycord()
+    os.environ['HOUSESEATS_DISCORD_CHANNEL_ID'] = os.environ['FILLASEAT_DISCORD_CHANNEL_ID'] = discord_fake.channel_id
+
+    results = []
+    try:
+        for source_class in sources:
+            source = source_class()
+            platform = source.platform
+            engine = SourceEngine(source, db)
+            bot_task = asyncio.create_task(engine.start())
+            try:
+                ready = asyncio.create_task(engine.bot.wait_until_ready())
+                await asyncio.wait((ready, bot_task), timeout=args.timeout, return_when=asyncio.FIRST_COMPLETED)
+                if bot_task.done():
+                    ready.cancel()
+                    raise RuntimeError(f"{source.label} bot stopped before it was ready") from bot_task.exception()
+                if not ready.done():
+                    ready.cancel()
+                    raise TimeoutError(f"{source.label} bot was not ready after {args.timeout}s")
+                # Polls are driven below, not by the learned schedule
+                engine.scraping_task.cancel()
+                # The blacklist index and subscriber registry load themselves once the bot is ready
+                while not (engine.blacklist_index.loaded and engine.subscribers.loaded):
+                    await asyncio.sleep(0.05)
+                scenario = Scenario(engine, site, discord_fake, postgrest)
+                if not site.shows[platform]:
+                    await scenario.baseline(args.listed)
+
+                # Some members have blacklisted the first show of every upcoming drop
+                upcoming = site.next_ids(platform, sum(args.shows))
+                first_ids = [upcoming[sum(args.shows[:i])] for i in range(len(args.shows))]
+                blacklisted = random.sample(discord_fake.member_ids, int(members * args.blacklist_fraction))
+                postgrest.upsert(f'{platform}_user_blacklists', [
+                    {'user_id': int(user_id), 'show_id': show_id} for user_id in blacklisted for show_id in first_ids
+                ])
+                await engine.blacklist_index.load()
+
+                # Only subscribers are sent DMs; some of them have closed their DMs and are dropped after the first drop
+                subscribers = random.sample(discord_fake.member_ids, int(members * args.subscriber_fraction))
+                postgrest.upsert(f'{platform}_subscriptions', [{'user_id': int(user_id), 'status': 'active'} for user_id in subscribers])
+                discord_fake.closed_dms = set(random.sample(subscribers, int(len(subscribers) * args.closed_dm_fraction)))
+                await engine.subscribers.load()
+                unchanged = await scenario.unchanged_cycles(args.cycles)
+                for new_shows in args.shows:
+                    result = await scenario.drop(new_shows, args.poll_interval, args.timeout)
+                    result.update({
+                        'platform': platform,
+                        'members': members,
+                        'new_shows': new_shows,
+                        'listed_shows': len(site.listed(platform)),
+                        'cycle_unchanged_s': summarize(unchanged),
+                    })
+                    results.append(result)
+                    fanout = result['fanout'] or {}
+                    print(
+                        f"{source.label:>10} members={members:<6} new={new_shows:<3} "
+                        f"cycle={result['cycle_s']}s committed={result['detection_s']['committed']}s "
+                        f"last_dm={result['detection_s']['dm_last']}s dms/s={fanout.get('dms_per_s')}",
+                        flush=True
+                    )
+                    # The next drop must not be hidden by an unchanged-listing skip
+                    unchanged += await scenario.unchanged_cycles(1)
+            finally:
+                await engine.bot.close()
+                bot_task.cancel()
+                await asyncio.gather(bot_task, return_exceptions=True)
+    finally:
+        await discord_fake.stop()
+    return results
+
+
+def compare(results, baseline_path: str):
+    with open(baseline_path, encoding='utf-8') as f:
+        old = {
+            (row['platform'], row['members'], row['new_shows']): row
+            for row in json.load(f)['results']
+        }
+    print(f"\nChange against {baseline_path}:")
+    for row in results:
+        before = old.get((row['platform'], row['members'], row['new_shows']))
+        if before is None:
+            continue
+        changes = []
+        for name, new_value, old_value in (
+            ('cycle', row['cycle_s'], before['cycle_s']),
+            ('committed', row['detection_s']['committed'], before['detection_s']['committed']),
+            ('last DM', row['detection_s']['dm_last'], before['detection_s']['dm_last']),
+            ('DMs/s', (row['fanout'] or {}).get('dms_per_s'), (before['fanout'] or {}).get('dms_per_s')),
+        ):
+            if new_value is not None and old_value:
+                changes.append(f"{name} {(new_value - old_value) / old_value * 100:+.1f}%")
+        print(f"  {row['platform']:>10} members={row['members']:<6} new={row['new_shows']:<3} " + ', '.join(changes))
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix='ticketgenie-bench-')
+    site = FakeTicketSite(page_size=args.page_size, latency=args.site_latency / 1000)
+    postgrest = FakePostgREST(latency=args.db_latency / 1000)
+    site_url = await site.start()
+    supabase_url = await postgrest.start()
+    configure_environment(workdir, supabase_url, '0')
+
+    # Imported only now, as they read their configuration at import time
+    import http_client
+    import async_db
+    from supabase_client import SupabaseDB
+    from house_seats_bot import HouseSeatsSource
+    from fill_a_seat_bot import FillASeatSource
+
+    point_sources_at(site_url, workdir)
+    sources = [source for source in (HouseSeatsSource, FillASeatSource) if source.platform in args.platforms]
+    db = SupabaseDB()
+
+    results = []
+    try:
+        for members in args.members:
+            results += await run_member_count(args, members, site, postgrest, db, sources)
+    finally:
+        await http_client.close_all_clients()
+        await site.stop()
+        await postgrest.stop()
+        async_db.shutdown_executors()
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'machine': host_platform.platform(),
+        'config': {
+            key: getattr(args, key)
+            for key in (
+                'listed', 'page_size', 'poll_interval', 'cycles', 'site_latency', 'db_latency', 'discord_rate',
+                'blacklist_fraction', 'subscriber_fraction', 'closed_dm_fraction', 'seed'
+            )
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--members', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--shows', type=int, nargs='+', default=[1, 10, 50], help='New shows per drop')
+    parser.add_argument('--platforms', nargs='+', default=['houseseats', 'fillaseat'], choices=['houseseats', 'fillaseat'])
+    parser.add_argument('--listed', type=int, default=100, help='Shows already on each listing')
+    parser.add_argument('--page-size', type=int, default=0, help='HouseSeats shows per listing page, 0 for one page')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls while waiting for a drop')
+    parser.add_argument('--cycles', type=int, default=5, help='Unchanged-listing cycles timed per scenario')
+    parser.add_argument('--site-latency', type=float, default=100.0, help='Milliseconds added to every fake ticket site request')
+    parser.add_argument('--db-latency', type=float, default=20.0, help='Milliseconds added to every fake Supabase request')
+    parser.add_argument('--discord-rate', type=int, default=50, help='Fake Discord global requests per second per token')
+    parser.add_argument('--blacklist-fraction', type=float, default=0.1)
+    parser.add_argument('--subscriber-fraction', type=float, default=1.0, help='Members subscribed to DMs')
+    parser.add_argument('--closed-dm-fraction', type=float, default=0.0, help='Subscribers whose DMs are closed')
+    parser.add_argument('--timeout', type=float, default=1800.0, help='Seconds to wait for a bot or a drop')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'baseline.json'))
+    parser.add_argument('--compare', help='Earlier baseline to compare against')
+    parser.add_argument('--verbose', action='store_true', help='Show the bots\' own logging')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # py-cord warns on every 429 the fake Discord answers; they are counted in the results
+        logging.getLogger('discord').setLevel(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Compare the compiled watch-rule matcher against looping over every user's rules.
+
+Run from the repository root: python benchmarks/bench_watch_rules.py [--users N] [--rules N] [--shows N]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watch_rules import WatchRuleMatcher, WatchVerdict, INCLUDE, EXCLUDE, KEYWORD, REGEX  # noqa: E402
+
+WORDS = [
+    'magic', 'comedy', 'improv', 'cirque', 'tribute', 'elvis', 'country', 'jazz', 'hypnosis', 'burlesque',
+    'drag', 'piano', 'rock', 'tenors', 'illusion', 'mentalist', 'acrobat', 'beatles', 'queen', 'legends',
+    'variety', 'cabaret', 'dance', 'opera', 'blues', 'ventriloquist', 'juggler', 'circus', 'family', 'late',
+]
+
+
+def make_rules(users: int, rules_per_user: int, rng: random.Random, unique_regexes: bool = False):
+    """Mostly keywords plus a fifth of regexes; with unique_regexes every user writes their own regexes"""
+    rules = []
+    for user_id in range(users):
+        for _ in range(rng.randint(0, rules_per_user)):
+            kind = INCLUDE if rng.random() < 0.4 else EXCLUDE
+            if unique_regexes and rng.random() < 0.5:
+                # Few users would write the same pair of word lists
+                first, second = rng.sample(WORDS, 2), rng.sample(WORDS, 2)
+                pattern_type, pattern = REGEX, rf"\b(?:{'|'.join(first)})\W+(?:{'|'.join(second)})s?\b"
+            elif rng.random() < 0.2:
+                pattern_type, pattern = REGEX, '|'.join(rng.sample(WORDS, 2)) + r'\b'
+            else:
+                pattern_type, pattern = KEYWORD, rng.choice(WORDS) + rng.choice(['', '', 's', 'al'])
+            rules.append((user_id, kind, pattern_type, pattern))
+    return rules
+
+
+def make_names(shows: int, rng: random.Random):
+    return [' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 5))) + f" {i}" for i in range(shows)]
+
+
+def naive(rules, users: int, names):
+    """Every user's rules against every show name, as a per-user loop would"""
+    by_user = {}
+    for user_id, kind, pattern_type, pattern in rules:
+        by_user.setdefault(user_id, []).append((kind, pattern_type, pattern))
+    allowed = set()
+    for show_index, name in enumerate(names):
+        lowered = name.casefold()
+        for user_id in range(users):
+            user_rules = by_user.get(user_id, [])
+            hits = {
+                kind for kind, pattern_type, pattern in user_rules
+                if (re.search(pattern, name, re.IGNORECASE) if pattern_type == REGEX else pattern.casefold() in lowered)
+            }
+            has_include = any(kind == INCLUDE for kind, _, _ in user_rules)
+            if EXCLUDE not in hits and (not has_include or INCLUDE in hits):
+                allowed.add((user_id, show_index))
+    return allowed
+
+
+def compiled(rules, users: int, names):
+    matcher = WatchRuleMatcher(rules)
+    verdict = WatchVerdict(matcher.include_users, {show_index: matcher.match(name) for show_index, name in enumerate(names)})
+    return {
+        (user_id, show_index)
+        for show_index in range(len(names))
+        for user_id in range(users)
+        if verdict.allows(user_id, show_index)
+    }
+
+
+def run_case(rules, users: int, names):
+    start = time.perf_counter()
+    matcher = WatchRuleMatcher(rules)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for name in names:
+        matcher.match(name)
+    match = time.perf_counter() - start
+    print(f"Compile {build * 1000:.1f} ms, match {match * 1000:.2f} ms for {len(names)} names")
+
+    start = time.perf_counter()
+    old = naive(rules, users, names)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = compiled(rules, users, names)
+    new_time = time.perf_counter() - start
+    assert old == new
+    print(f"Allowed (user, show) pairs: {len(new)}; per-user loop {old_time * 1000:.0f} ms, compiled {new_time * 1000:.0f} ms, {old_time / new_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--rules', type=int, default=24, help='Most rules per user; each gets 0..N')
+    parser.add_argument('--shows', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.shows, rng)
+    for unique_regexes in (False, True):
+        rules = make_rules(args.users, args.rules, rng, unique_regexes)
+        regexes = len({pattern for _, _, pattern_type, pattern in rules if pattern_type == REGEX})
+        print(f"{len(rules)} rules ({regexes} distinct regexes) for {args.users} users, {args.shows} new shows")
+        run_case(rules, args.users, names)
+
+
+if __name__ == '__main__':
+    main()
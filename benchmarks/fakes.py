@@ -0,0 +1,549 @@
+"""Local stand-ins for the services the bots talk to, for offline benchmarks.
+
+FakeTicketSite serves HouseSeats- and FillASeat-shaped listings, logins and
+images; FakePostgREST serves the subset of the PostgREST API SupabaseDB uses,
+including the commit_show_cycle RPC; FakeDiscord serves the REST routes and
+gateway handshake py-cord needs and enforces Discord's rate limits.
+Everything lives in memory and listens on 127.0.0.1.
+"""
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+async def start_app(app: web.Application) -> Tuple[web.AppRunner, str]:
+    """Serve an app on a free local port and return (runner, base URL)"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeTicketSite:
+    """Both ticket sites, each with a show list that grows on a drop schedule.
+
+    HouseSeats lives under /hs and FillASeat under /fas. A listing request
+    without the session cookie gets the site's login page, like the real
+    sites do once a session expires.
+    """
+
+    def __init__(self, page_size: int = 0, latency: float = 0.0):
+        # Shows per HouseSeats listing page; 0 serves everything on one page
+        self.page_size = page_size
+        # Seconds every request waits, standing in for the round trip to the site
+        self.latency = latency
+        # platform -> [(published_at, show_id, name)]
+        self.shows: Dict[str, List[Tuple[float, str, str]]] = {'houseseats': [], 'fillaseat': []}
+        self._next_id = {'houseseats': 10000, 'fillaseat': 50000}
+        self.requests = defaultdict(int)
+        self.base_url = ''
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_shows(self, platform: str, count: int, at: Optional[float] = None) -> List[str]:
+        """Publish count new shows at the given time (now by default) and return their IDs"""
+        at = time.time() if at is None else at
+        ids = []
+        for _ in range(count):
+            show_id = str(self._next_id[platform])
+            self._next_id[platform] += 1
+            self.shows[platform].append((at, show_id, f"Show {show_id} & Friends"))
+            ids.append(show_id)
+        return ids
+
+    def next_ids(self, platform: str, count: int) -> List[str]:
+        start = self._next_id[platform]
+        return [str(start + i) for i in range(count)]
+
+    def listed(self, platform: str) -> List[Tuple[str, str]]:
+        now = time.time()
+        return [(show_id, name) for at, show_id, name in self.shows[platform] if at <= now]
+
+    async def start(self) -> str:
+        app = web.Application(middlewares=[self._delay])
+        app.router.add_post('/hs/member/index.bv', self.hs_login)
+        app.router.add_get('/hs/member/index.bv', self.hs_login_page)
+        app.router.add_get('/hs/member/ajax/upcoming-shows.bv', self.hs_listing)
+        app.router.add_route('*', '/hs/media/{name}', self.image)
+        app.router.add_get('/fas/login2.php', self.fas_login_page)
+        app.router.add_post('/fas/login.php', self.fas_login)
+        app.router.add_get('/fas/account/index.php', self.fas_dashboard)
+        app.router.add_get('/fas/account/event_json.php', self.fas_events)
+        app.router.add_route('*', '/fas/images/{name}', self.image)
+        self._runner, self.base_url = await start_app(app)
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _delay(self, request, handler):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    # HouseSeats
+    async def hs_login_page(self, request):
+        return web.Response(text='<form><input type="password" name="password"></form>', content_type='text/html')
+
+    async def hs_login(self, request):
+        self.requests['hs_login'] += 1
+        response = web.Response(text='<html>Welcome</html>', content_type='text/html')
+        response.set_cookie('JSESSIONID', 'hs-session')
+        return response
+
+    async def hs_listing(self, request):
+        self.requests['hs_listing'] += 1
+        if request.cookies.get('JSESSIONID') != 'hs-session':
+            raise web.HTTPFound('/hs/member/index.bv')
+        shows = self.listed('houseseats')
+        start = int(request.query.get('start', '0') or 0)
+        if self.page_size:
+            page = shows[start:start + self.page_size]
+            links = ''.join(
+                f'<a href="?start={offset}">{offset // self.page_size + 1}</a>'
+                for offset in range(0, len(shows), self.page_size)
+            )
+        else:
+            page, links = shows, ''
+        block = '<div class="panel"><h1><a href="./tickets/view/?showid={id}">{name}</a></h1><p>Tonight</p></div>\n'
+        body = ''.join(block.format(id=show_id, name=name.replace('&', '&amp;')) for show_id, name in page)
+        return web.Response(text=f'<html>{body}<div class="pages">{links}</div></html>', content_type='text/html')
+
+    # FillASeat
+    async def fas_login_page(self, request):
+        return web.Response(
+            text='<form action="login.php"><input type="hidden" name="sessid" value="abc123"><input type="password"></form>',
+            content_type='text/html'
+        )
+
+    async def fas_login(self, request):
+        self.requests['fas_login'] += 1
+        response = web.Response(text='<html><a href="logout.php">Log out</a></html>', content_type='text/html')
+        response.set_cookie('PHPSESSID', 'fas-session')
+        return response
+
+    async def fas_dashboard(self, request):
+        return web.Response(text='<html>Dashboard <a href="logout.php">Log out</a></html>', content_type='text/html')
+
+    async def fas_events(self, request):
+        self.requests['fas_events'] += 1
+        if request.cookies.get('PHPSESSID') != 'fas-session':
+            return web.Response(text='<form action="login.php"><input type="password"></form>', content_type='text/html')
+        events = [{'e': show_id, 's': name, 'd': '2024-06-01 19:30:00'} for show_id, name in self.listed('fillaseat')]
+        return web.Response(text=f"getEventsSelect_cb({json.dumps(events)})", content_type='text/javascript')
+
+    async def image(self, request):
+        self.requests['image'] += 1
+        return web.Response(body=b'\xff\xd8\xff\xe0' + b'\x00' * 2048, content_type='image/jpeg')
+
+
+class FakePostgREST:
+    """In-memory PostgREST for the tables in sql/schema.sql.
+
+    Supports the select/filter/order/offset/limit, upsert and delete shapes
+    SupabaseDB issues, plus commit_show_cycle. Every request waits latency
+    seconds first to stand in for the round trip to Supabase.
+    """
+
+    KEYS = {
+        '_all_shows': ('id',), '_current_shows': ('id',), '_user_blacklists': ('user_id', 'show_id'),
+        '_user_watch_rules': ('user_id', 'kind', 'pattern_type', 'pattern'), '_subscriptions': ('user_id',),
+    }
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.tables: Dict[str, Dict[Tuple, Dict]] = defaultdict(dict)
+        self.requests = defaultdict(int)
+        self.base_url = ''
+        self._runner: Optional[web.AppRunner] = None
+
+    def _key_columns(self, table: str) -> Tuple[str, ...]:
+        for suffix, columns in self.KEYS.items():
+            if table.endswith(suffix):
+                return columns
+        return ('id',)
+
+    def upsert(self, table: str, rows: List[Dict]):
+        columns = self._key_columns(table)
+        stored = self.tables[table]
+        for row in rows:
+            key = tuple(row[column] for column in columns)
+            if key in stored:
+                stored[key].update(row)
+            else:
+                row = dict(row)
+                if table.endswith('_all_shows'):
+                    row.setdefault('first_seen_date', _now_iso())
+                stored[key] = row
+
+    async def start(self) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/rest/v1/rpc/{function}', self.rpc)
+        app.router.add_get('/rest/v1/{table}', self.select)
+        app.router.add_post('/rest/v1/{table}', self.insert)
+        app.router.add_delete('/rest/v1/{table}', self.delete)
+        self._runner, self.base_url = await start_app(app)
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _delay(self, name: str):
+        self.requests[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _matches(row: Dict, query) -> bool:
+        for column, condition in query.items():
+            if column in ('select', 'order', 'offset', 'limit', 'on_conflict', 'columns'):
+                continue
+            op, _, value = condition.partition('.')
+            actual = str(row.get(column))
+            if op == 'eq' and actual != value:
+                return False
+            if op == 'neq' and actual == value:
+                return False
+            if op == 'in' and actual not in value.strip('()').split(','):
+                return False
+        return True
+
+    def _filtered(self, table: str, query) -> List[Dict]:
+        return [row for row in self.tables[table].values() if self._matches(row, query)]
+
+    async def select(self, request):
+        table = request.match_info['table']
+        await self._delay(f"select {table}")
+        rows = self._filtered(table, request.query)
+        for order in reversed(','.join(request.query.getall('order', [])).split(',')):
+            if order:
+                column, _, direction = order.partition('.')
+                rows.sort(key=lambda row: str(row.get(column)), reverse=direction.startswith('desc'))
+        offset = int(request.query.get('offset', 0))
+        limit = request.query.get('limit')
+        rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+        select = request.query.get('select', '*')
+        if select != '*':
+            columns = [column.strip() for column in select.split(',')]
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return web.json_response(rows)
+
+    async def insert(self, request):
+        table = request.match_info['table']
+        await self._delay(f"upsert {table}")
+        rows = await request.json()
+        rows = rows if isinstance(rows, list) else [rows]
+        self.upsert(table, rows)
+        return web.json_response(rows, status=201)
+
+    async def delete(self, request):
+        table = request.match_info['table']
+        await self._delay(f"delete {table}")
+        stored = self.tables[table]
+        removed = [key for key, row in stored.items() if self._matches(row, request.query)]
+        for key in removed:
+            del stored[key]
+        return web.json_response([])
+
+    async def rpc(self, request):
+        function = request.match_info['function']
+        await self._delay(f"rpc {function}")
+        if function != 'commit_show_cycle':
+            return web.json_response({'message': f'function {function} not found'}, status=404)
+        params = await request.json()
+        platform, shows = params['p_platform'], params['p_shows']
+        current = self.tables[f'{platform}_current_shows']
+        new_ids = sorted(show['id'] for show in shows if (show['id'],) not in current)
+        self.upsert(f'{platform}_all_shows', shows)
+        scraped = {show['id'] for show in shows}
+        for key in [key for key in current if key[0] not in scraped]:
+            del current[key]
+        self.upsert(f'{platform}_current_shows', shows)
+        return web.json_response(new_ids)
+
+
+class _Bucket:
+    """Sliding-window request counter"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.hits = deque()
+
+    def take(self, now: float) -> Tuple[bool, int, float]:
+        """Count a request; returns (allowed, remaining, seconds until a slot frees)"""
+        while self.hits and self.hits[0] <= now - self.per:
+            self.hits.popleft()
+        if len(self.hits) >= self.limit:
+            return False, 0, self.hits[0] + self.per - now
+        self.hits.append(now)
+        reset_after = self.hits[0] + self.per - now
+        return True, self.limit - len(self.hits), reset_after
+
+
+def _discord_json(data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # py-cord only decodes a body whose Content-Type is exactly application/json, as Discord sends it
+    return web.Response(body=json.dumps(data).encode(), status=status, headers={'Content-Type': 'application/json', **(headers or {})})
+
+
+class FakeDiscord:
+    """Discord REST API and gateway for py-cord bots, with one guild per bot.
+
+    Requests are limited per token (global_rate per second) and per route
+    bucket (message sends: 5 per 5 s per channel), answering 429 with the
+    same body and headers as Discord, so py-cord and DMFanout back off the
+    way they would in production.
+    """
+
+    API_VERSION = 10
+
+    def __init__(self, members: int, global_rate: int = 50, send_rate: Tuple[int, float] = (5, 5.0)):
+        self.members = members
+        self.global_rate = global_rate
+        self.send_rate = send_rate
+        self._ids = iter(range(10 ** 17, 10 ** 18))
+        self.guild_id = str(next(self._ids))
+        self.channel_id = str(next(self._ids))
+        self.member_ids = [str(next(self._ids)) for _ in range(members)]
+        self._bot_users: Dict[str, Dict] = {}
+        self._dm_channels: Dict[str, str] = {}
+        self._dm_recipients: Dict[str, str] = {}
+        # Members whose DMs are closed: sends to them fail with 403, as for real users who disabled DMs
+        self.closed_dms: Set[str] = set()
+        self.forbidden = 0
+        # (author, channel, nonce) -> message, for sends with enforce_nonce
+        self._nonces: Dict[Tuple[str, str, str], Dict] = {}
+        self.deduplicated = 0
+        self._buckets: Dict[Tuple, _Bucket] = {}
+        self.requests = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self.dms: List[Tuple[float, str, int]] = []
+        self.channel_posts: List[float] = []
+        self.base_url = ''
+        self._runner: Optional[web.AppRunner] = None
+
+    def patch_pycord(self):
+        """Point py-cord's REST routes at this server"""
+        import discord.http
+        base = f"{self.base_url}/api/v{self.API_VERSION}"
+        discord.http.Route.base = property(lambda route: base)
+
+    async def start(self) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024, middlewares=[self._rate_limit])
+        api = f'/api/v{self.API_VERSION}'
+        app.router.add_get(f'{api}/users/@me', self.current_user)
+        app.router.add_get(f'{api}/gateway', self.gateway)
+        app.router.add_get(f'{api}/gateway/bot', self.gateway)
+        app.router.add_get(f'{api}/applications/{{app_id}}/commands', self.list_commands)
+        app.router.add_put(f'{api}/applications/{{app_id}}/commands', self.put_commands)
+        app.router.add_post(f'{api}/applications/{{app_id}}/commands', self.post_command)
+        app.router.add_get(f'{api}/channels/{{channel_id}}', self.get_channel)
+        app.router.add_post(f'{api}/channels/{{channel_id}}/messages', self.send_message)
+        app.router.add_post(f'{api}/users/@me/channels', self.create_dm)
+        app.router.add_get('/gateway-ws', self.websocket)
+        self._runner, self.base_url = await start_app(app)
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _bot_user(self, token: str) -> Dict:
+        user = self._bot_users.get(token)
+        if user is None:
+            user = self._bot_users[token] = {
+                'id': str(next(self._ids)), 'username': f'bot{len(self._bot_users)}',
+                'discriminator': '0000', 'global_name': None, 'avatar': None, 'bot': True
+            }
+        return user
+
+    @staticmethod
+    def _user(user_id: str, bot: bool = False) -> Dict:
+        return {'id': user_id, 'username': f'user{user_id[-6:]}', 'discriminator': '0000', 'global_name': None, 'avatar': None, 'bot': bot}
+
+    @web.middleware
+    async def _rate_limit(self, request, handler):
+        if request.path == '/gateway-ws':
+            return await handler(request)
+        token = request.headers.get('Authorization', '')
+        now = time.monotonic()
+        route = f"{request.method} {request.match_info.route.resource.canonical if request.match_info.route.resource else request.path}"
+        self.requests[route] += 1
+
+        allowed, _, retry_after = self._buckets.setdefault(('global', token), _Bucket(self.global_rate, 1.0)).take(now)
+        if not allowed:
+            return self._too_many(route, retry_after, scope='global')
+
+        headers = {}
+        if request.method == 'POST' and request.path.endswith('/messages'):
+            bucket_id = f"send:{request.match_info['channel_id']}"
+            limit, per = self.send_rate
+            allowed, remaining, reset_after = self._buckets.setdefault((bucket_id, token), _Bucket(limit, per)).take(now)
+            if not allowed:
+                return self._too_many(route, reset_after, scope='user', bucket=bucket_id)
+            headers = {
+                'X-RateLimit-Limit': str(limit),
+                'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+                'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+                'X-RateLimit-Bucket': bucket_id,
+            }
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _too_many(self, route: str, retry_after: float, scope: str, bucket: str = 'global') -> web.Response:
+        self.rate_limited[scope] += 1
+        retry_after = round(max(retry_after, 0.001), 3)
+        headers = {
+            'Retry-After': str(retry_after),
+            'X-RateLimit-Scope': scope,
+            'X-RateLimit-Bucket': bucket,
+            'X-RateLimit-Remaining': '0',
+            'X-RateLimit-Reset-After': str(retry_after),
+            # py-cord treats a 429 without Via as a Cloudflare ban
+            'Via': '1.1 google',
+        }
+        if scope == 'global':
+            headers['X-RateLimit-Global'] = 'true'
+        body = {'message': 'You are being rate limited.', 'retry_after': retry_after, 'global': scope == 'global'}
+        return _discord_json(body, status=429, headers=headers)
+
+    async def current_user(self, request):
+        return _discord_json(self._bot_user(request.headers.get('Authorization', '')))
+
+    async def gateway(self, request):
+        url = self.base_url.replace('http://', 'ws://') + '/gateway-ws'
+        return _discord_json({
+            'url': url, 'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 1}
+        })
+
+    async def list_commands(self, request):
+        return _discord_json([])
+
+    def _command(self, app_id: str, data: Dict) -> Dict:
+        return {'id': str(next(self._ids)), 'application_id': app_id, 'version': '1', 'type': 1, 'default_member_permissions': None, **data}
+
+    async def put_commands(self, request):
+        app_id = request.match_info['app_id']
+        return _discord_json([self._command(app_id, data) for data in await request.json()])
+
+    async def post_command(self, request):
+        return _discord_json(self._command(request.match_info['app_id'], await request.json()), status=201)
+
+    async def get_channel(self, request):
+        channel_id = request.match_info['channel_id']
+        return _discord_json({
+            'id': channel_id, 'type': 0, 'guild_id': self.guild_id, 'name': 'alerts', 'position': 0,
+            'permission_overwrites': [], 'nsfw': False, 'parent_id': None, 'topic': None,
+            'last_message_id': None, 'rate_limit_per_user': 0
+        })
+
+    async def create_dm(self, request):
+        recipient_id = str((await request.json())['recipient_id'])
+        channel_id = self._dm_channels.get(recipient_id)
+        if channel_id is None:
+            channel_id = self._dm_channels[recipient_id] = str(next(self._ids))
+            self._dm_recipients[channel_id] = recipient_id
+        return _discord_json({'id': channel_id, 'type': 1, 'last_message_id': None, 'recipients': [self._user(recipient_id)]})
+
+    async def send_message(self, request):
+        channel_id = request.match_info['channel_id']
+        data = await request.json()
+        author = self._bot_user(request.headers.get('Authorization', ''))
+        nonce_key = (author['id'], channel_id, str(data.get('nonce')))
+        if data.get('enforce_nonce') and nonce_key in self._nonces:
+            # Discord answers a repeated nonce with the message it already created
+            self.deduplicated += 1
+            return _discord_json(self._nonces[nonce_key])
+        if self._dm_recipients.get(channel_id) in self.closed_dms:
+            self.forbidden += 1
+            return _discord_json({'message': 'Cannot send messages to this user', 'code': 50007}, status=403)
+        if channel_id == self.channel_id:
+            self.channel_posts.append(time.time())
+        else:
+            self.dms.append((time.time(), channel_id, len(data.get('embeds') or [])))
+        message = {
+            'id': str(next(self._ids)), 'channel_id': channel_id, 'author': author, 'type': 0,
+            'content': data.get('content') or '', 'embeds': data.get('embeds') or [],
+            'components': data.get('components') or [], 'attachments': [], 'mentions': [],
+            'mention_roles': [], 'mention_everyone': False, 'pinned': False, 'tts': False,
+            'timestamp': _now_iso(), 'edited_timestamp': None, 'flags': 0,
+            'nonce': data.get('nonce')
+        }
+        if data.get('enforce_nonce'):
+            self._nonces[nonce_key] = message
+        return _discord_json(message)
+
+    def _guild_create(self, bot_user: Dict) -> Dict:
+        joined = _now_iso()
+        members = [{'user': bot_user, 'roles': [], 'joined_at': joined, 'deaf': False, 'mute': False}]
+        members += [
+            {'user': self._user(member_id), 'roles': [], 'joined_at': joined, 'deaf': False, 'mute': False}
+            for member_id in self.member_ids
+        ]
+        return {
+            'id': self.guild_id, 'name': 'Benchmark Guild', 'icon': None, 'owner_id': self.member_ids[0] if self.member_ids else bot_user['id'],
+            'roles': [{'id': self.guild_id, 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0,
+                       'hoist': False, 'managed': False, 'mentionable': False}],
+            'emojis': [], 'stickers': [], 'features': [], 'member_count': len(members), 'members': members,
+            'channels': [{'id': self.channel_id, 'type': 0, 'name': 'alerts', 'position': 0, 'permission_overwrites': []}],
+            'threads': [], 'voice_states': [], 'presences': [], 'stage_instances': [], 'guild_scheduled_events': [],
+            'large': len(members) > 250, 'unavailable': False, 'verification_level': 0, 'default_message_notifications': 0,
+            'explicit_content_filter': 0, 'mfa_level': 0, 'premium_tier': 0, 'preferred_locale': 'en-US',
+            'nsfw_level': 0, 'afk_timeout': 300, 'system_channel_flags': 0,
+        }
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        sequence = 0
+
+        async def dispatch(event: str, data: Dict):
+            nonlocal sequence
+            sequence += 1
+            await ws.send_str(json.dumps({'op': 0, 't': event, 's': sequence, 'd': data}))
+
+        await ws.send_str(json.dumps({'op': 10, 'd': {'heartbeat_interval': 41250}}))
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            payload = json.loads(message.data)
+            op = payload.get('op')
+            if op == 1:
+                await ws.send_str(json.dumps({'op': 11}))
+            elif op == 2:
+                bot_user = self._bot_user(f"Bot {payload['d']['token']}")
+                await dispatch('READY', {
+                    'v': self.API_VERSION, 'user': bot_user, 'session_id': f'session{random.random()}',
+                    'resume_gateway_url': self.base_url.replace('http://', 'ws://') + '/gateway-ws',
+                    'guilds': [{'id': self.guild_id, 'unavailable': True}],
+                    'application': {'id': bot_user['id'], 'flags': 0}, 'shard': [0, 1],
+                    'private_channels': [], 'relationships': [],
+                })
+                await dispatch('GUILD_CREATE', self._guild_create(bot_user))
+            elif op == 8:
+                # Every member already came with GUILD_CREATE
+                await dispatch('GUILD_MEMBERS_CHUNK', {
+                    'guild_id': self.guild_id, 'members': [], 'chunk_index': 0, 'chunk_count': 1,
+                    'nonce': payload['d'].get('nonce')
+                })
+        return ws
@@ -0,0 +1,101 @@
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import discord
+from discord.ui import Button, View
+
+from blacklist_index import BlacklistIndex
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_ID_PREFIX = 'blacklist_'
+
+
+def blacklist_custom_id(show_id: str, user_id: int) -> str:
+    return f"{CUSTOM_ID_PREFIX}{show_id}_{user_id}"
+
+
+def parse_custom_id(custom_id: str) -> Optional[Tuple[str, int]]:
+    """Decode (show_id, user_id) from a blacklist button's custom_id"""
+    if not custom_id.startswith(CUSTOM_ID_PREFIX):
+        return None
+    # User IDs never contain an underscore, so split on the last one
+    show_id, _, user_id = custom_id[len(CUSTOM_ID_PREFIX):].rpartition('_')
+    if not show_id or not user_id.isdigit():
+        return None
+    return show_id, int(user_id)
+
+
+class BlacklistButtonHandler:
+    """Answers blacklist button clicks for one bot from the button's custom_id.
+
+    DMs carry stateless views: only their components are sent, so py-cord
+    keeps no per-message state, and one on_interaction listener handles every
+    button ever sent, including those sent before a restart.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        index: BlacklistIndex,
+        add_blacklist: Callable[[int, str], Awaitable[bool]],
+        show_name: Callable[[str], Awaitable[Optional[str]]],
+        style: discord.ButtonStyle = discord.ButtonStyle.primary,
+        default_label: str = "🚫 Blacklist Show",
+        added_message: str = "**`{name}`** has been added to your blacklist."
+    ):
+        self.label = label
+        self.index = index
+        self._add_blacklist = add_blacklist
+        self._show_name = show_name
+        self.style = style
+        self.default_label = default_label
+        self.added_message = added_message
+
+    def attach(self, bot: discord.Bot):
+        bot.add_listener(self.on_interaction, 'on_interaction')
+
+    def view(self, user_id: int, buttons: List[Tuple[str, Optional[str]]]) -> View:
+        """Build the DM view for (show_id, label) pairs; a None label uses the default"""
+        view = View(timeout=None)
+        for show_id, label in buttons:
+            view.add_item(Button(
+                label=(label or self.default_label)[:80],
+                style=self.style,
+                custom_id=blacklist_custom_id(show_id, user_id)
+            ))
+        # Only used to render the components; clicks are dispatched by on_interaction
+        view.stop()
+        return view
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        if interaction.type != discord.InteractionType.component:
+            return
+        parsed = parse_custom_id((interaction.data or {}).get('custom_id', ''))
+        if parsed is None:
+            return
+        show_id, user_id = parsed
+
+        try:
+            # Defer the response immediately to prevent timeout
+            await interaction.response.defer()
+
+            # Check if the user is blacklisting their own message
+            if interaction.user.id != user_id:
+                await interaction.followup.send("You can only blacklist shows for yourself.", ephemeral=True)
+                return
+
+            try:
+                if not await self._add_blacklist(user_id, show_id):
+                    raise Exception("Blacklist write failed")
+                self.index.add(user_id, show_id)
+                name = await self._show_name(show_id) or show_id
+                await interaction.followup.send(self.added_message.format(name=name), ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error adding show to {self.label} blacklist: {e}")
+                await interaction.followup.send(
+                    "An error occurred while adding to the blacklist.",
+                    ephemeral=True
+                )
+        except Exception as e:
+            logger.error(f"Error handling {self.label} blacklist button: {e}")
@@ -0,0 +1,74 @@
+import os
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from resynced_index import ResyncedIndex
+
+# How often each index is reloaded from the database
+BLACKLIST_RESYNC_MINUTES = float(os.environ.get('BLACKLIST_RESYNC_MINUTES', '15'))
+
+
+class BlacklistIndex(ResyncedIndex):
+    """In-memory user <-> show blacklist mapping for one platform.
+
+    Loaded from the *_user_blacklists table at startup and periodically after
+    that; the blacklist commands and buttons update it alongside their database
+    writes so fan-out filtering never waits on a query.
+    """
+
+    noun = 'blacklist entries'
+
+    def __init__(
+        self,
+        label: str,
+        load_rows: Callable[[], Awaitable[Optional[List[Dict]]]],
+        load_for_shows: Callable[[List[str]], Awaitable[Dict[int, set]]],
+        resync_minutes: float = BLACKLIST_RESYNC_MINUTES
+    ):
+        self._load_for_shows = load_for_shows
+        super().__init__(label, load_rows, resync_minutes)
+
+    def _rebuild(self, rows: List[Dict]):
+        by_user: Dict[int, Set[str]] = {}
+        by_show: Dict[str, Set[int]] = {}
+        for row in rows:
+            by_user.setdefault(row['user_id'], set()).add(row['show_id'])
+            by_show.setdefault(row['show_id'], set()).add(row['user_id'])
+        self.by_user = by_user
+        self.by_show = by_show
+
+    def _describe(self) -> str:
+        return f" for {len(self.by_user)} users"
+
+    def add(self, user_id: int, show_id: str):
+        self._change(self._add, user_id, show_id)
+
+    def remove(self, user_id: int, show_id: str):
+        self._change(self._remove, user_id, show_id)
+
+    def _add(self, user_id: int, show_id: str):
+        self.by_user.setdefault(user_id, set()).add(show_id)
+        self.by_show.setdefault(show_id, set()).add(user_id)
+
+    def _remove(self, user_id: int, show_id: str):
+        shows = self.by_user.get(user_id)
+        if shows is not None:
+            shows.discard(show_id)
+            if not shows:
+                del self.by_user[user_id]
+        users = self.by_show.get(show_id)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self.by_show[show_id]
+
+    async def for_shows(self, show_ids: Iterable[str]) -> Dict[int, set]:
+        """Map user ID -> blacklisted show IDs, restricted to the given shows"""
+        show_ids = list(show_ids)
+        if not self.loaded:
+            return await self._read_through(lambda: self._load_for_shows(show_ids))
+
+        user_blacklists: Dict[int, set] = {}
+        for show_id in show_ids:
+            for user_id in self.by_show.get(show_id, ()):
+                user_blacklists.setdefault(user_id, set()).add(show_id)
+        return user_blacklists
@@ -0,0 +1,201 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from metrics import DMS, DM_SEND_RATE, FANOUT_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Concurrent DM recipients per fan-out
+DM_FANOUT_WORKERS = int(os.environ.get('DM_FANOUT_WORKERS', '16'))
+# Requests per second allowed across one bot token; Discord's global limit is 50/s
+DISCORD_GLOBAL_RATE_LIMIT = float(os.environ.get('DISCORD_GLOBAL_RATE_LIMIT', '45'))
+# Attempts per message when Discord answers 429 or 5xx
+DM_MAX_ATTEMPTS = int(os.environ.get('DM_MAX_ATTEMPTS', '4'))
+# Show embeds packed into one DM (Discord allows at most 10 embeds per message)
+DM_BATCH_SIZE = max(1, min(10, int(os.environ.get('DM_BATCH_SIZE', '10'))))
+
+
+def batched(items: List, size: int) -> List[List]:
+    """Split items into consecutive lists of at most size elements"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class RateLimiter:
+    """Token bucket keeping one bot token under Discord's global request rate"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FanoutResult:
+    def __init__(self):
+        self.recipients = 0
+        self.sent = 0
+        self.failed = 0
+        self.forbidden = 0
+        self.rate_limited = 0
+        self.elapsed = 0.0
+
+    @property
+    def send_rate(self) -> float:
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.sent} DMs to {self.recipients} users in {self.elapsed:.1f}s "
+            f"({self.send_rate:.1f}/s, {self.failed} failed, {self.forbidden} undeliverable, "
+            f"{self.rate_limited} rate limited)"
+        )
+
+
+def _retry_after(error: discord.HTTPException) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') or headers.get('X-RateLimit-Reset-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class DMFanout:
+    """Sends DMs to many users concurrently from a bounded worker pool.
+
+    Per-route buckets (one per DM channel) are already tracked by py-cord from
+    Discord's X-RateLimit-* headers, so users are sent to in parallel while a
+    shared token bucket keeps the bot under the global limit. Every REST call
+    takes a token: the send, and opening the DM channel when the recipient
+    has no known channel yet (recipients with an is_open/open pair). Messages for one
+    user go out in order on a single worker. A 429 that py-cord gives up on is
+    retried after the Retry-After Discord sent.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        workers: int = DM_FANOUT_WORKERS,
+        rate_limit: float = DISCORD_GLOBAL_RATE_LIMIT,
+        max_attempts: int = DM_MAX_ATTEMPTS
+    ):
+        self.label = label
+        self.workers = workers
+        self.max_attempts = max_attempts
+        # A full second of burst on top of the refill could put twice the rate into one second
+        self.limiter = RateLimiter(rate_limit, burst=max(1.0, rate_limit / 5))
+
+    async def run(
+        self,
+        deliveries: List[Tuple[Any, List[Dict]]],
+        on_sent: Optional[Callable[[Dict], None]] = None,
+        on_forbidden: Optional[Callable[[Any], None]] = None,
+        prepare: Optional[Callable[[Dict], Awaitable[Dict]]] = None
+    ) -> FanoutResult:
+        """Deliver (recipient, [send kwargs, ...]) pairs and return the totals.
+        prepare, if given, is awaited with each message's kwargs right before it is
+        first sent and returns the kwargs to send, so messages can wait on their own
+        content while others go out. on_sent is called with the sent kwargs once
+        Discord has accepted them, on_forbidden with each recipient Discord refuses to DM.
+        """
+        result = FanoutResult()
+        result.recipients = len(deliveries)
+        if not deliveries:
+            return result
+
+        start = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue()
+        for delivery in deliveries:
+            queue.put_nowait(delivery)
+
+        workers = [
+            asyncio.create_task(self._worker(queue, result, on_sent, on_forbidden, prepare))
+            for _ in range(min(self.workers, len(deliveries)))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        result.elapsed = time.monotonic() - start
+        self._record(result)
+        logger.info(f"{self.label} fan-out finished: {result}")
+        return result
+
+    def _record(self, result: FanoutResult):
+        for outcome in ('sent', 'failed', 'forbidden', 'rate_limited'):
+            DMS.inc(getattr(result, outcome), platform=self.label, outcome=outcome)
+        DM_SEND_RATE.set(result.send_rate, platform=self.label)
+        FANOUT_DURATION.observe(result.elapsed, platform=self.label)
+
+    async def _worker(self, queue: asyncio.Queue, result: FanoutResult, on_sent, on_forbidden, prepare):
+        while True:
+            recipient, messages = await queue.get()
+            try:
+                await self._deliver(recipient, messages, result, on_sent, on_forbidden, prepare)
+            except Exception as e:
+                logger.error(f"Unexpected error delivering DMs to user {recipient.id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, recipient, messages: List[Dict], result: FanoutResult, on_sent=None, on_forbidden=None, prepare=None):
+        for kwargs in messages:
+            if prepare is not None:
+                kwargs = await prepare(kwargs)
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    # Opening a DM channel is a REST call of its own, so it takes a token too
+                    if not getattr(recipient, 'is_open', True):
+                        await self.limiter.acquire()
+                        await recipient.open()
+                    await self.limiter.acquire()
+                    await recipient.send(**kwargs)
+                except discord.Forbidden:
+                    # Nothing else will get through either
+                    result.forbidden += 1
+                    logger.warning(f"Cannot send DM to user {recipient.id}. They might have DMs disabled.")
+                    if on_forbidden is not None:
+                        on_forbidden(recipient)
+                    return
+                except discord.HTTPException as e:
+                    retryable = e.status == 429 or e.status >= 500
+                    if e.status == 429:
+                        result.rate_limited += 1
+                    if not retryable or attempt == self.max_attempts:
+                        result.failed += 1
+                        logger.error(f"Error sending DM to user {recipient.id}: {e}")
+                        break
+                    delay = _retry_after(e) or min(30, 2 ** attempt) + random.random()
+                    logger.warning(f"DM to user {recipient.id} got HTTP {e.status}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    result.failed += 1
+                    logger.error(f"Error sending DM to user {recipient.id}: {e}")
+                    break
+                else:
+                    result.sent += 1
+                    logger.info(f"Sent DM to user {recipient.id}")
+                    if on_sent is not None:
+                        on_sent(kwargs)
+                    break
@@ -0,0 +1,208 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+# Pool and timeout settings shared by every site client
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get('HTTP_KEEPALIVE_SECONDS', '60'))
+HTTP_TIMEOUT_SECONDS = float(os.environ.get('HTTP_TIMEOUT_SECONDS', '20'))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('HTTP_CONNECT_TIMEOUT_SECONDS', '5'))
+
+
+class HTTPResponse:
+    """A fully-read HTTP response, detached from the pooled connection"""
+
+    def __init__(self, status: int, url: str, headers: Dict[str, str], body: bytes, encoding: Optional[str] = None):
+        self.status_code = status
+        self.url = url
+        self.headers = headers
+        self.content = body
+        self.encoding = encoding or 'utf-8'
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+
+class AsyncHTTPClient:
+    """Pooled keep-alive HTTP client for a single site"""
+
+    def __init__(self, name: str, pool_size: int = HTTP_POOL_SIZE, timeout: Optional[aiohttp.ClientTimeout] = None):
+        self.name = name
+        self.pool_size = pool_size
+        self.timeout = timeout or aiohttp.ClientTimeout(
+            total=HTTP_TIMEOUT_SECONDS,
+            connect=HTTP_CONNECT_TIMEOUT_SECONDS
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pending_cookies: Dict[str, Dict[str, str]] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session is created lazily so it binds to the running loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                cookie_jar=aiohttp.CookieJar(unsafe=True)
+            )
+            for url, cookies in self._pending_cookies.items():
+                self._session.cookie_jar.update_cookies(cookies, response_url=URL(url))
+            self._pending_cookies.clear()
+            logger.info(f"Opened HTTP connection pool '{self.name}' (size {self.pool_size})")
+        return self._session
+
+    async def request(self, method: str, url: str, **kwargs) -> HTTPResponse:
+        """Send a request and read the whole body before releasing the connection"""
+        session = self._get_session()
+        async with session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            return HTTPResponse(
+                status=response.status,
+                url=str(response.url),
+                headers=dict(response.headers),
+                body=body,
+                encoding=response.charset
+            )
+
+    async def get(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> HTTPResponse:
+        kwargs.setdefault('allow_redirects', True)
+        return await self.request('HEAD', url, **kwargs)
+
+    def get_cookies(self) -> Dict[str, str]:
+        """Return the current cookies as a flat name -> value dict"""
+        if self._session is None:
+            merged = {}
+            for cookies in self._pending_cookies.values():
+                merged.update(cookies)
+            return merged
+        return {cookie.key: cookie.value for cookie in self._session.cookie_jar}
+
+    def set_cookies(self, cookies: Dict[str, str], url: str):
+        """Seed cookies for the given site URL"""
+        if self._session is None or self._session.closed:
+            self._pending_cookies.setdefault(url, {}).update(cookies)
+        else:
+            self._session.cookie_jar.update_cookies(cookies, response_url=URL(url))
+
+    def load_cookies(self, path: str, url: str) -> bool:
+        """Load cookies saved by save_cookies, returning True if any were found"""
+        try:
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self.set_cookies(data, url)
+                logger.info(f"Loaded {self.name} cookies from {path}")
+                return bool(data)
+        except Exception as e:
+            logger.warning(f"Failed to load {self.name} cookies: {e}")
+        return False
+
+    def save_cookies(self, path: str):
+        try:
+            with open(path, "w") as f:
+                json.dump(self.get_cookies(), f)
+            logger.info(f"Saved {self.name} cookies to {path}")
+        except Exception as e:
+            logger.warning(f"Failed to save {self.name} cookies: {e}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"Closed HTTP connection pool '{self.name}'")
+        self._session = None
+
+
+class ListingFingerprint:
+    """Remembers the last successfully processed response of a listing endpoint.
+
+    Sends If-None-Match / If-Modified-Since when the site supplied validators
+    and compares a digest of the body otherwise, so an unchanged listing can
+    skip parsing, persistence and diffing. A response only becomes the
+    baseline once commit() is called after the cycle succeeded.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.skipped_cycles = 0
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._pending = None
+
+    @staticmethod
+    def digest(*bodies: bytes) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for body in bodies:
+            h.update(body)
+        return h.hexdigest()
+
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        return headers
+
+    def is_unchanged(self, *responses: HTTPResponse) -> bool:
+        """Check responses against the baseline, remembering them as the pending baseline"""
+        if responses and responses[0].status_code == 304:
+            self._pending = None
+            return True
+        digest = self.digest(*(response.content for response in responses))
+        # Validators only describe a single response; a multi-page listing relies on the digest
+        single = responses[0] if len(responses) == 1 else None
+        self._pending = (
+            single.headers.get('ETag') if single else None,
+            single.headers.get('Last-Modified') if single else None,
+            digest
+        )
+        return digest == self._digest
+
+    def mark_skipped(self):
+        self.skipped_cycles += 1
+        logger.info(f"{self.label} listing unchanged, skipping cycle ({self.skipped_cycles} skipped so far)")
+
+    def commit(self):
+        """Make the last checked response the baseline for future cycles"""
+        if self._pending is not None:
+            self._etag, self._last_modified, self._digest = self._pending
+            self._pending = None
+
+
+_clients: Dict[str, AsyncHTTPClient] = {}
+
+
+def get_client(name: str, **kwargs) -> AsyncHTTPClient:
+    """Get the shared client for a site, creating it on first use"""
+    client = _clients.get(name)
+    if client is None:
+        client = AsyncHTTPClient(name, **kwargs)
+        _clients[name] = client
+    return client
+
+
+async def close_all_clients():
+    await asyncio.gather(*(client.close() for client in _clients.values()), return_exceptions=True)
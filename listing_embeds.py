@@ -0,0 +1,91 @@
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+from media_cache import media_cache
+
+logger = logging.getLogger(__name__)
+
+# Discord limits: 25 fields per embed, 10 embeds and 6000 characters per message
+EMBED_FIELD_LIMIT = 25
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_CHAR_LIMIT = 6000
+
+
+def pack_messages(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Group embeds into as few messages as Discord's per-message limits allow"""
+    messages = []
+    current: List[discord.Embed] = []
+    chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) == EMBEDS_PER_MESSAGE or chars + size > MESSAGE_CHAR_LIMIT):
+            messages.append(current)
+            current, chars = [], 0
+        current.append(embed)
+        chars += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+class ListingEmbedCache:
+    """Pre-rendered embed pages for one show-listing command.
+
+    The pages are rebuilt when the scrape commits a new listing, so the
+    command only replays cached messages and never touches the database
+    unless the cache is still cold.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        color: discord.Color,
+        load_shows: Callable[[], Awaitable[List[Dict]]],
+        empty_message: str,
+        thumbnails: bool = False
+    ):
+        self.title = title
+        self.color = color
+        self._load_shows = load_shows
+        self.empty_message = empty_message
+        self.thumbnails = thumbnails
+        self.messages: Optional[List[List[discord.Embed]]] = None
+
+    async def refresh(self, shows: Optional[List[Dict]] = None) -> List[List[discord.Embed]]:
+        """Re-render the pages from the given rows, or from the database"""
+        from_database = shows is None
+        if from_database:
+            shows = await self._load_shows()
+        embeds = []
+        for start in range(0, len(shows), EMBED_FIELD_LIMIT):
+            page = shows[start:start + EMBED_FIELD_LIMIT]
+            title = self.title if start == 0 else f"{self.title} (Continued)"
+            embed = discord.Embed(title=title, color=self.color)
+            # Thumbnail from the first show on each page, if its image is published
+            image_url = page[0].get('image_url')
+            if self.thumbnails and image_url and await media_cache.is_ready(image_url):
+                embed.set_thumbnail(url=image_url)
+            for show in page:
+                embed.add_field(
+                    name=f"{show['name']} (ID: {show['id']})",
+                    value="\u200b",  # Zero-width space as value
+                    inline=True
+                )
+            embeds.append(embed)
+        messages = pack_messages(embeds)
+        # The loaders return [] on errors, so an empty database answer is not cached
+        self.messages = messages if messages or not from_database else None
+        logger.info(f"Rendered '{self.title}': {len(shows)} shows in {len(embeds)} embeds, {len(messages)} messages")
+        return messages
+
+    async def respond(self, ctx):
+        messages = self.messages
+        if messages is None:
+            messages = await self.refresh()
+        if not messages:
+            await ctx.respond(self.empty_message, ephemeral=True)
+            return
+        for embeds in messages:
+            await ctx.respond(embeds=embeds, ephemeral=True)
@@ -0,0 +1,217 @@
+import os
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from http_client import AsyncHTTPClient, get_client
+
+logger = logging.getLogger(__name__)
+
+# Downloaded show images live on the data volume when it exists (Docker), else locally
+if os.path.exists("/app/data"):
+    MEDIA_CACHE_DIR = os.environ.get('MEDIA_CACHE_DIR', '/app/data/media')
+else:
+    MEDIA_CACHE_DIR = os.environ.get('MEDIA_CACHE_DIR', 'media_cache')
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get('MEDIA_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+# How long a readiness answer is trusted; a missing image is re-checked much sooner
+MEDIA_READY_TTL_SECONDS = float(os.environ.get('MEDIA_READY_TTL_SECONDS', '3600'))
+MEDIA_MISSING_TTL_SECONDS = float(os.environ.get('MEDIA_MISSING_TTL_SECONDS', '60'))
+# How long a new alert waits for its image to be published before going out without it
+MEDIA_READY_TIMEOUT_SECONDS = float(os.environ.get('MEDIA_READY_TIMEOUT_SECONDS', '10'))
+MEDIA_CHECK_CONCURRENCY = int(os.environ.get('MEDIA_CHECK_CONCURRENCY', '8'))
+
+_CHECK_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+
+class MediaCache:
+    """Show image readiness checks and downloads shared by both bots.
+
+    HEAD results are remembered for a TTL so commands and alerts do not probe
+    the same image again, and downloaded bytes are kept in a size-bounded LRU
+    directory so an image is fetched from the site at most once.
+    """
+
+    def __init__(
+        self,
+        http: AsyncHTTPClient,
+        directory: str = MEDIA_CACHE_DIR,
+        max_bytes: int = MEDIA_CACHE_MAX_BYTES,
+        concurrency: int = MEDIA_CHECK_CONCURRENCY
+    ):
+        self.http = http
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._ready: Dict[str, Tuple[bool, float]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # file name -> size, least recently used first
+        self._files: OrderedDict = OrderedDict()
+        self._total_bytes = 0
+        self._scanned = False
+        self._lock = threading.Lock()
+
+    async def is_ready(self, url: str) -> bool:
+        """Whether the image is published, answered from the memo while it is fresh"""
+        memo = self._ready.get(url)
+        if memo is not None and memo[1] > time.monotonic():
+            return memo[0]
+        return await self._dedupe('head', url, self._check)
+
+    async def wait_until_ready(self, url: str, timeout: float = MEDIA_READY_TIMEOUT_SECONDS) -> bool:
+        """Poll with exponential backoff until the image is published or the timeout passes"""
+        deadline = time.monotonic() + timeout
+        delay = 0.5
+        while True:
+            memo = self._ready.get(url)
+            if memo is not None and memo[0] and memo[1] > time.monotonic():
+                return True
+            if await self._dedupe('head', url, self._check):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Image still unavailable after {timeout:.0f}s: {url}")
+                return False
+            await asyncio.sleep(min(remaining, delay + random.random() * delay / 2))
+            delay = min(delay * 2, 5)
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Return the image bytes, downloading them only on a cache miss"""
+        name = self._file_name(url)
+        data = await asyncio.to_thread(self._read, name)
+        if data is not None:
+            return data
+        return await self._dedupe('get', url, self._download)
+
+    async def _dedupe(self, kind: str, url: str, func):
+        # Concurrent callers for the same URL share one request
+        key = (kind, url)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(url))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _check(self, url: str) -> bool:
+        ready = False
+        try:
+            async with self._semaphore:
+                response = await self.http.head(url, timeout=_CHECK_TIMEOUT)
+            ready = response.status_code == 200
+            if not ready:
+                logger.info(f"Image not available yet ({response.status_code}): {url}")
+        except Exception as e:
+            logger.error(f"Error checking image {url}: {e}")
+        self._remember(url, ready)
+        return ready
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        try:
+            async with self._semaphore:
+                response = await self.http.get(url)
+        except Exception as e:
+            logger.error(f"Failed to download image {url}: {e}")
+            return None
+        if response.status_code != 200:
+            self._remember(url, False)
+            logger.warning(f"Image download failed ({response.status_code}): {url}")
+            return None
+        self._remember(url, True)
+        await asyncio.to_thread(self._write, self._file_name(url), response.content)
+        return response.content
+
+    def _remember(self, url: str, ready: bool):
+        ttl = MEDIA_READY_TTL_SECONDS if ready else MEDIA_MISSING_TTL_SECONDS
+        self._ready[url] = (ready, time.monotonic() + ttl)
+        if len(self._ready) > 10000:
+            now = time.monotonic()
+            self._ready = {u: memo for u, memo in self._ready.items() if memo[1] > now}
+
+    @staticmethod
+    def _file_name(url: str) -> str:
+        return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+    # The methods below run in a worker thread via asyncio.to_thread
+
+    def _scan(self):
+        # Rebuild the LRU order from file modification times left by earlier runs
+        self._scanned = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            for _, name, size in sorted(entries):
+                self._files[name] = size
+                self._total_bytes += size
+            if entries:
+                logger.info(f"Media cache holds {len(entries)} images ({self._total_bytes / 1e6:.1f} MB)")
+        except OSError as e:
+            logger.warning(f"Failed to scan media cache directory {self.directory}: {e}")
+
+    def _read(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._read_locked(name)
+
+    def _write(self, name: str, data: bytes):
+        with self._lock:
+            self._write_locked(name, data)
+
+    def _read_locked(self, name: str) -> Optional[bytes]:
+        if not self._scanned:
+            self._scan()
+        if name not in self._files:
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            self._forget(name)
+            return None
+        self._files.move_to_end(name)
+        return data
+
+    def _write_locked(self, name: str, data: bytes):
+        if not self._scanned:
+            self._scan()
+        if len(data) > self.max_bytes:
+            return
+        path = os.path.join(self.directory, name)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache image {name}: {e}")
+            return
+        self._forget(name)
+        self._files[name] = len(data)
+        self._total_bytes += len(data)
+        while self._total_bytes > self.max_bytes and self._files:
+            oldest = next(iter(self._files))
+            self._forget(oldest)
+            try:
+                os.remove(os.path.join(self.directory, oldest))
+            except OSError:
+                pass
+
+    def _forget(self, name: str):
+        size = self._files.pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+
+# Shared by both bots when they run in the same process (run_bots.py)
+media_cache = MediaCache(get_client('media'))
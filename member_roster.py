@@ -0,0 +1,144 @@
+import logging
+from typing import Dict, Optional, Set
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class RosterRecipient:
+    """DM target built from a roster user ID and the bot that will send to it.
+
+    dm_channels maps user ID -> DM channel ID for the bot and outlives the
+    recipient: py-cord only caches the 128 most recent DM channels, so without
+    it almost every DM in a large fan-out would first cost a create_dm call.
+    """
+
+    def __init__(self, bot: discord.Bot, user_id: int, dm_channels: Dict[int, int]):
+        self.bot = bot
+        self.id = user_id
+        self._dm_channels = dm_channels
+
+    @property
+    def is_open(self) -> bool:
+        return self.id in self._dm_channels
+
+    async def open(self):
+        """Look up the DM channel with one REST call; needed once per user and bot"""
+        channel = await self.bot.create_dm(discord.Object(id=self.id))
+        self._dm_channels[self.id] = channel.id
+
+    async def send(self, view: Optional[discord.ui.View] = None, **kwargs):
+        if not self.is_open:
+            await self.open()
+        channel_id = self._dm_channels[self.id]
+        if view is None:
+            channel = self.bot.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+            return await channel.send(**kwargs)
+        # DM views are stateless (see blacklist_buttons), but Messageable.send keeps every view
+        # it sends for the life of the bot, so only the view's components are posted
+        embeds = kwargs.pop('embeds', None) or []
+        return await self.bot.http.send_message(
+            channel_id, kwargs.pop('content', None),
+            embeds=[embed.to_dict() for embed in embeds],
+            components=view.to_components(),
+            **kwargs
+        )
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, RosterRecipient) and other.id == self.id
+
+
+class MemberRoster:
+    """Non-bot members of every guild, kept current from gateway events.
+
+    Guilds are snapshotted from the member chunks received at startup and then
+    updated from member join/remove/update events, so a notification round
+    needs no REST calls. One roster is shared by every bot attached to it, so
+    a guild's members are kept until the last of its attached bots leaves.
+    """
+
+    def __init__(self):
+        self._guilds: Dict[int, Set[int]] = {}
+        # Guild ID -> user IDs of the attached bots in it
+        self._bots: Dict[int, Set[int]] = {}
+
+    def attach(self, bot: discord.Bot):
+        """Feed this roster from the bot's gateway events"""
+
+        async def on_ready():
+            for guild in bot.guilds:
+                self.snapshot(guild, bot.user.id)
+            logger.info(f"Member roster holds {len(self.all_user_ids())} users across {len(self._guilds)} guild(s)")
+
+        async def on_guild_join(guild: discord.Guild):
+            if not guild.chunked:
+                await guild.chunk()
+            self.snapshot(guild, bot.user.id)
+
+        async def on_guild_remove(guild: discord.Guild):
+            self.release(guild.id, bot.user.id)
+
+        async def on_member_join(member: discord.Member):
+            self._update(member)
+
+        async def on_member_update(before: discord.Member, after: discord.Member):
+            self._update(after)
+
+        async def on_member_remove(member: discord.Member):
+            members = self._guilds.get(member.guild.id)
+            if members is not None:
+                members.discard(member.id)
+
+        bot.add_listener(on_ready, 'on_ready')
+        bot.add_listener(on_guild_join, 'on_guild_join')
+        bot.add_listener(on_guild_remove, 'on_guild_remove')
+        bot.add_listener(on_member_join, 'on_member_join')
+        bot.add_listener(on_member_update, 'on_member_update')
+        bot.add_listener(on_member_remove, 'on_member_remove')
+
+    def snapshot(self, guild: discord.Guild, bot_id: int):
+        self._guilds[guild.id] = {member.id for member in guild.members if not member.bot}
+        self._bots.setdefault(guild.id, set()).add(bot_id)
+
+    def release(self, guild_id: int, bot_id: int):
+        """Forget a guild the bot left, unless another attached bot is still in it"""
+        bots = self._bots.get(guild_id, set())
+        bots.discard(bot_id)
+        if not bots:
+            self._bots.pop(guild_id, None)
+            self._guilds.pop(guild_id, None)
+
+    def _update(self, member: discord.Member):
+        members = self._guilds.get(member.guild.id)
+        if members is None:
+            return
+        if member.bot:
+            members.discard(member.id)
+        else:
+            members.add(member.id)
+
+    def all_user_ids(self) -> Set[int]:
+        return set().union(*self._guilds.values())
+
+    async def user_ids_for(self, bot: discord.Bot) -> Set[int]:
+        """IDs of every non-bot member in the bot's guilds"""
+        user_ids = set()
+        for guild in bot.guilds:
+            members = self._guilds.get(guild.id)
+            if members is None:
+                # Not chunked yet (e.g. the bot just joined); fall back to REST once
+                logger.warning(f"Guild {guild.id} missing from member roster, fetching members")
+                members = {member.id async for member in guild.fetch_members(limit=None) if not member.bot}
+                self._guilds[guild.id] = members
+            # The bot now holds on to the guild too, even if another bot snapshotted it
+            self._bots.setdefault(guild.id, set()).add(bot.user.id)
+            user_ids |= members
+        return user_ids
+
+
+# Shared by both bots when they run in the same process (run_bots.py)
+roster = MemberRoster()
@@ -0,0 +1,276 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Port for the /metrics endpoint served by run_bots.py; 0 disables it
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9108'))
+# Bind address; set to 0.0.0.0 to scrape from outside the container
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+# How often the event loop is sampled for lag
+LOOP_LAG_INTERVAL_SECONDS = float(os.environ.get('LOOP_LAG_INTERVAL_SECONDS', '0.5'))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Updated from the DB executor threads as well as the loop
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # key -> [per-bucket counts, sum, count]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class Registry:
+    """The metrics of this process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+registry = Registry()
+
+# Scrape pipeline
+SCRAPE_DURATION = registry.histogram('ticketgenie_scrape_duration_seconds', 'Duration of one scrape and process cycle', ('platform',))
+SCRAPE_CYCLES = registry.counter('ticketgenie_scrape_cycles_total', 'Scrape cycles by outcome', ('platform', 'outcome'))
+SHOWS_SEEN = registry.gauge('ticketgenie_shows_seen', 'Shows on the listing in the last processed cycle', ('platform',))
+NEW_SHOWS = registry.counter('ticketgenie_new_shows_total', 'Newly listed shows detected', ('platform',))
+LOGINS = registry.counter('ticketgenie_logins_total', 'Logins performed because the saved session had expired', ('platform',))
+
+# Database
+DB_CALL_DURATION = registry.histogram('ticketgenie_db_call_duration_seconds', 'Latency of SupabaseDB calls, including executor queueing', ('method', 'pool'))
+DB_CALL_ERRORS = registry.counter('ticketgenie_db_call_errors_total', 'SupabaseDB calls that failed, whether they raised or answered with their failure value', ('method',))
+
+# Notifications
+DMS = registry.counter('ticketgenie_dms_total', 'DM deliveries by outcome', ('platform', 'outcome'))
+DM_SEND_RATE = registry.gauge('ticketgenie_dm_send_rate', 'DMs per second achieved by the last fan-out', ('platform',))
+FANOUT_DURATION = registry.histogram('ticketgenie_fanout_duration_seconds', 'Duration of one DM fan-out', ('platform',))
+DISCORD_RATE_LIMITS = registry.counter('ticketgenie_discord_rate_limited_total', 'HTTP 429 answers from Discord', ('scope',))
+PUSHOVER_ALERTS = registry.counter('ticketgenie_pushover_alerts_total', 'Pushover batches by outcome', ('platform', 'outcome'))
+
+# Runtime
+LOOP_LAG = registry.histogram(
+    'ticketgenie_event_loop_lag_seconds', 'How late the event loop ran a timer',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+LOOP_LAG_LAST = registry.gauge('ticketgenie_event_loop_lag_last_seconds', 'Most recent event loop lag sample')
+
+
+class _RateLimitLogHandler(logging.Handler):
+    """Counts the 429s py-cord handles internally, which it only reports through logging.
+
+    py-cord logs "We are being rate limited" for every 429 and, when the body
+    says it was global, "Global rate limit has been hit" right after it in the
+    same task step; neither record's arguments carry the flag. So each 429 is
+    held until its task yields and counted as global only if the second
+    message arrived in between.
+    """
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        # Tasks with a 429 logged whose scope is not known yet
+        self._pending = set()
+
+    def emit(self, record: logging.LogRecord):
+        message = str(record.msg)
+        if message.startswith('We are being rate limited'):
+            try:
+                task = asyncio.current_task()
+            except RuntimeError:
+                task = None
+            if task is None:
+                DISCORD_RATE_LIMITS.inc(scope='route')
+                return
+            self._pending.add(task)
+            task.get_loop().call_soon(self._settle, task)
+        elif message.startswith('Global rate limit has been hit'):
+            self._pending.discard(asyncio.current_task())
+            DISCORD_RATE_LIMITS.inc(scope='global')
+
+    def _settle(self, task):
+        if task in self._pending:
+            self._pending.discard(task)
+            DISCORD_RATE_LIMITS.inc(scope='route')
+
+
+def watch_discord_rate_limits():
+    discord_http_logger = logging.getLogger('discord.http')
+    if not any(isinstance(handler, _RateLimitLogHandler) for handler in discord_http_logger.handlers):
+        discord_http_logger.addHandler(_RateLimitLogHandler(level=logging.WARNING))
+
+
+async def _watch_loop_lag(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_LAST.set(lag)
+
+
+class MetricsServer:
+    """Serves the registry at /metrics and samples event-loop lag while running"""
+
+    def __init__(self, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8', headers={'X-Content-Type-Options': 'nosniff'})
+
+    async def start(self):
+        watch_discord_rate_limits()
+        self._lag_task = asyncio.create_task(_watch_loop_lag(LOOP_LAG_INTERVAL_SECONDS))
+        if not self.port:
+            logger.info("Metrics endpoint disabled (METRICS_PORT=0)")
+            return
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        except OSError as e:
+            # Never keep the bots from starting over a busy port
+            logger.error(f"Could not start metrics endpoint on {self.host}:{self.port}: {e}")
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            await asyncio.gather(self._lag_task, return_exceptions=True)
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics_server = MetricsServer()
@@ -0,0 +1,335 @@
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pending alerts live on the data volume when it exists (Docker), else locally, so they survive restarts
+if os.path.exists("/app/data"):
+    OUTBOX_PATH = os.environ.get('OUTBOX_PATH', '/app/data/outbox.sqlite3')
+else:
+    OUTBOX_PATH = os.environ.get('OUTBOX_PATH', 'outbox.sqlite3')
+# Drains a message may go through undelivered before it is given up on
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '3'))
+# Wait before draining again after a drain left messages undelivered, doubling while drains keep failing
+OUTBOX_RETRY_SECONDS = float(os.environ.get('OUTBOX_RETRY_SECONDS', '30'))
+OUTBOX_RETRY_MAX_SECONDS = 900
+# How long finished rows of shows still listed are kept; rows of delisted shows go at the next commit
+OUTBOX_RETENTION_DAYS = float(os.environ.get('OUTBOX_RETENTION_DAYS', '14'))
+
+# Delivery channels of an outbox row
+CHANNEL_POST = 'channel'
+DM = 'dm'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox_shows (
+    platform TEXT NOT NULL,
+    show_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT,
+    image_url TEXT,
+    PRIMARY KEY (platform, show_id)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    show_id TEXT NOT NULL,
+    recipient_id INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    message_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    pushover_sent INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (platform, show_id, recipient_id, channel)
+);
+CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status, platform);
+CREATE INDEX IF NOT EXISTS outbox_message_key ON outbox (message_key);
+"""
+
+
+def message_key(platform: str, channel: str, recipient_id: int, show_ids: Iterable[str]) -> str:
+    """Idempotency key of one message, short enough to be its Discord nonce (25 characters at most)"""
+    raw = f"{platform}:{channel}:{recipient_id}:{','.join(sorted(show_ids))}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+class OutboxMessage:
+    """Rows sharing a message key: one channel post, or one DM carrying up to DM_BATCH_SIZE shows"""
+
+    __slots__ = ('key', 'channel', 'recipient_id', 'show_ids', 'pushover_sent')
+
+    def __init__(self, key: str, channel: str, recipient_id: int, pushover_sent: bool):
+        self.key = key
+        self.channel = channel
+        self.recipient_id = recipient_id
+        self.show_ids: List[str] = []
+        # Channel posts page Pushover once, even when the post itself is retried after a restart
+        self.pushover_sent = pushover_sent
+
+
+class NotificationOutbox:
+    """Durable queue of the alerts owed for new shows, in SQLite.
+
+    Rows, one per (show, recipient, channel), are written when the scrape
+    diff finds new shows and marked sent as Discord accepts each message, so
+    a restart resumes with exactly the messages that had not gone out. The
+    message key doubles as the Discord nonce (with enforce_nonce), so a
+    message that was sent just before a crash is not posted a second time.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, max_attempts: int = OUTBOX_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # A single thread keeps writes in order, so a message is never marked sent before it was queued
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='outbox')
+        # Keys handed to a drain in this process; concurrent drains skip them
+        self._claimed: Set[str] = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            # WAL commits survive a process crash and keep single-row updates cheap
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._locked, func, *args))
+
+    def _locked(self, func, *args):
+        with self._lock:
+            return func(self._connection(), *args)
+
+    async def enqueue(
+        self,
+        platform: str,
+        shows: Dict[str, Dict],
+        channel_id: int,
+        dm_batches: List[Tuple[int, List[str]]]
+    ) -> int:
+        """Queue a channel post per show and the (user ID, show IDs) DMs; returns the rows added.
+        Rows already in the outbox, pending or finished, are left as they are, so queueing
+        the same detection again (e.g. after a crash before the commit) sends nothing twice.
+        """
+        if not shows:
+            return 0
+        return await self._run(self._enqueue, platform, shows, channel_id, dm_batches)
+
+    @staticmethod
+    def _enqueue(conn, platform, shows, channel_id, dm_batches) -> int:
+        now = time.time()
+        rows = [
+            (platform, show_id, channel_id, CHANNEL_POST, message_key(platform, CHANNEL_POST, channel_id, [show_id]), now, now)
+            for show_id in shows
+        ]
+        for user_id, show_ids in dm_batches:
+            key = message_key(platform, DM, user_id, show_ids)
+            rows.extend((platform, show_id, user_id, DM, key, now, now) for show_id in show_ids)
+
+        before = conn.total_changes
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO outbox_shows (platform, show_id, name, url, image_url) VALUES (?, ?, ?, ?, ?)',
+                [(platform, show_id, info['name'], info.get('url'), info.get('image_url')) for show_id, info in shows.items()]
+            )
+            shows_written = conn.total_changes - before
+            conn.executemany(
+                'INSERT OR IGNORE INTO outbox (platform, show_id, recipient_id, channel, message_key, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return conn.total_changes - before - shows_written
+
+    async def cancel(self, platform: str, show_ids: Iterable[str]) -> int:
+        """Drop the pending rows of shows that turned out not to be new"""
+        show_ids = list(show_ids)
+        if not show_ids:
+            return 0
+        return await self._run(self._cancel, platform, show_ids)
+
+    def _cancel(self, conn, platform, show_ids) -> int:
+        placeholders = ','.join('?' * len(show_ids))
+        cursor = conn.execute(
+            f"DELETE FROM outbox WHERE platform = ? AND status = 'pending' AND show_id IN ({placeholders})",
+            [platform, *show_ids]
+        )
+        return cursor.rowcount
+
+    async def claim(self, platform: str) -> Tuple[List[OutboxMessage], Dict[str, Dict]]:
+        """Take the platform's pending messages for delivery, in the order they were queued,
+        along with show ID -> {'name', 'url', 'image_url'} for the shows they carry.
+        """
+        messages, shows = await self._run(self._pending, platform)
+        messages = [message for message in messages if message.key not in self._claimed]
+        self._claimed.update(message.key for message in messages)
+        return messages, shows
+
+    def _pending(self, conn, platform) -> Tuple[List[OutboxMessage], Dict[str, Dict]]:
+        rows = conn.execute(
+            "SELECT message_key, channel, recipient_id, show_id, pushover_sent FROM outbox "
+            "WHERE platform = ? AND status = 'pending' ORDER BY id",
+            (platform,)
+        ).fetchall()
+        messages: Dict[str, OutboxMessage] = {}
+        for key, channel, recipient_id, show_id, pushover_sent in rows:
+            message = messages.get(key)
+            if message is None:
+                message = messages[key] = OutboxMessage(key, channel, recipient_id, bool(pushover_sent))
+            message.show_ids.append(show_id)
+
+        shows = {}
+        show_ids = sorted({row[3] for row in rows})
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(show_ids), 500):
+            chunk = show_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for show_id, name, url, image_url in conn.execute(
+                f"SELECT show_id, name, url, image_url FROM outbox_shows WHERE platform = ? AND show_id IN ({placeholders})",
+                [platform, *chunk]
+            ):
+                shows[show_id] = {'name': name, 'url': url, 'image_url': image_url}
+        return list(messages.values()), shows
+
+    async def skip(self, keys: Iterable[str]):
+        """Finish claimed messages without sending them, e.g. DMs to users who paused or cannot be reached"""
+        keys = list(keys)
+        if keys:
+            await self._run(self._skip, keys)
+
+    @staticmethod
+    def _skip(conn, keys):
+        now = time.time()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                "UPDATE outbox SET status = 'skipped', updated_at = ? WHERE message_key = ? AND status = 'pending'",
+                [(now, key) for key in keys]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def mark_sent(self, key: str):
+        """Record a delivered message; callable from synchronous callbacks on the event loop"""
+        self._write_later(self._mark_sent, key)
+
+    @staticmethod
+    def _mark_sent(conn, key):
+        conn.execute("UPDATE outbox SET status = 'sent', updated_at = ? WHERE message_key = ?", (time.time(), key))
+
+    def mark_pushover_sent(self, key: str):
+        """Record that a channel post's Pushover alert went out, so a retried post does not page again"""
+        self._write_later(self._mark_pushover_sent, key)
+
+    @staticmethod
+    def _mark_pushover_sent(conn, key):
+        conn.execute("UPDATE outbox SET pushover_sent = 1 WHERE message_key = ?", (key,))
+
+    def _write_later(self, func, key: str):
+        future = asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(self._locked, func, key))
+        future.add_done_callback(self._log_write_error)
+
+    def _log_write_error(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Failed to update notification outbox {self.path}: {future.exception()}")
+
+    async def release(self, keys: Iterable[str]) -> int:
+        """Hand claimed messages back; those still pending count an attempt and are given up after the last.
+        Returns how many messages are left to retry.
+        """
+        keys = list(keys)
+        try:
+            return await self._run(self._release, keys)
+        finally:
+            self._claimed.difference_update(keys)
+
+    def _release(self, conn, keys) -> int:
+        now = time.time()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, updated_at = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE message_key = ? AND status = 'pending'",
+                [(now, self.max_attempts, key) for key in keys]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(DISTINCT message_key) FROM outbox WHERE updated_at = ? GROUP BY status", (now,)
+        ).fetchall())
+        if counts.get('failed'):
+            logger.warning(f"Gave up on {counts['failed']} outbox messages after {self.max_attempts} attempts")
+        return counts.get('pending', 0)
+
+    async def prune(self, platform: str, listed_show_ids: Iterable[str], retention_days: float = OUTBOX_RETENTION_DAYS) -> int:
+        """Delete the platform's finished rows for shows no longer listed, and any older than the retention period.
+        A show that leaves the listing and comes back is then alerted again, like any new show.
+        """
+        return await self._run(self._prune, platform, set(listed_show_ids), time.time() - retention_days * 86400)
+
+    @staticmethod
+    def _prune(conn, platform, listed_show_ids, cutoff) -> int:
+        finished = {
+            show_id for (show_id,) in
+            conn.execute("SELECT DISTINCT show_id FROM outbox WHERE status != 'pending' AND platform = ?", (platform,))
+        }
+        delisted = sorted(finished - listed_show_ids)
+        conn.execute('BEGIN')
+        try:
+            deleted = conn.execute("DELETE FROM outbox WHERE status != 'pending' AND updated_at < ?", (cutoff,)).rowcount
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(delisted), 500):
+                chunk = delisted[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                deleted += conn.execute(
+                    f"DELETE FROM outbox WHERE status != 'pending' AND platform = ? AND show_id IN ({placeholders})",
+                    [platform, *chunk]
+                ).rowcount
+            conn.execute(
+                "DELETE FROM outbox_shows WHERE NOT EXISTS "
+                "(SELECT 1 FROM outbox WHERE outbox.platform = outbox_shows.platform AND outbox.show_id = outbox_shows.show_id)"
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if deleted:
+            logger.info(f"Pruned {deleted} finished outbox rows")
+        return deleted
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Shared by every engine in the process; message keys include the platform
+outbox = NotificationOutbox()
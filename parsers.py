@@ -0,0 +1,89 @@
+import os
+import re
+import json
+import html
+import logging
+import hashlib
+from typing import Any, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib decoder is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes of an unexpected response body included in diagnostic logs
+PARSER_LOG_BYTES = int(os.environ.get('PARSER_LOG_BYTES', '2000'))
+
+HOUSESEATS_SHOW_PATTERN = re.compile(r'<h1><a href="./tickets/view/\?showid=(\d+)">(.*?)</a></h1>')
+
+FILLASEAT_CALLBACK = b'getEventsSelect_cb'
+
+
+class ParseError(Exception):
+    pass
+
+
+def parse_houseseats_shows(text: str) -> List[Tuple[str, str]]:
+    """Return (show_id, show_name) pairs from a HouseSeats listing page"""
+    shows = []
+    for show_id, show_name in HOUSESEATS_SHOW_PATTERN.findall(text):
+        show_name = show_name.strip()
+        if '&' in show_name:
+            show_name = html.unescape(show_name)
+        shows.append((show_id, show_name))
+    return shows
+
+
+def looks_like_login_page(body: bytes) -> bool:
+    # The event feed is never a login page; checking its first bytes spares scanning and
+    # lowercasing a multi-megabyte body every cycle
+    if body[:64].lstrip().startswith(FILLASEAT_CALLBACK + b'('):
+        return False
+    # Plain substring scans; a case-insensitive regex is several times slower on large bodies
+    return b'login.php' in body or b'type="password"' in body.lower()
+
+
+def unwrap_jsonp(body: bytes, callback: bytes = FILLASEAT_CALLBACK) -> Optional[memoryview]:
+    """Return a zero-copy view of the JSON payload of callback(...), or None"""
+    prefix = callback + b'('
+    start = body.find(prefix)
+    if start < 0:
+        return None
+    start += len(prefix)
+    end = body.rfind(b')')
+    if end < start:
+        return None
+    return memoryview(body)[start:end]
+
+
+def loads(data: Union[bytes, memoryview, str]) -> Any:
+    """Decode JSON, with orjson when it is installed; raises json.JSONDecodeError"""
+    if orjson is not None:
+        # orjson reads a memoryview directly and its error subclasses json.JSONDecodeError
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def parse_fillaseat_events(body: bytes) -> List[dict]:
+    """Decode the event list from an event_json.php JSONP response"""
+    payload = unwrap_jsonp(body)
+    if payload is None:
+        log_unexpected_body("Response does not match expected JSONP format", body)
+        raise ParseError("Failed to parse JSONP response.")
+    try:
+        return loads(payload)
+    except json.JSONDecodeError as e:
+        log_unexpected_body(f"JSON decoding failed: {e}", body)
+        raise ParseError(f"JSON decoding failed: {e}")
+
+
+def log_unexpected_body(reason: str, body: bytes, limit: int = PARSER_LOG_BYTES):
+    """Log one bounded excerpt of a response that could not be parsed"""
+    digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+    excerpt = body[:limit].decode('utf-8', errors='replace')
+    truncated = f" (first {limit} of {len(body)} bytes)" if len(body) > limit else ""
+    logger.error(f"{reason}; body {digest}{truncated}:\n{excerpt}")
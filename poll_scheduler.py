@@ -0,0 +1,155 @@
+import os
+import math
+import random
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+PST_TIMEZONE = pytz.timezone('America/Los_Angeles')
+
+# Local hours (inclusive start, exclusive end) during which the sites are polled
+POLL_WINDOW_START_HOUR = int(os.environ.get('POLL_WINDOW_START_HOUR', '6'))
+POLL_WINDOW_END_HOUR = int(os.environ.get('POLL_WINDOW_END_HOUR', '17'))
+# Polls per day; the default matches the old fixed 2-3 minute loop over the default window
+POLL_DAILY_BUDGET = int(os.environ.get('POLL_DAILY_BUDGET', str(
+    (POLL_WINDOW_END_HOUR - POLL_WINDOW_START_HOUR) * 60 * 2 // 5
+)))
+POLL_MIN_INTERVAL_SECONDS = float(os.environ.get('POLL_MIN_INTERVAL_SECONDS', '60'))
+POLL_MAX_INTERVAL_SECONDS = float(os.environ.get('POLL_MAX_INTERVAL_SECONDS', '900'))
+# Random spread applied to every interval, as a fraction of it
+POLL_JITTER = float(os.environ.get('POLL_JITTER', '0.2'))
+# Drops older than this are ignored when learning
+POLL_HISTORY_DAYS = int(os.environ.get('POLL_HISTORY_DAYS', '120'))
+# Pseudo-count added to every hour so quiet hours are still polled
+POLL_PRIOR = float(os.environ.get('POLL_PRIOR', '0.5'))
+POLL_RELEARN_HOURS = float(os.environ.get('POLL_RELEARN_HOURS', '24'))
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class PollScheduler:
+    """Chooses the polling interval for one platform from its drop history.
+
+    Drops (first_seen_date of every show) are bucketed by local weekday and
+    hour. For a fixed number of polls, mean detection latency is minimised
+    by polling each hour in proportion to the square root of its drop rate,
+    so the daily budget is split that way across the window, clamped to
+    [POLL_MIN_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS].
+    """
+
+    def __init__(
+        self,
+        label: str,
+        load_first_seen: Callable[[], Awaitable[Optional[List]]],
+        timezone=PST_TIMEZONE,
+        start_hour: int = POLL_WINDOW_START_HOUR,
+        end_hour: int = POLL_WINDOW_END_HOUR,
+        daily_budget: int = POLL_DAILY_BUDGET
+    ):
+        self.label = label
+        self._load_first_seen = load_first_seen
+        self.timezone = timezone
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.daily_budget = daily_budget
+        # drops[weekday][hour]
+        self.drops = [[0.0] * 24 for _ in range(7)]
+        self.intervals = [[self._uniform_interval()] * 24 for _ in range(7)]
+        self.learned_at: Optional[datetime] = None
+
+    def _uniform_interval(self) -> float:
+        hours = max(1, self.end_hour - self.start_hour)
+        return 3600 * hours / max(1, self.daily_budget)
+
+    def in_window(self, now: datetime) -> bool:
+        return self.start_hour <= now.astimezone(self.timezone).hour < self.end_hour
+
+    async def learn(self) -> bool:
+        """Rebuild the histogram from the database"""
+        timestamps = await self._load_first_seen()
+        self.learned_at = datetime.now(self.timezone)
+        if timestamps is None:
+            logger.error(f"Failed to load {self.label} drop history, keeping the current schedule")
+            return False
+
+        cutoff = datetime.now(self.timezone) - timedelta(days=POLL_HISTORY_DAYS)
+        drops = [[0.0] * 24 for _ in range(7)]
+        counted = 0
+        for value in timestamps:
+            seen = _parse_timestamp(value)
+            if seen is None or seen.tzinfo is None or seen < cutoff:
+                continue
+            local = seen.astimezone(self.timezone)
+            drops[local.weekday()][local.hour] += 1
+            counted += 1
+
+        self.drops = drops
+        self._allocate()
+        logger.info(f"Learned {self.label} poll schedule from {counted} drops in the last {POLL_HISTORY_DAYS} days")
+        return True
+
+    def needs_relearn(self) -> bool:
+        return self.learned_at is None or datetime.now(self.timezone) - self.learned_at > timedelta(hours=POLL_RELEARN_HOURS)
+
+    def record_drop(self, now: datetime, count: int = 1):
+        """Count drops seen live so the schedule adapts between relearns"""
+        local = now.astimezone(self.timezone)
+        self.drops[local.weekday()][local.hour] += count
+        self._allocate()
+
+    def _allocate(self):
+        hours = range(self.start_hour, self.end_hour)
+        intervals = [[POLL_MAX_INTERVAL_SECONDS] * 24 for _ in range(7)]
+        for weekday in range(7):
+            weights = {hour: math.sqrt(self.drops[weekday][hour] + POLL_PRIOR) for hour in hours}
+            for hour, polls in self._split_budget(weights).items():
+                intervals[weekday][hour] = 3600 / polls
+        self.intervals = intervals
+
+    def _split_budget(self, weights: Dict[int, float]) -> Dict[int, float]:
+        """Polls per hour proportional to weight, clamped to the interval bounds without exceeding the budget"""
+        low = 3600 / POLL_MAX_INTERVAL_SECONDS
+        high = 3600 / POLL_MIN_INTERVAL_SECONDS
+        polls: Dict[int, float] = {}
+        free = dict(weights)
+        budget = float(self.daily_budget)
+        while free:
+            total = sum(free.values())
+            if total <= 0:
+                free = {hour: 1.0 for hour in free}
+                total = float(len(free))
+            share = {hour: max(0.0, budget) * weight / total for hour, weight in free.items()}
+            clamped = {hour: min(high, max(low, p)) for hour, p in share.items() if p < low or p > high}
+            if not clamped:
+                polls.update(share)
+                break
+            # Fix the clamped hours and spread what is left over the rest
+            polls.update(clamped)
+            budget -= sum(clamped.values())
+            for hour in clamped:
+                del free[hour]
+        return polls
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """Seconds to wait before the next poll"""
+        local = (now or datetime.now(self.timezone)).astimezone(self.timezone)
+        if not self.in_window(local):
+            # Sleep until the window opens (checking at least hourly in case the clock jumps)
+            opens = local.replace(hour=self.start_hour, minute=0, second=0, microsecond=0)
+            if local.hour >= self.end_hour:
+                opens += timedelta(days=1)
+            return max(POLL_MIN_INTERVAL_SECONDS, min(3600, (opens - local).total_seconds()))
+
+        interval = self.intervals[local.weekday()][local.hour]
+        return interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
@@ -0,0 +1,170 @@
+import os
+import re
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from http_client import get_client
+from media_cache import media_cache
+from dm_fanout import batched
+from metrics import PUSHOVER_ALERTS
+from tracing import DropTrace
+
+logger = logging.getLogger(__name__)
+
+PUSHOVER_API_URL = "https://api.pushover.net/1/messages.json"
+# Pushover accepts up to 50 comma-separated user keys per message
+PUSHOVER_BATCH_SIZE = 50
+PUSHOVER_MAX_ATTEMPTS = int(os.environ.get('PUSHOVER_MAX_ATTEMPTS', '5'))
+PUSHOVER_QUEUE_SIZE = int(os.environ.get('PUSHOVER_QUEUE_SIZE', '1000'))
+# How long shutdown waits for queued alerts before dropping them
+PUSHOVER_DRAIN_SECONDS = float(os.environ.get('PUSHOVER_DRAIN_SECONDS', '5'))
+
+
+def recipient_keys() -> List[str]:
+    """User/group keys from PUSHOVER_USER_KEYS (comma or space separated) plus the legacy PUSHOVER_USER_KEY"""
+    raw = f"{os.environ.get('PUSHOVER_USER_KEYS', '')},{os.environ.get('PUSHOVER_USER_KEY', '')}"
+    keys = []
+    for key in re.split(r'[\s,]+', raw):
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+class PushoverDispatcher:
+    """Queues Pushover alerts and delivers them from a background worker.
+
+    notify() only enqueues, so a slow or failing Pushover API never holds up
+    the Discord posts and DMs. Each alert downloads its image once (through
+    the media cache) and is sent to all recipient keys in batches of 50,
+    retrying 429s, 5xx answers and network errors with backoff.
+    """
+
+    def __init__(self, label: str, api_token: Optional[str], user_keys: Optional[List[str]] = None):
+        self.label = label
+        self.api_token = api_token
+        self.user_keys = user_keys if user_keys is not None else recipient_keys()
+        self.http = get_client('pushover')
+        self.sent = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        _dispatchers.append(self)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_token and self.user_keys)
+
+    def notify(
+        self,
+        message: str,
+        title: Optional[str] = None,
+        url: Optional[str] = None,
+        image_url: Optional[str] = None,
+        trace: Optional[DropTrace] = None
+    ):
+        """Queue an alert for delivery without waiting for it"""
+        if not self.enabled:
+            # Silently return if keys aren't set to avoid log spam
+            return
+        if self._worker is None or self._worker.done():
+            # Created lazily so the queue and worker bind to the running loop
+            self._queue = asyncio.Queue(maxsize=PUSHOVER_QUEUE_SIZE)
+            self._worker = asyncio.create_task(self._run())
+        alert = {'message': message, 'title': title, 'url': url, 'image_url': image_url, 'trace': trace}
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            self.failed += 1
+            PUSHOVER_ALERTS.inc(platform=self.label, outcome='dropped')
+            logger.error(f"{self.label} Pushover queue is full, dropping alert: {title}")
+            return
+        if trace is not None:
+            trace.hold('pushover')
+
+    async def _run(self):
+        while True:
+            alert = await self._queue.get()
+            try:
+                await self._deliver(alert)
+            except Exception as e:
+                logger.error(f"Unexpected error sending {self.label} Pushover alert: {e}")
+            finally:
+                if alert['trace'] is not None:
+                    alert['trace'].release('pushover')
+                self._queue.task_done()
+
+    async def _deliver(self, alert: Dict):
+        image = None
+        if alert['image_url']:
+            # Pushover needs the file itself, it cannot fetch from a URL on its own
+            image = await media_cache.fetch(alert['image_url'])
+
+        for keys in batched(self.user_keys, PUSHOVER_BATCH_SIZE):
+            if await self._post(alert, ','.join(keys), image):
+                self.sent += 1
+                PUSHOVER_ALERTS.inc(platform=self.label, outcome='sent')
+                if alert['trace'] is not None:
+                    alert['trace'].mark('pushover_sent')
+                logger.info(f"Pushover notification sent to {len(keys)} recipient(s): {alert['title']}")
+            else:
+                self.failed += 1
+                PUSHOVER_ALERTS.inc(platform=self.label, outcome='failed')
+
+    async def _post(self, alert: Dict, user: str, image: Optional[bytes]) -> bool:
+        for attempt in range(1, PUSHOVER_MAX_ATTEMPTS + 1):
+            # A FormData body is consumed by the request, so build one per attempt
+            data = aiohttp.FormData()
+            data.add_field("token", self.api_token)
+            data.add_field("user", user)
+            data.add_field("message", alert['message'])
+            if alert['title']:
+                data.add_field("title", alert['title'])
+            if alert['url']:
+                data.add_field("url", alert['url'])
+            if image is not None:
+                # Adding the attachment field makes this a multipart/form-data request
+                data.add_field("attachment", image, filename="show_image.jpg", content_type="image/jpeg")
+
+            try:
+                response = await self.http.post(PUSHOVER_API_URL, data=data)
+                if response.status_code == 200:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    # Bad token, key or payload; retrying will not help
+                    logger.error(f"Pushover rejected {self.label} alert ({response.status_code}): {response.text[:200]}")
+                    return False
+                error = f"HTTP {response.status_code}"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            if attempt == PUSHOVER_MAX_ATTEMPTS:
+                logger.error(f"Failed to send {self.label} Pushover notification after {attempt} attempts: {error}")
+                return False
+            delay = min(60, 2 ** attempt) + random.random()
+            PUSHOVER_ALERTS.inc(platform=self.label, outcome='retried')
+            logger.warning(f"{self.label} Pushover notification failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return False
+
+    async def close(self, timeout: float = PUSHOVER_DRAIN_SECONDS):
+        """Give queued alerts a short grace period, then stop the worker"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} queued {self.label} Pushover alerts on shutdown")
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+
+_dispatchers: List[PushoverDispatcher] = []
+
+
+async def close_all_dispatchers():
+    await asyncio.gather(*(dispatcher.close() for dispatcher in _dispatchers), return_exceptions=True)
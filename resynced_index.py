@@ -0,0 +1,67 @@
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class ResyncedIndex:
+    """In-memory copy of one per-user table, loaded at startup and reloaded every resync_minutes.
+
+    Subclasses build their lookups from the table's rows in _rebuild and
+    route every local change through _change, so a change made while a
+    reload is in flight is replayed on top of the reloaded rows. Until the
+    first load finishes, reads go to the database through _read_through.
+    """
+
+    # Plural noun for the rows in log lines, e.g. "blacklist entries"
+    noun = 'rows'
+
+    def __init__(self, label: str, load_rows: Callable[[], Awaitable[Optional[List[Dict]]]], resync_minutes: float):
+        self.label = label
+        self._load_rows = load_rows
+        self.resync_minutes = resync_minutes
+        self.loaded = False
+        # Changes made while a reload is in flight, replayed on top of its result
+        self._pending_changes: Optional[List] = None
+        self._rebuild([])
+
+    def _rebuild(self, rows: List[Dict]):
+        """Replace the in-memory lookups with ones built from the table's rows"""
+        raise NotImplementedError
+
+    def _describe(self) -> str:
+        """What was loaded, appended to the load log line"""
+        return ''
+
+    async def load(self) -> bool:
+        """Rebuild the index from the database"""
+        self._pending_changes = []
+        try:
+            rows = await self._load_rows()
+        finally:
+            pending, self._pending_changes = self._pending_changes, None
+        if rows is None:
+            logger.error(f"Failed to load {self.label} {self.noun}, keeping the current index")
+            return False
+
+        self._rebuild(rows)
+        for apply, args in pending:
+            apply(*args)
+        self.loaded = True
+        logger.info(f"Loaded {len(rows)} {self.label} {self.noun}{self._describe()}")
+        return True
+
+    def _change(self, apply: Callable, *args):
+        """Apply a local change now, and again after a reload that is in flight"""
+        if self._pending_changes is not None:
+            self._pending_changes.append((apply, args))
+        apply(*args)
+
+    async def _read_through(self, read: Optional[Callable[[], Awaitable[Optional[T]]]] = None) -> T:
+        """Startup race: the first load has not finished yet, so ask the database directly"""
+        result = await (read or self._load_rows)()
+        if result is None:
+            raise Exception(f"Failed to load {self.label} {self.noun}")
+        return result
@@ -24,13 +24,11 @@ logger.info(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 logger.info("Checking environment variables...")
 supabase_url = os.environ.get('SUPABASE_URL')
 supabase_key = os.environ.get('SUPABASE_SERVICE_KEY')
-fillaseat_token = os.environ.get('FILLASEAT_DISCORD_BOT_TOKEN')
-houseseats_token = os.environ.get('HOUSESEATS_DISCORD_BOT_TOKEN')
 
 logger.info(f"SUPABASE_URL: {'✓ SET' if supabase_url else '✗ NOT SET'}")
 logger.info(f"SUPABASE_SERVICE_KEY: {'✓ SET' if supabase_key else '✗ NOT SET'}")
-logger.info(f"FILLASEAT_DISCORD_BOT_TOKEN: {'✓ SET' if fillaseat_token else '✗ NOT SET'}")
-logger.info(f"HOUSESEATS_DISCORD_BOT_TOKEN: {'✓ SET' if houseseats_token else '✗ NOT SET'}")
+for token_env in ('FILLASEAT_DISCORD_BOT_TOKEN', 'HOUSESEATS_DISCORD_BOT_TOKEN'):
+	logger.info(f"{token_env}: {'✓ SET' if os.environ.get(token_env) else '✗ NOT SET'}")
 
 try:
 	logger.info("Importing required modules...")
@@ -48,28 +46,44 @@ try:
 	asyncio.set_event_loop(loop)
 	
 	logger.info("Importing bot modules...")
-	import house_seats_bot
-	import fill_a_seat_bot
+	# Each site is a ShowSource plugin; the engine runs any number of them
+	# on one event loop, HTTP pool and database client
+	from house_seats_bot import HouseSeatsSource
+	from fill_a_seat_bot import FillASeatSource
+	from source_engine import SourceEngine
+	from supabase_client import SupabaseDB
+	import http_client
+	import pushover
+	import async_db
+	from metrics import metrics_server
+	from outbox import outbox
 	
 	logger.info("All imports successful!")
+
+	SOURCES = [HouseSeatsSource, FillASeatSource]
+
+	logger.info("Connecting to Supabase database...")
+	db = SupabaseDB()
+	logger.info("Supabase database connection established")
+
+	# Every engine attaches its bot to the shared member_roster.roster,
+	# so one in-memory member list is fed by all gateways
+	engines = [SourceEngine(source(), db) for source in SOURCES]
 	
 	async def main():
-		if not fillaseat_token or not houseseats_token:
+		if not all(engine.token for engine in engines):
 			logger.critical("Bot tokens are missing! Exiting.")
 			return
 
+		# Local Prometheus endpoint plus the event-loop lag sampler
+		await metrics_server.start()
+
 		logger.info("Starting bots...")
 
-		# Create tasks for both bots
 		# We use bot.start() instead of bot.run() because bot.run() is blocking and creates its own loop handling
 		# running multiple bots in the same process requires sharing the asyncio loop
-		tasks = [
-			house_seats_bot.bot.start(houseseats_token),
-			fill_a_seat_bot.bot.start(fillaseat_token)
-		]
-
 		try:
-			await asyncio.gather(*tasks)
+			await asyncio.gather(*(engine.start() for engine in engines))
 		except Exception as e:
 			logger.error(f"Error running bots: {e}", exc_info=True)
 
@@ -84,6 +98,11 @@ try:
 			sys.exit(1)
 		finally:
 			logger.info("Cleaning up...")
+			loop.run_until_complete(metrics_server.stop())
+			loop.run_until_complete(pushover.close_all_dispatchers())
+			loop.run_until_complete(http_client.close_all_clients())
+			async_db.shutdown_executors()
+			outbox.close()
 			loop.close()
 
 except Exception as e:
@@ -0,0 +1,83 @@
+import os
+import time
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often the in-memory state is reloaded from the database even without a write failure
+SHOW_STATE_RESYNC_MINUTES = float(os.environ.get('SHOW_STATE_RESYNC_MINUTES', '60'))
+
+
+class ShowStateStore:
+    """In-memory copy of a platform's current shows, written through to Supabase.
+
+    New shows are diffed against the local copy, so a cycle needs no reads;
+    the copy is reloaded from the database only after a failed write or once
+    the resync interval has passed.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        load_shows: Callable[[], Awaitable[Optional[Dict[str, Dict]]]],
+        commit_shows: Callable[[Dict[str, Dict], Optional[Dict[str, Dict]]], Awaitable[Optional[List[str]]]],
+        resync_minutes: float = SHOW_STATE_RESYNC_MINUTES
+    ):
+        self.label = label
+        self._load_shows = load_shows
+        self._commit_shows = commit_shows
+        self.resync_seconds = resync_minutes * 60
+        self.shows: Dict[str, Dict] = {}
+        self._synced_at: Optional[float] = None
+
+    @property
+    def is_warm(self) -> bool:
+        return self._synced_at is not None
+
+    def needs_resync(self) -> bool:
+        if self._synced_at is None:
+            return True
+        return time.monotonic() - self._synced_at >= self.resync_seconds
+
+    def invalidate(self):
+        self._synced_at = None
+
+    async def warm(self) -> bool:
+        """Load the current shows from the database"""
+        shows = await self._load_shows()
+        if shows is None:
+            logger.error(f"Failed to load {self.label} show state from database")
+            self.invalidate()
+            return False
+        self.shows = shows
+        self._synced_at = time.monotonic()
+        logger.info(f"Loaded {len(shows)} {self.label} shows into show state")
+        return True
+
+    def new_show_ids(self, scraped: Dict[str, Dict]) -> List[str]:
+        return sorted(scraped.keys() - self.shows.keys())
+
+    async def commit(self, scraped: Dict[str, Dict]) -> Optional[List[str]]:
+        """Persist a scraped set and return the new show IDs, or None if the write failed"""
+        if self.needs_resync():
+            await self.warm()
+
+        local_new_ids = self.new_show_ids(scraped) if self.is_warm else None
+        committed_new_ids = await self._commit_shows(scraped, self.shows if self.is_warm else None)
+        if committed_new_ids is None:
+            # The database may now differ from memory, reload before the next diff
+            self.invalidate()
+            return None
+
+        if local_new_ids is not None and local_new_ids != sorted(committed_new_ids):
+            # Something else changed the table; trust the database, memory is replaced below
+            logger.warning(
+                f"{self.label} show state disagreed with database "
+                f"(local {len(local_new_ids)} new, database {len(committed_new_ids)} new)"
+            )
+
+        self.shows = dict(scraped)
+        if not self.is_warm:
+            self._synced_at = time.monotonic()
+        return sorted(committed_new_ids)
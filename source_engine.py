@@ -0,0 +1,806 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import discord
+from discord.ext import tasks
+
+from supabase_client import SupabaseDB
+from async_db import AsyncSupabaseDB
+from http_client import HTTPResponse, ListingFingerprint
+from show_state import ShowStateStore
+from resynced_index import ResyncedIndex
+from blacklist_index import BlacklistIndex
+from watch_rules import (
+    WatchRuleIndex, WATCH_RULES_PER_USER, INCLUDE, EXCLUDE, KEYWORD, REGEX, validate_pattern
+)
+from subscriptions import SubscriberRegistry, ACTIVE, PAUSED, UNDELIVERABLE
+from dm_fanout import DMFanout, DM_BATCH_SIZE, batched
+from member_roster import roster, RosterRecipient
+from media_cache import media_cache
+from pushover import PushoverDispatcher
+from listing_embeds import ListingEmbedCache
+from blacklist_buttons import BlacklistButtonHandler
+from poll_scheduler import PollScheduler, PST_TIMEZONE, POLL_MAX_INTERVAL_SECONDS
+from tracing import DropTrace
+from outbox import outbox, CHANNEL_POST, OUTBOX_RETRY_SECONDS, OUTBOX_RETRY_MAX_SECONDS
+from metrics import SCRAPE_DURATION, SCRAPE_CYCLES, SHOWS_SEEN, NEW_SHOWS, LOGINS
+
+logger = logging.getLogger(__name__)
+
+
+class SessionExpired(Exception):
+    """Raised by ShowSource.fetch when the site needs a fresh login"""
+
+
+class ShowSource:
+    """One ticket site: how to log in, fetch its listing and parse shows from it.
+
+    Subclasses fill in the class attributes and the login/fetch/parse hooks;
+    SourceEngine owns everything after that (diffing, persistence, polling,
+    listings, alerts and DMs), so a new site is only this class.
+    """
+
+    # Table prefix in sql/schema.sql, e.g. 'houseseats' for houseseats_current_shows
+    platform = ''
+    # Name used in logs and error messages
+    label = ''
+    # Title of the Pushover alert for a new show
+    alert_title = ''
+    # Environment variables with the site's Discord bot token, alert channel and Pushover app token
+    token_env = ''
+    channel_env = ''
+    pushover_env = ''
+    # Prepended to the blacklist command names, e.g. 'fillaseat_'
+    command_prefix = ''
+    all_shows_command = ''
+    current_shows_command = ''
+    # Names the site in command descriptions and replies, e.g. 'FillASeat ' (empty for none)
+    display_prefix = ''
+    # DM blacklist buttons: the lone-button label and the per-show label when a DM has several
+    button_style = discord.ButtonStyle.primary
+    button_label = "🚫 Blacklist Show"
+    button_label_format = "🚫 {name}"
+    # Thumbnail on the current-shows listing pages
+    listing_thumbnails = False
+    # Treat an empty listing or any fetch error as a stale session and log in once before giving up
+    empty_means_expired = False
+    relogin_on_error = False
+
+    def __init__(self):
+        # Last processed listing, so unchanged listings skip the rest of the cycle
+        self.fingerprint = ListingFingerprint(self.label)
+
+    def should_poll(self) -> bool:
+        """Called before each cycle inside the polling window; False skips the cycle"""
+        return True
+
+    async def login(self):
+        """Start a new session on the site, raising if that fails"""
+        raise NotImplementedError
+
+    async def fetch(self, after_login: bool = False) -> Optional[List[HTTPResponse]]:
+        """Fetch the listing, None on a 304; raise SessionExpired when a login is needed"""
+        raise NotImplementedError
+
+    def parse(self, responses: List[HTTPResponse]) -> Dict[str, Dict]:
+        """Map show ID -> {'name', 'url', 'image_url'} from the fetched listing"""
+        raise NotImplementedError
+
+
+class SourceEngine:
+    """Runs one ShowSource end to end on its own Discord bot.
+
+    Every engine shares the database client, the pooled HTTP clients, the
+    media cache and the member roster; only the bot, its DM fan-out and the
+    per-platform state are its own.
+    """
+
+    def __init__(self, source: ShowSource, db: SupabaseDB):
+        self.source = source
+        self.label = source.label
+        platform = source.platform
+        self.token = os.environ.get(source.token_env)
+        self.channel_id = int(os.environ.get(source.channel_env))
+        self.blacklist_name = f"{source.display_prefix}blacklist"
+
+        # Pushover alerts are queued and sent in the background to every configured recipient key
+        self.pushover = PushoverDispatcher(self.label, os.environ.get(source.pushover_env))
+
+        # Initialize Discord bot with necessary intents and application commands
+        intents = discord.Intents.default()
+        intents.guilds = True
+        intents.members = True
+        self.bot = discord.Bot(intents=intents)
+
+        # Member list kept current from gateway events, shared with the other bots
+        roster.attach(self.bot)
+
+        # Concurrent, rate-limit-aware DM delivery for this bot's token
+        self.dm_fanout = DMFanout(self.label)
+        # User ID -> DM channel ID with this bot, so repeat DMs skip create_dm
+        self.dm_channels: Dict[int, int] = {}
+
+        # Awaitable views of the database: one for commands, one reserved for the scrape pipeline
+        self.adb = AsyncSupabaseDB(db)
+        self.pipeline_db = AsyncSupabaseDB(db, pipeline=True)
+        adb, pipeline_db = self.adb, self.pipeline_db
+
+        # In-memory current shows, written through to Supabase on every commit
+        self.show_state = ShowStateStore(
+            self.label,
+            functools.partial(pipeline_db.get_existing_shows, platform),
+            functools.partial(pipeline_db.commit_cycle, platform)
+        )
+
+        # In-memory blacklists so fan-out filtering needs no query
+        self.blacklist_index = BlacklistIndex(
+            self.label,
+            functools.partial(pipeline_db.get_all_user_blacklists, platform),
+            functools.partial(pipeline_db.get_user_blacklists_for_shows, platform)
+        )
+
+        # In-memory include/exclude watch rules, compiled into one matcher per platform
+        self.watch_rules = WatchRuleIndex(self.label, functools.partial(pipeline_db.get_all_user_watch_rules, platform))
+
+        # In-memory subscription statuses; only active subscribers are sent DMs
+        self.subscribers = SubscriberRegistry(self.label, functools.partial(pipeline_db.get_all_subscriptions, platform))
+
+        # One listener answers every DM blacklist button, decoding the show and user from its custom_id
+        self.blacklist_buttons = BlacklistButtonHandler(
+            self.label,
+            self.blacklist_index,
+            functools.partial(adb.add_user_blacklist, platform),
+            functools.partial(adb.get_all_shows_name, platform),
+            style=source.button_style,
+            default_label=source.button_label,
+            added_message=f"**`{{name}}`** has been added to your {self.blacklist_name}."
+        )
+        self.blacklist_buttons.attach(self.bot)
+
+        # Poll interval learned from when shows have historically appeared
+        self.poll_scheduler = PollScheduler(
+            self.label,
+            functools.partial(pipeline_db.get_first_seen_dates, platform),
+            PST_TIMEZONE
+        )
+
+        # Pre-rendered pages for the show-listing commands
+        self.current_listing = ListingEmbedCache(
+            f"Currently Available {source.display_prefix}Shows",
+            discord.Color.green(),
+            functools.partial(adb.get_current_shows, platform),
+            "No current shows available.",
+            thumbnails=source.listing_thumbnails
+        )
+        self.all_listing = ListingEmbedCache(
+            f"All {source.display_prefix}Shows History",
+            discord.Color.blue(),
+            functools.partial(adb.get_all_shows, platform),
+            "No shows found in the database."
+        )
+
+        self.session_stats = {'logins': 0, 'reused_cycles': 0, 'reused_cycles_streak': 0}
+        # Strong references to in-flight notification tasks so they are not garbage collected
+        self.background_tasks = set()
+        # Drains in a row that left messages undelivered, and whether a retry drain is already waiting
+        self.drain_failures = 0
+        self.drain_retry_scheduled = False
+
+        # The interval is replaced after every iteration by the poll scheduler
+        self.scraping_task = tasks.loop(seconds=POLL_MAX_INTERVAL_SECONDS)(self._scraping_iteration)
+        self.scraping_task.before_loop(self._before_scraping)
+        self.resync_tasks = self._resync_loops(self.blacklist_index, self.watch_rules, self.subscribers)
+
+        for event in ('on_ready', 'on_connect', 'on_disconnect', 'on_resumed'):
+            self.bot.add_listener(getattr(self, event), event)
+        self._register_commands()
+
+    @staticmethod
+    def _resync_loops(*indexes: ResyncedIndex) -> List[tasks.Loop]:
+        """One loop per index reloading it every resync_minutes; the first iteration runs at startup and loads it"""
+        return [tasks.loop(minutes=index.resync_minutes)(index.load) for index in indexes]
+
+    async def start(self):
+        logger.info(f"Starting {self.label} Discord bot...")
+        await self.bot.start(self.token)
+
+    async def send_discord_message(self, message_text=None, embeds=None, nonce=None):
+        try:
+            # The gateway caches the channel; only a miss costs a REST call
+            channel = self.bot.get_channel(self.channel_id)
+            if channel is None:
+                await self.dm_fanout.limiter.acquire()
+                channel = await self.bot.fetch_channel(self.channel_id)
+            if channel is None:
+                logger.error(f"Channel with ID {self.channel_id} not found.")
+                return False
+            # Discord drops a repeated nonce, so an outbox retry cannot post twice
+            extra = {'nonce': nonce, 'enforce_nonce': True} if nonce else {}
+            # Posts share the bot token's global rate limit with the DM fan-out running beside them
+            await self.dm_fanout.limiter.acquire()
+            if embeds:
+                await channel.send(content=message_text, embeds=embeds, **extra)
+            else:
+                await channel.send(content=message_text, **extra)
+            logger.info("Discord message sent successfully!")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send Discord message. Error: {e}")
+        return False
+
+    async def _fetch_and_parse(self, after_login: bool, marks: Dict[str, float]) -> Optional[Dict[str, Dict]]:
+        source = self.source
+        marks['polled'] = time.time()
+        responses = await source.fetch(after_login)
+        marks['fetched'] = time.time()
+        if responses is None or source.fingerprint.is_unchanged(*responses):
+            source.fingerprint.mark_skipped()
+            return None
+        shows = source.parse(responses)
+        marks['parsed'] = time.time()
+        if not shows and source.empty_means_expired and not after_login:
+            # The session might be stale even though nothing errored
+            raise SessionExpired("listing came back empty")
+        logger.info(f"Processed {len(shows)} valid {self.label} shows from {len(responses)} response(s)")
+        return shows
+
+    async def fetch_shows(self, marks: Dict[str, float]) -> Optional[Dict[str, Dict]]:
+        """Scrape the listing on the saved session, logging in only when it has expired.
+        Returns None when the listing has not changed; marks gets the stage timestamps.
+        """
+        stats = self.session_stats
+        try:
+            shows = await self._fetch_and_parse(False, marks)
+        except Exception as e:
+            if not isinstance(e, SessionExpired) and not self.source.relogin_on_error:
+                raise
+            logger.info(f"{self.label} session expired ({e}), logging in")
+            stats['reused_cycles_streak'] = 0
+            logger.info(f"Attempting to login to {self.label}...")
+            await self.source.login()
+            stats['logins'] += 1
+            LOGINS.inc(platform=self.label)
+            logger.info(f"{self.label} login successful")
+            try:
+                return await self._fetch_and_parse(True, marks)
+            except SessionExpired:
+                raise Exception(f"{self.label} login did not produce a valid session")
+
+        stats['reused_cycles'] += 1
+        stats['reused_cycles_streak'] += 1
+        logger.info(
+            f"Reused {self.label} session ({stats['reused_cycles_streak']} cycles in a row, "
+            f"{stats['reused_cycles']} total, {stats['logins']} logins)"
+        )
+        return shows
+
+    async def commit_shows(self, shows: Dict[str, Dict]) -> List[str]:
+        logger.info(f"Committing {len(shows)} current {self.label} shows to database")
+        new_show_ids = await self.show_state.commit(shows)
+        if new_show_ids is None:
+            raise Exception(f"Failed to commit {self.label} shows to the database")
+        logger.info("Current shows committed successfully")
+        return new_show_ids
+
+    async def refresh_listing_embeds(self, current_shows: Dict[str, Dict], new_show_ids: List[str]):
+        """Re-render the listing command pages after a successful commit"""
+        try:
+            rows = [{'id': show_id, **show_info} for show_id, show_info in current_shows.items()]
+            rows.sort(key=lambda show: show['name'].casefold())
+            await self.current_listing.refresh(rows)
+            if new_show_ids or self.all_listing.messages is None:
+                await self.all_listing.refresh()
+        except Exception as e:
+            logger.error(f"Failed to render {self.label} listing embeds: {e}")
+
+    async def scrape_and_process(self):
+        logger.info(f"Starting {self.label} scrape and process cycle")
+        # Metrics are labelled with the display name, as DMFanout and PushoverDispatcher only know that
+        platform = self.label
+        start = time.perf_counter()
+        outcome = 'error'
+        # Wall-clock stage timestamps shared by the drop traces of this cycle's new shows
+        marks: Dict[str, float] = {}
+        try:
+            shows = await self.fetch_shows(marks)
+            if shows is None:
+                outcome = 'unchanged'
+                return
+
+            # Queue alerts for the shows the in-memory diff finds new before committing them,
+            # so no crash between the commit and the fan-out can lose the alerts
+            predicted_ids = self.show_state.new_show_ids(shows) if self.show_state.is_warm else []
+            await self.enqueue_alerts({show_id: shows[show_id] for show_id in predicted_ids})
+
+            # Persist the scraped set in a single round trip; the database reports which shows are new
+            try:
+                new_show_ids = await self.commit_shows(shows)
+            except Exception:
+                # Nothing drains these before the next drop, and the next cycle predicts anew
+                await outbox.cancel(self.source.platform, predicted_ids)
+                raise
+            # The diff is part of the commit, so this is also when the new shows are known
+            marks['committed'] = time.time()
+            # The database has the final say on which shows are new
+            await outbox.cancel(self.source.platform, set(predicted_ids) - set(new_show_ids))
+            await self.enqueue_alerts({show_id: shows[show_id] for show_id in new_show_ids if show_id not in predicted_ids})
+            # An empty listing may mean a stale session, so never let it short-circuit the re-login check
+            if shows:
+                self.source.fingerprint.commit()
+            new_shows = {show_id: shows[show_id] for show_id in new_show_ids}
+            logger.info(f"Found {len(new_shows)} new shows out of {len(shows)} total shows")
+            SHOWS_SEEN.set(len(shows), platform=platform)
+            NEW_SHOWS.inc(len(new_shows), platform=platform)
+            outcome = 'processed'
+
+            if new_shows:
+                self.poll_scheduler.record_drop(datetime.now(PST_TIMEZONE), len(new_shows))
+                logger.info("New shows found! Starting user notifications...")
+                # Notify in the background so the next poll is not held up by the fan-out
+                traces = {
+                    show_id: DropTrace(self.label, show_id, show_info['name'], marks)
+                    for show_id, show_info in new_shows.items()
+                }
+                self.run_in_background(self.notify_users_about_new_shows(new_shows, traces))
+            else:
+                logger.info("No new shows found in this cycle")
+
+            try:
+                # Finished alerts of delisted shows go, so a show that comes back is alerted again
+                await outbox.prune(self.source.platform, shows.keys())
+            except Exception as e:
+                logger.error(f"Failed to prune the {self.label} outbox: {e}")
+            await self.refresh_listing_embeds(shows, new_show_ids)
+
+        except Exception as e:
+            error_message = f"An error occurred in {self.label} scraping: {e}"
+            logger.error(error_message, exc_info=True)
+            await self.send_discord_message(message_text=error_message)
+        finally:
+            SCRAPE_DURATION.observe(time.perf_counter() - start, platform=platform)
+            SCRAPE_CYCLES.inc(platform=platform, outcome=outcome)
+            logger.info(f"{self.label} scrape and process cycle completed")
+
+    def run_in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def enqueue_alerts(self, new_shows: Dict[str, Dict]):
+        """Write the channel post and every user's DMs for new shows to the outbox"""
+        if not new_shows:
+            return
+        # Active subscribers who are still in a server with the bot
+        user_ids = await self.subscribers.active_among(await roster.user_ids_for(self.bot))
+        user_blacklists = await self.blacklist_index.for_shows(new_shows.keys())
+        # Every show name is matched once against all users' watch rules
+        watch = await self.watch_rules.evaluate(new_shows)
+
+        # Each user's DMs exclude blacklisted and unwatched shows and pack up to DM_BATCH_SIZE shows per message
+        dm_batches = []
+        for user_id in user_ids:
+            blacklisted_show_ids = user_blacklists.get(user_id, set())
+            show_ids = [
+                show_id for show_id in new_shows
+                if show_id not in blacklisted_show_ids and watch.allows(user_id, show_id)
+            ]
+            dm_batches.extend((user_id, batch) for batch in batched(show_ids, DM_BATCH_SIZE))
+
+        queued = await outbox.enqueue(self.source.platform, new_shows, self.channel_id, dm_batches)
+        logger.info(f"Queued {queued} {self.label} alert rows for {len(new_shows)} shows and {len(user_ids)} subscribers")
+
+    async def notify_users_about_new_shows(self, new_shows: Dict[str, Dict], traces: Optional[Dict[str, DropTrace]] = None):
+        """Deliver the queued alerts; new_shows only names the drop in the log, the outbox has the rest"""
+        logger.info(f"Notifying users about {len(new_shows)} new {self.label} shows")
+        traces = traces or {}
+        for trace in traces.values():
+            trace.hold('notify')
+        try:
+            await self.drain_outbox(traces)
+        finally:
+            for trace in traces.values():
+                trace.release('notify')
+
+    async def drain_outbox(self, traces: Optional[Dict[str, DropTrace]] = None):
+        """Send every pending outbox message of this platform, including ones left by a restart"""
+        messages, shows = await outbox.claim(self.source.platform)
+        if not messages:
+            return
+        try:
+            await self._deliver(messages, shows, traces or {})
+        finally:
+            undelivered = await outbox.release(message.key for message in messages)
+            if undelivered:
+                self._retry_drain_later(undelivered)
+            else:
+                self.drain_failures = 0
+
+    def _retry_drain_later(self, undelivered: int):
+        """Drain again soon, so undelivered alerts do not wait for the next drop"""
+        delay = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_SECONDS * 2 ** self.drain_failures)
+        self.drain_failures += 1
+        if self.drain_retry_scheduled:
+            return
+        self.drain_retry_scheduled = True
+        logger.warning(f"{undelivered} {self.label} outbox messages undelivered, retrying in {delay:.0f}s")
+
+        async def retry():
+            await asyncio.sleep(delay)
+            self.drain_retry_scheduled = False
+            try:
+                await self.drain_outbox()
+            except Exception as e:
+                logger.error(f"Error retrying the {self.label} outbox: {e}")
+
+        self.run_in_background(retry())
+
+    async def _deliver(self, messages, shows: Dict[str, Dict], traces: Dict[str, DropTrace]):
+        channel_posts = {message.show_ids[0]: message for message in messages if message.channel == CHANNEL_POST}
+        dm_messages = [message for message in messages if message.channel != CHANNEL_POST]
+
+        if self.subscribers.loaded:
+            # Queued before the user paused or became unreachable
+            skipped = [message for message in dm_messages if message.recipient_id not in self.subscribers.active]
+            if skipped:
+                await outbox.skip(message.key for message in skipped)
+                logger.info(f"Skipped {len(skipped)} queued {self.label} DMs to users no longer subscribed")
+                dm_messages = [message for message in dm_messages if message.recipient_id in self.subscribers.active]
+
+        # One image check per show, shared by its channel post and its DMs. Shows posted in this
+        # drain wait for the image to be published; the rest were posted before a restart
+        async def image_ready(show_id):
+            url = shows[show_id]['image_url']
+            if not url:
+                return False
+            try:
+                return await (media_cache.wait_until_ready(url) if show_id in channel_posts else media_cache.is_ready(url))
+            except Exception as e:
+                logger.warning(f"Could not check {self.label} image {url}, sending without it: {e}")
+                return False
+
+        show_ids = list(dict.fromkeys([*channel_posts, *(show_id for message in dm_messages for show_id in message.show_ids)]))
+        image_checks = {show_id: asyncio.ensure_future(image_ready(show_id)) for show_id in show_ids}
+        try:
+            await asyncio.gather(
+                self._post_to_channel(channel_posts, shows, image_checks, traces),
+                self._send_dms(dm_messages, shows, image_checks, traces)
+            )
+        finally:
+            for check in image_checks.values():
+                check.cancel()
+
+    async def _post_to_channel(self, channel_posts, shows: Dict[str, Dict], image_checks, traces: Dict[str, DropTrace]):
+        """Post each show to the channel as soon as its image is published (or has timed out)"""
+        async def checked(show_id):
+            return show_id, await image_checks[show_id]
+
+        for next_done in asyncio.as_completed([checked(show_id) for show_id in channel_posts]):
+            show_id, ready = await next_done
+            show_info = shows[show_id]
+            message = channel_posts[show_id]
+            embed = discord.Embed(
+                title=f"{show_info['name']} (Show ID: {show_id})",
+                url=show_info['url'],
+                color=discord.Color.red()
+            )
+            if ready:
+                embed.set_image(url=show_info['image_url'])
+
+            if await self.send_discord_message(embeds=[embed], nonce=message.key):
+                outbox.mark_sent(message.key)
+                if show_id in traces:
+                    traces[show_id].mark('channel_posted')
+
+            # A retried channel post does not page anyone again, even after a crash
+            if not message.pushover_sent:
+                outbox.mark_pushover_sent(message.key)
+                self.pushover.notify(
+                    message=f"{show_info['name']}",
+                    title=self.source.alert_title,
+                    url=show_info['url'],
+                    image_url=show_info['image_url'] if ready else None,
+                    trace=traces.get(show_id)
+                )
+
+            logger.info(f"Posted {self.label} show to channel: {show_info['name']}")
+
+    async def _send_dms(self, dm_messages, shows: Dict[str, Dict], image_checks, traces: Dict[str, DropTrace]):
+        """Fan the queued DMs out; each DM waits only for the images of the shows it carries"""
+        if not dm_messages:
+            return
+
+        # Each show's DM embed is built once, when its image check is done, and reused for every user
+        dm_embeds: Dict[str, asyncio.Future] = {}
+
+        async def build_embed(show_id):
+            show_info = shows[show_id]
+            embed = discord.Embed(
+                title=f"{show_info['name']} (Show ID: {show_id})",
+                url=show_info['url']
+            )
+            if await image_checks[show_id]:
+                embed.set_image(url=show_info['image_url'])
+            return embed
+
+        async def prepare(kwargs):
+            batch = kwargs['show_ids']
+            for show_id in batch:
+                if show_id not in dm_embeds:
+                    dm_embeds[show_id] = asyncio.ensure_future(build_embed(show_id))
+            embeds = await asyncio.gather(*(dm_embeds[show_id] for show_id in batch))
+            return {**{key: value for key, value in kwargs.items() if key != 'show_ids'}, 'embeds': list(embeds)}
+
+        # The outbox key is the nonce, so it tells which shows a delivered DM carried
+        batches = {message.key: message.show_ids for message in dm_messages}
+
+        def on_dm_sent(message):
+            outbox.mark_sent(message['nonce'])
+            for show_id in batches[message['nonce']]:
+                trace = traces.get(show_id)
+                if trace is not None:
+                    trace.dm_delivered()
+
+        # Users Discord refuses to DM are not sent to again until they resubscribe
+        undeliverable = []
+
+        def on_dm_forbidden(recipient):
+            self.subscribers.set(recipient.id, UNDELIVERABLE)
+            undeliverable.append(recipient.id)
+
+        # Each user's queued DMs, in order, with the outbox key as the Discord nonce
+        user_messages: Dict[int, List[Dict]] = {}
+        for message in dm_messages:
+            batch = message.show_ids
+            # One blacklist button per show in the message
+            buttons = [
+                (show_id, self.source.button_label_format.format(name=shows[show_id]['name']) if len(batch) > 1 else None)
+                for show_id in batch
+            ]
+            user_messages.setdefault(message.recipient_id, []).append({
+                'show_ids': batch,
+                'view': self.blacklist_buttons.view(message.recipient_id, buttons),
+                'nonce': message.key,
+                'enforce_nonce': True
+            })
+        deliveries = [(RosterRecipient(self.bot, user_id, self.dm_channels), kwargs) for user_id, kwargs in user_messages.items()]
+        logger.info(f"Sending {len(dm_messages)} {self.label} DMs to {len(deliveries)} users")
+
+        # Send to all users concurrently, paced by Discord's rate limits
+        result = await self.dm_fanout.run(deliveries, on_sent=on_dm_sent, on_forbidden=on_dm_forbidden, prepare=prepare)
+        logger.info(f"Completed {self.label} show notifications to all users: {result}")
+        if undeliverable and await self.pipeline_db.set_subscription_status(self.source.platform, undeliverable, UNDELIVERABLE):
+            logger.info(f"Marked {len(undeliverable)} {self.label} subscribers undeliverable")
+
+    async def _scraping_iteration(self):
+        current_time = datetime.now(PST_TIMEZONE)
+        logger.info(f"{self.label} task started at {current_time.strftime('%Y-%m-%d %H:%M:%S PST')}")
+
+        try:
+            if self.poll_scheduler.needs_relearn():
+                try:
+                    await self.poll_scheduler.learn()
+                except Exception as e:
+                    # The current schedule still works, so the scrape goes ahead
+                    logger.error(f"Failed to relearn the {self.label} poll schedule: {e}")
+
+            # Check if current time is within the polling window (6 AM - 5 PM PST by default)
+            if not self.poll_scheduler.in_window(current_time):
+                logger.info(f"Outside operating hours (current: {current_time.hour}:00 PST), skipping scrape")
+            elif self.source.should_poll():
+                logger.info("Within operating hours, proceeding with scraping")
+                await self.scrape_and_process()
+        finally:
+            # Poll hot hours more often and cold hours less, within the daily budget
+            interval = self.poll_scheduler.next_interval()
+            self.scraping_task.change_interval(seconds=interval)
+            logger.info(f"{self.label} task cycle completed, next poll in {interval:.0f}s")
+
+    async def _before_scraping(self):
+        logger.info(f"Waiting for {self.label} bot to be ready...")
+        await self.bot.wait_until_ready()
+        # Nothing here may keep the loop from starting: each step is retried or resynced later
+        try:
+            await self.show_state.warm()
+        except Exception as e:
+            logger.error(f"Failed to warm {self.label} show state: {e}")
+        # Alerts a restart left undelivered go out first, from where they stopped
+        self.run_in_background(self.drain_outbox())
+        for listing in (self.current_listing, self.all_listing):
+            try:
+                await listing.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh {self.label} listing '{listing.title}': {e}")
+        logger.info(f"{self.label} bot is ready, starting periodic scraping task...")
+
+    async def on_ready(self):
+        bot = self.bot
+        logger.info(f"{self.label} Bot logged in as {bot.user} (ID: {bot.user.id})")
+        logger.info(f"Bot is connected to {len(bot.guilds)} guild(s)")
+        for guild in bot.guilds:
+            logger.info(f"  - {guild.name} (ID: {guild.id}) - {guild.member_count} members")
+
+        for task in self.resync_tasks:
+            if not task.is_running():
+                task.start()
+
+        if not self.scraping_task.is_running():
+            logger.info(f"Starting {self.label} periodic scraping task...")
+            self.scraping_task.start()
+
+    async def on_connect(self):
+        logger.info(f"{self.label} Bot connected to Discord")
+
+    async def on_disconnect(self):
+        logger.warning(f"{self.label} Bot disconnected from Discord")
+
+    async def on_resumed(self):
+        logger.info(f"{self.label} Bot resumed connection to Discord")
+
+    def _register_commands(self):
+        source, adb, platform = self.source, self.adb, self.source.platform
+        blacklist_name = self.blacklist_name
+        prefix = source.command_prefix
+
+        @self.bot.slash_command(name=f"{prefix}blacklist_add", description=f"Add a show to your {blacklist_name}")
+        async def blacklist_add(ctx, show_id: str = discord.Option(description="Show ID to blacklist")):
+            user_id = ctx.author.id
+            try:
+                # Any show ever seen can be blacklisted, not just current ones
+                show_name = await adb.get_all_shows_name(platform, show_id)
+                if show_name:
+                    if not await adb.add_user_blacklist(platform, user_id, show_id):
+                        raise Exception("Blacklist write failed")
+                    self.blacklist_index.add(user_id, show_id)
+                    await ctx.respond(f"**`{show_name}`** has been added to your {blacklist_name}.", ephemeral=True)
+                else:
+                    await ctx.respond(f"Show ID not found in the {source.display_prefix}shows list. Please check the ID and try again.", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error adding show to {self.label} blacklist: {e}")
+                await ctx.respond(f"An error occurred while adding to the {blacklist_name}.", ephemeral=True)
+
+        @self.bot.slash_command(name=f"{prefix}blacklist_remove", description=f"Remove a show from your {blacklist_name}")
+        async def blacklist_remove(ctx, show_id: str = discord.Option(description="Show ID to remove from blacklist")):
+            user_id = ctx.author.id
+            try:
+                show_name = await adb.get_current_shows_name(platform, show_id)
+                if show_name:
+                    if not await adb.remove_user_blacklist(platform, user_id, show_id):
+                        raise Exception("Blacklist write failed")
+                    self.blacklist_index.remove(user_id, show_id)
+                    await ctx.respond(f"**`{show_name}`** has been removed from your {blacklist_name}.", ephemeral=True)
+                else:
+                    await ctx.respond("Show ID not found. Please check the ID and try again.", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error removing show from {self.label} blacklist: {e}")
+                await ctx.respond(f"An error occurred while removing from the {blacklist_name}.", ephemeral=True)
+
+        @self.bot.slash_command(name=f"{prefix}blacklist_list", description=f"List all shows in your {blacklist_name}")
+        async def blacklist_list(ctx):
+            user_id = ctx.author.id
+            try:
+                show_names = await adb.get_user_blacklists_names(platform, user_id)
+                if show_names:
+                    await ctx.respond(f"Your {source.display_prefix}blacklisted shows:\n" + "\n".join(show_names), ephemeral=True)
+                else:
+                    await ctx.respond(f"Your {blacklist_name} is empty.", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error fetching {self.label} blacklist: {e}")
+                await ctx.respond(f"An error occurred while fetching your {blacklist_name}.", ephemeral=True)
+
+        watch_name = f"{source.display_prefix}watch rules"
+
+        @self.bot.slash_command(name=f"{prefix}watch_add", description=f"Only get (include) or never get (exclude) {source.display_prefix}shows matching a keyword or regex")
+        async def watch_add(
+            ctx,
+            kind: str = discord.Option(description="include: only alert on matching shows; exclude: never alert on them", choices=[INCLUDE, EXCLUDE]),
+            pattern: str = discord.Option(description="Keyword (case-insensitive) or regular expression to match show names"),
+            regex: bool = discord.Option(description="Treat the pattern as a regular expression", default=False)
+        ):
+            user_id = ctx.author.id
+            pattern_type = REGEX if regex else KEYWORD
+            pattern = pattern.strip()
+            try:
+                problem = validate_pattern(pattern_type, pattern)
+                if problem:
+                    await ctx.respond(problem, ephemeral=True)
+                    return
+                if len(self.watch_rules.rules_for(user_id)) >= WATCH_RULES_PER_USER:
+                    await ctx.respond(f"You already have {WATCH_RULES_PER_USER} {watch_name}. Remove one first.", ephemeral=True)
+                    return
+                if not await adb.add_user_watch_rule(platform, user_id, kind, pattern_type, pattern):
+                    raise Exception("Watch rule write failed")
+                self.watch_rules.add(user_id, kind, pattern_type, pattern)
+                await ctx.respond(f"Added {kind} {pattern_type} **`{pattern}`** to your {watch_name}.", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error adding {self.label} watch rule: {e}")
+                await ctx.respond(f"An error occurred while adding to your {watch_name}.", ephemeral=True)
+
+        @self.bot.slash_command(name=f"{prefix}watch_remove", description=f"Remove one of your {watch_name}")
+        async def watch_remove(
+            ctx,
+            kind: str = discord.Option(description="Whether the rule includes or excludes shows", choices=[INCLUDE, EXCLUDE]),
+            pattern: str = discord.Option(description="The rule's keyword or regular expression, as listed"),
+            regex: bool = discord.Option(description="The rule is a regular expression", default=False)
+        ):
+            user_id = ctx.author.id
+            pattern_type = REGEX if regex else KEYWORD
+            pattern = pattern.strip()
+            try:
+                if (kind, pattern_type, pattern) not in self.watch_rules.rules_for(user_id):
+                    await ctx.respond(f"No such rule in your {watch_name}. Use /{prefix}watch_list to see them.", ephemeral=True)
+                    return
+                if not await adb.remove_user_watch_rule(platform, user_id, kind, pattern_type, pattern):
+                    raise Exception("Watch rule write failed")
+                self.watch_rules.remove(user_id, kind, pattern_type, pattern)
+                await ctx.respond(f"Removed {kind} {pattern_type} **`{pattern}`** from your {watch_name}.", ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error removing {self.label} watch rule: {e}")
+                await ctx.respond(f"An error occurred while removing from your {watch_name}.", ephemeral=True)
+
+        @self.bot.slash_command(name=f"{prefix}watch_list", description=f"List your {watch_name}")
+        async def watch_list(ctx):
+            rules = self.watch_rules.rules_for(ctx.author.id)
+            if not rules:
+                await ctx.respond(f"You have no {watch_name}, so you get every show you have not blacklisted.", ephemeral=True)
+                return
+            lines = [f"• {kind} {pattern_type} **`{pattern}`**" for kind, pattern_type, pattern in rules]
+            if any(kind == INCLUDE for kind, _, _ in rules):
+                footer = "You only get shows matching an include rule and no exclude rule."
+            else:
+                footer = "You get every show except those matching an exclude rule."
+            await ctx.respond(f"Your {watch_name}:\n" + "\n".join(lines) + f"\n{footer}", ephemeral=True)
+
+        alerts_name = f"{source.display_prefix}show DMs"
+
+        async def set_subscription(ctx, status: str, reply: str):
+            user_id = ctx.author.id
+            try:
+                if not await adb.set_subscription_status(platform, [user_id], status):
+                    raise Exception("Subscription write failed")
+                self.subscribers.set(user_id, status)
+                await ctx.respond(reply, ephemeral=True)
+            except Exception as e:
+                logger.error(f"Error updating {self.label} subscription: {e}")
+                await ctx.respond(f"An error occurred while updating your {alerts_name}.", ephemeral=True)
+
+        @self.bot.slash_command(name=f"{prefix}subscribe", description=f"Get {alerts_name} when new {source.display_prefix}shows appear")
+        async def subscribe(ctx):
+            # Also clears an undeliverable mark, e.g. after the user opened their DMs again
+            await set_subscription(ctx, ACTIVE, f"You are subscribed to {alerts_name}. Make sure your DMs are open to this server.")
+
+        @self.bot.slash_command(name=f"{prefix}pause", description=f"Stop {alerts_name} until you resume them")
+        async def pause(ctx):
+            if self.subscribers.status.get(ctx.author.id) is None:
+                await ctx.respond(f"You are not subscribed to {alerts_name}. Use /{prefix}subscribe to start.", ephemeral=True)
+                return
+            await set_subscription(ctx, PAUSED, f"Your {alerts_name} are paused. Use /{prefix}resume to get them again.")
+
+        @self.bot.slash_command(name=f"{prefix}resume", description=f"Resume paused {alerts_name}")
+        async def resume(ctx):
+            if self.subscribers.status.get(ctx.author.id) is None:
+                await ctx.respond(f"You are not subscribed to {alerts_name}. Use /{prefix}subscribe to start.", ephemeral=True)
+                return
+            await set_subscription(ctx, ACTIVE, f"Your {alerts_name} are back on.")
+
+        @self.bot.slash_command(name=source.all_shows_command, description=f"List all {source.display_prefix}shows ever seen")
+        async def all_shows(ctx):
+            try:
+                # Pages are pre-rendered after each scrape commit
+                await self.all_listing.respond(ctx)
+            except Exception as e:
+                logger.error(f"Error fetching all {self.label} shows: {e}")
+                await ctx.respond("An error occurred while fetching the shows.", ephemeral=True)
+
+        @self.bot.slash_command(name=source.current_shows_command, description=f"List currently available {source.display_prefix}shows")
+        async def current_shows(ctx):
+            try:
+                # Pages are pre-rendered after each scrape commit
+                await self.current_listing.respond(ctx)
+            except Exception as e:
+                logger.error(f"Error fetching current {self.label} shows: {e}")
+                await ctx.respond("An error occurred while fetching the shows.", ephemeral=True)
@@ -0,0 +1,67 @@
+-- Commit one scrape cycle for a platform in a single call.
+--
+-- p_shows is a JSON array of {id, name, url, image_url} objects holding the
+-- full scraped listing. In one transaction the function:
+--   * upserts new or renamed shows into <platform>_all_shows
+--   * deletes shows from <platform>_current_shows that are no longer listed
+--   * upserts new or changed shows into <platform>_current_shows
+-- and returns the IDs that were not in <platform>_current_shows before.
+-- Unchanged rows are not rewritten, so a quiet cycle writes nothing.
+--
+-- Called from SupabaseDB.commit_cycle via client.rpc('commit_show_cycle', ...).
+
+create or replace function commit_show_cycle(p_platform text, p_shows jsonb)
+returns text[]
+language plpgsql
+set search_path = public
+as $$
+declare
+    v_all text;
+    v_current text;
+    v_new_ids text[];
+begin
+    if p_platform not in ('houseseats', 'fillaseat') then
+        raise exception 'Unknown platform: %', p_platform;
+    end if;
+    v_all := p_platform || '_all_shows';
+    v_current := p_platform || '_current_shows';
+
+    -- Serialize overlapping commits for the same platform
+    perform pg_advisory_xact_lock(hashtext(v_current));
+
+    execute format(
+        'select coalesce(array_agg(s.id order by s.id), ''{}'')
+           from jsonb_to_recordset($1) as s(id text)
+          where not exists (select 1 from %I c where c.id = s.id)',
+        v_current
+    ) into v_new_ids using p_shows;
+
+    execute format(
+        'insert into %1$I as t (id, name, url, image_url)
+         select s.id, s.name, s.url, s.image_url
+           from jsonb_to_recordset($1) as s(id text, name text, url text, image_url text)
+         on conflict (id) do update
+            set name = excluded.name, url = excluded.url, image_url = excluded.image_url
+          where (t.name, t.url, t.image_url) is distinct from (excluded.name, excluded.url, excluded.image_url)',
+        v_all
+    ) using p_shows;
+
+    execute format(
+        'delete from %I c
+          where not exists (select 1 from jsonb_to_recordset($1) as s(id text) where s.id = c.id)',
+        v_current
+    ) using p_shows;
+
+    execute format(
+        'insert into %1$I as t (id, name, url, image_url)
+         select s.id, s.name, s.url, s.image_url
+           from jsonb_to_recordset($1) as s(id text, name text, url text, image_url text)
+         on conflict (id) do update
+            set name = excluded.name, url = excluded.url, image_url = excluded.image_url
+          where (t.name, t.url, t.image_url) is distinct from (excluded.name, excluded.url, excluded.image_url)',
+        v_current
+    ) using p_shows;
+
+    return v_new_ids;
+end;
+$$;
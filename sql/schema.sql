@@ -0,0 +1,78 @@
+-- Ticket Genie schema
+-- Run in the Supabase SQL editor (or any Postgres) before starting the bots.
+
+create table if not exists houseseats_all_shows (
+    id text primary key,
+    name text not null,
+    url text,
+    image_url text,
+    first_seen_date timestamptz not null default now()
+);
+
+create table if not exists houseseats_current_shows (
+    id text primary key,
+    name text not null,
+    url text,
+    image_url text
+);
+
+create table if not exists houseseats_user_blacklists (
+    user_id bigint not null,
+    show_id text not null references houseseats_all_shows (id),
+    primary key (user_id, show_id)
+);
+
+create table if not exists fillaseat_all_shows (
+    id text primary key,
+    name text not null,
+    url text,
+    image_url text,
+    first_seen_date timestamptz not null default now()
+);
+
+create table if not exists fillaseat_current_shows (
+    id text primary key,
+    name text not null,
+    url text,
+    image_url text
+);
+
+create table if not exists fillaseat_user_blacklists (
+    user_id bigint not null,
+    show_id text not null references fillaseat_all_shows (id),
+    primary key (user_id, show_id)
+);
+
+-- Per-user include/exclude rules matched against new show names;
+-- pattern_type 'keyword' is a case-insensitive substring, 'regex' a Python regex
+create table if not exists houseseats_user_watch_rules (
+    user_id bigint not null,
+    kind text not null check (kind in ('include', 'exclude')),
+    pattern_type text not null check (pattern_type in ('keyword', 'regex')),
+    pattern text not null,
+    created_at timestamptz not null default now(),
+    primary key (user_id, kind, pattern_type, pattern)
+);
+
+create table if not exists fillaseat_user_watch_rules (
+    user_id bigint not null,
+    kind text not null check (kind in ('include', 'exclude')),
+    pattern_type text not null check (pattern_type in ('keyword', 'regex')),
+    pattern text not null,
+    created_at timestamptz not null default now(),
+    primary key (user_id, kind, pattern_type, pattern)
+);
+
+-- Users opted in to DMs about new shows; only 'active' rows are sent to.
+-- 'undeliverable' is set by the bot when Discord refuses a DM (DMs closed, no shared server)
+create table if not exists houseseats_subscriptions (
+    user_id bigint primary key,
+    status text not null check (status in ('active', 'paused', 'undeliverable')),
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists fillaseat_subscriptions (
+    user_id bigint primary key,
+    status text not null check (status in ('active', 'paused', 'undeliverable')),
+    updated_at timestamptz not null default now()
+);
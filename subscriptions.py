@@ -0,0 +1,57 @@
+import os
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from resynced_index import ResyncedIndex
+
+# How often each registry is reloaded from the database
+SUBSCRIPTIONS_RESYNC_MINUTES = float(os.environ.get('SUBSCRIPTIONS_RESYNC_MINUTES', '15'))
+
+# Subscription statuses; only active subscribers are sent DMs
+ACTIVE = 'active'
+PAUSED = 'paused'
+UNDELIVERABLE = 'undeliverable'
+
+
+class SubscriberRegistry(ResyncedIndex):
+    """In-memory subscription status of every opted-in user for one platform.
+
+    Loaded from the *_subscriptions table at startup and periodically after
+    that; the subscribe/pause/resume commands and fan-out's undeliverable
+    marks update it alongside their database writes, so picking the DM
+    recipients of a drop never waits on a query.
+    """
+
+    noun = 'subscriptions'
+
+    def __init__(
+        self,
+        label: str,
+        load_rows: Callable[[], Awaitable[Optional[List[Dict]]]],
+        resync_minutes: float = SUBSCRIPTIONS_RESYNC_MINUTES
+    ):
+        super().__init__(label, load_rows, resync_minutes)
+
+    def _rebuild(self, rows: List[Dict]):
+        self.status: Dict[int, str] = {row['user_id']: row['status'] for row in rows}
+        self.active: Set[int] = {user_id for user_id, status in self.status.items() if status == ACTIVE}
+
+    def _describe(self) -> str:
+        return f", {len(self.active)} active"
+
+    def set(self, user_id: int, status: str):
+        self._change(self._set, user_id, status)
+
+    def _set(self, user_id: int, status: str):
+        self.status[user_id] = status
+        if status == ACTIVE:
+            self.active.add(user_id)
+        else:
+            self.active.discard(user_id)
+
+    async def active_among(self, user_ids: Iterable[int]) -> Set[int]:
+        """The given users who are active subscribers"""
+        if self.loaded:
+            active = self.active
+        else:
+            active = {row['user_id'] for row in await self._read_through() if row['status'] == ACTIVE}
+        return active.intersection(user_ids)
@@ -1,10 +1,65 @@
 import os
+from datetime import datetime, timezone
 from supabase import create_client, Client
 from typing import Dict, List, Optional
 import logging
+import functools
+
+from metrics import DB_CALL_ERRORS
 
 logger = logging.getLogger(__name__)
 
+# 'rpc' commits each cycle through the commit_show_cycle Postgres function
+# (sql/commit_show_cycle.sql), 'delta' writes only changed rows from the client,
+# 'full' keeps the original delete-all + insert-all behaviour
+SHOWS_SYNC_MODE = os.environ.get('SHOWS_SYNC_MODE', 'rpc').lower()
+
+SHOW_FIELDS = ('name', 'url', 'image_url')
+
+# Display names used in log lines; every platform owns {platform}_* tables in sql/schema.sql
+PLATFORM_LABELS = {'houseseats': 'HouseSeats', 'fillaseat': 'FillASeat'}
+
+def platform_label(platform: str) -> str:
+    return PLATFORM_LABELS.get(platform, platform)
+
+def diff_shows(scraped: Dict[str, Dict], existing: Dict[str, Dict]):
+    """Split scraped shows into new, vanished and changed IDs relative to existing"""
+    new_ids = scraped.keys() - existing.keys()
+    vanished_ids = existing.keys() - scraped.keys()
+    changed_ids = {
+        show_id for show_id in scraped.keys() & existing.keys()
+        if any(scraped[show_id].get(field) != existing[show_id].get(field) for field in SHOW_FIELDS)
+    }
+    return new_ids, vanished_ids, changed_ids
+
+def _show_rows(shows: Dict[str, Dict], show_ids=None) -> List[Dict]:
+    ids = shows.keys() if show_ids is None else show_ids
+    return [
+        {
+            'id': show_id,
+            'name': shows[show_id]['name'],
+            'url': shows[show_id]['url'],
+            'image_url': shows[show_id]['image_url']
+        }
+        for show_id in ids
+    ]
+
+def _fallible(on_error, action: str):
+    """Log, count and answer with on_error whatever a SupabaseDB method raises.
+    Method bodies raise on failure, so a fallback they recover from is not counted.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, platform: str, *args, **kwargs):
+            try:
+                return method(self, platform, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error {action.format(label=platform_label(platform))}: {e}")
+                DB_CALL_ERRORS.inc(method=method.__name__)
+                return on_error() if callable(on_error) else on_error
+        return wrapper
+    return decorate
+
 class SupabaseDB:
     def __init__(self):
         print("Initializing SupabaseDB...")
@@ -35,314 +90,232 @@ class SupabaseDB:
         # We'll define the schema there
         pass
     
-    # HouseSeats operations
-    def get_houseseats_existing_shows(self) -> Dict[str, Dict]:
-        """Get existing HouseSeats shows"""
-        try:
-            response = self.client.table('houseseats_current_shows').select('*').execute()
-            return {row['id']: {'name': row['name'], 'url': row['url'], 'image_url': row['image_url']} 
-                   for row in response.data}
-        except Exception as e:
-            logger.error(f"Error fetching existing HouseSeats shows: {e}")
-            return {}
+    def _fetch_all_rows(self, table: str, columns: str, order_by: tuple, page_size: int = 1000) -> List[Dict]:
+        """Read a whole table, paging past PostgREST's max-rows cap"""
+        rows = []
+        start = 0
+        while True:
+            query = self.client.table(table).select(columns)
+            # A stable order keeps pages from overlapping
+            for column in order_by:
+                query = query.order(column)
+            response = query.range(start, start + page_size - 1).execute()
+            rows.extend(response.data)
+            if len(response.data) < page_size:
+                return rows
+            start += page_size
     
-    def delete_all_houseseats_current_shows(self):
-        """Delete all current HouseSeats shows"""
-        try:
-            response = self.client.table('houseseats_current_shows').delete().neq('id', '').execute()
-            logger.info("Deleted all current HouseSeats shows")
-        except Exception as e:
-            logger.error(f"Error deleting current HouseSeats shows: {e}")
-    
-    def insert_houseseats_current_shows(self, shows: Dict[str, Dict]):
-        """Insert current HouseSeats shows"""
-        try:
-            data = [
-                {
-                    'id': show_id,
-                    'name': show_info['name'],
-                    'url': show_info['url'],
-                    'image_url': show_info['image_url']
-                }
-                for show_id, show_info in shows.items()
-            ]
-            if data:
-                response = self.client.table('houseseats_current_shows').insert(data).execute()
-                logger.info(f"Inserted {len(data)} HouseSeats current shows")
-        except Exception as e:
-            logger.error(f"Error inserting HouseSeats current shows: {e}")
-    
-    def add_to_houseseats_all_shows(self, shows: Dict[str, Dict]):
-        """Add shows to HouseSeats all shows table (with upsert)"""
-        try:
-            data = [
-                {
-                    'id': show_id,
-                    'name': show_info['name'],
-                    'url': show_info['url'],
-                    'image_url': show_info['image_url']
-                }
-                for show_id, show_info in shows.items()
-            ]
-            if data:
-                response = self.client.table('houseseats_all_shows').upsert(data, on_conflict='id').execute()
-                logger.info(f"Upserted {len(data)} HouseSeats all shows")
-        except Exception as e:
-            logger.error(f"Error upserting HouseSeats all shows: {e}")
+    def _sync_shows(self, platform: str, scraped: Dict[str, Dict], existing: Dict[str, Dict]):
+        """Write only the difference between scraped and existing current shows"""
+        label = platform_label(platform)
+        new_ids, vanished_ids, changed_ids = diff_shows(scraped, existing)
+        upsert_ids = new_ids | changed_ids
+        if not upsert_ids and not vanished_ids:
+            logger.info(f"{label} current shows unchanged, skipping writes")
+            return
+        
+        rows = _show_rows(scraped, upsert_ids)
+        if rows:
+            # History first so a show is never current without being in all_shows
+            self.client.table(f'{platform}_all_shows').upsert(rows, on_conflict='id').execute()
+            self.client.table(f'{platform}_current_shows').upsert(rows, on_conflict='id').execute()
+        if vanished_ids:
+            self.client.table(f'{platform}_current_shows').delete().in_('id', list(vanished_ids)).execute()
+        logger.info(f"Synced {label} current shows: {len(new_ids)} new, {len(changed_ids)} changed, {len(vanished_ids)} removed")
     
-    def add_houseseats_user_blacklist(self, user_id: int, show_id: str):
-        """Add a show to user's HouseSeats blacklist"""
-        try:
-            data = {'user_id': user_id, 'show_id': show_id}
-            response = self.client.table('houseseats_user_blacklists').upsert(data, on_conflict='user_id,show_id').execute()
-            logger.info(f"Added show {show_id} to user {user_id} HouseSeats blacklist")
-        except Exception as e:
-            logger.error(f"Error adding to HouseSeats blacklist: {e}")
+    def _existing_shows(self, platform: str) -> Dict[str, Dict]:
+        response = self.client.table(f'{platform}_current_shows').select('*').execute()
+        return {row['id']: {'name': row['name'], 'url': row['url'], 'image_url': row['image_url']}
+                for row in response.data}
     
-    def remove_houseseats_user_blacklist(self, user_id: int, show_id: str):
-        """Remove a show from user's HouseSeats blacklist"""
-        try:
-            response = self.client.table('houseseats_user_blacklists').delete().eq('user_id', user_id).eq('show_id', show_id).execute()
-            logger.info(f"Removed show {show_id} from user {user_id} HouseSeats blacklist")
-        except Exception as e:
-            logger.error(f"Error removing from HouseSeats blacklist: {e}")
+    # Show operations, shared by every platform's {platform}_* tables
+    @_fallible(None, "fetching existing {label} shows")
+    def get_existing_shows(self, platform: str) -> Optional[Dict[str, Dict]]:
+        """Get a platform's existing current shows (None on error)"""
+        return self._existing_shows(platform)
     
-    def get_houseseats_user_blacklists(self, user_id: int) -> List[str]:
-        """Get user's HouseSeats blacklisted shows"""
-        try:
-            response = self.client.table('houseseats_user_blacklists').select('show_id').eq('user_id', user_id).execute()
-            return [row['show_id'] for row in response.data]
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats user blacklists: {e}")
-            return []
+    @_fallible(None, "deleting current {label} shows")
+    def delete_all_current_shows(self, platform: str):
+        """Delete all of a platform's current shows"""
+        self.client.table(f'{platform}_current_shows').delete().neq('id', '').execute()
+        logger.info(f"Deleted all current {platform_label(platform)} shows")
     
-    def get_houseseats_user_blacklists_for_shows(self, show_ids: List[str]) -> Dict[int, set]:
-        """Get all user blacklists for specific show IDs"""
-        try:
-            response = self.client.table('houseseats_user_blacklists').select('user_id, show_id').in_('show_id', show_ids).execute()
-            user_blacklists = {}
-            for row in response.data:
-                user_id = row['user_id']
-                show_id = row['show_id']
-                if user_id not in user_blacklists:
-                    user_blacklists[user_id] = set()
-                user_blacklists[user_id].add(show_id)
-            return user_blacklists
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats user blacklists for shows: {e}")
-            return {}
+    @_fallible(None, "inserting {label} current shows")
+    def insert_current_shows(self, platform: str, shows: Dict[str, Dict]):
+        """Insert a platform's current shows"""
+        data = _show_rows(shows)
+        if data:
+            self.client.table(f'{platform}_current_shows').insert(data).execute()
+            logger.info(f"Inserted {len(data)} {platform_label(platform)} current shows")
     
-    def get_houseseats_all_shows_name(self, show_id: str) -> Optional[str]:
-        """Get show name by ID from HouseSeats all shows"""
-        try:
-            response = self.client.table('houseseats_all_shows').select('name').eq('id', show_id).execute()
-            if response.data:
-                return response.data[0]['name']
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats show name: {e}")
-            return None
+    @_fallible(None, "upserting {label} all shows")
+    def add_to_all_shows(self, platform: str, shows: Dict[str, Dict]):
+        """Add shows to a platform's all shows table (with upsert)"""
+        data = _show_rows(shows)
+        if data:
+            self.client.table(f'{platform}_all_shows').upsert(data, on_conflict='id').execute()
+            logger.info(f"Upserted {len(data)} {platform_label(platform)} all shows")
     
-    def get_houseseats_current_shows_name(self, show_id: str) -> Optional[str]:
-        """Get show name by ID from HouseSeats current shows"""
-        try:
-            response = self.client.table('houseseats_current_shows').select('name').eq('id', show_id).execute()
-            if response.data:
-                return response.data[0]['name']
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats current show name: {e}")
-            return None
+    def sync_current_shows(self, platform: str, shows: Dict[str, Dict], existing: Dict[str, Dict]):
+        """Bring a platform's current/all shows in line with the scraped set"""
+        if SHOWS_SYNC_MODE == 'full':
+            self.add_to_all_shows(platform, shows)
+            self.delete_all_current_shows(platform)
+            self.insert_current_shows(platform, shows)
+            return
+        self._sync_shows(platform, shows, existing)
     
-    def get_houseseats_user_blacklists_names(self, user_id: int) -> List[str]:
-        """Get names of user's blacklisted HouseSeats shows"""
-        try:
-            response = self.client.table('houseseats_user_blacklists').select('houseseats_all_shows(name)').eq('user_id', user_id).execute()
-            return [f"• **`{row['houseseats_all_shows']['name']}`**" for row in response.data if row['houseseats_all_shows']]
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats user blacklist names: {e}")
-            # Fallback method
+    @_fallible(None, "committing {label} cycle")
+    def commit_cycle(self, platform: str, shows: Dict[str, Dict], existing: Optional[Dict[str, Dict]] = None) -> Optional[List[str]]:
+        """Persist a scraped show set and return the new show IDs, or None on failure"""
+        label = platform_label(platform)
+        if SHOWS_SYNC_MODE == 'rpc':
             try:
-                blacklist_response = self.client.table('houseseats_user_blacklists').select('show_id').eq('user_id', user_id).execute()
-                show_ids = [row['show_id'] for row in blacklist_response.data]
-                if show_ids:
-                    shows_response = self.client.table('houseseats_all_shows').select('name').in_('id', show_ids).execute()
-                    return [f"• **`{row['name']}`**" for row in shows_response.data]
-                return []
-            except Exception as e2:
-                logger.error(f"Error in fallback method: {e2}")
-                return []
+                response = self.client.rpc('commit_show_cycle', {
+                    'p_platform': platform,
+                    'p_shows': _show_rows(shows)
+                }).execute()
+                new_ids = response.data or []
+                logger.info(f"Committed {len(shows)} {label} shows via RPC ({len(new_ids)} new)")
+                return new_ids
+            except Exception as e:
+                # Only a failure of the client-side path below fails the call
+                logger.warning(f"Error committing {label} cycle via RPC, falling back to client-side sync: {e}")
+        
+        # Client-side path: diff against the caller's known state, reading it only if not supplied
+        if existing is None:
+            existing = self._existing_shows(platform)
+        new_ids = sorted(shows.keys() - existing.keys())
+        self.sync_current_shows(platform, shows, existing)
+        return new_ids
     
-    def get_houseseats_current_shows(self) -> List[Dict]:
-        """Get all HouseSeats current shows"""
-        try:
-            response = self.client.table('houseseats_current_shows').select('*').order('name').execute()
-            return response.data
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats current shows: {e}")
-            return []
+    @_fallible(list, "fetching {label} current shows")
+    def get_current_shows(self, platform: str) -> List[Dict]:
+        """Get all of a platform's current shows"""
+        response = self.client.table(f'{platform}_current_shows').select('*').order('name').execute()
+        return response.data
     
-    def get_houseseats_all_shows(self) -> List[Dict]:
-        """Get all HouseSeats shows ever seen"""
-        try:
-            response = self.client.table('houseseats_all_shows').select('*').order('first_seen_date', desc=True).execute()
-            return response.data
-        except Exception as e:
-            logger.error(f"Error fetching HouseSeats all shows: {e}")
-            return []
+    @_fallible(list, "fetching {label} all shows")
+    def get_all_shows(self, platform: str) -> List[Dict]:
+        """Get all of a platform's shows ever seen"""
+        response = self.client.table(f'{platform}_all_shows').select('*').order('first_seen_date', desc=True).execute()
+        return response.data
     
-    # FillASeat operations
-    def get_fillaseat_existing_shows(self) -> Dict[str, Dict]:
-        """Get existing FillASeat shows"""
-        try:
-            response = self.client.table('fillaseat_current_shows').select('*').execute()
-            return {row['id']: {'name': row['name'], 'url': row['url'], 'image_url': row['image_url']} 
-                   for row in response.data}
-        except Exception as e:
-            logger.error(f"Error fetching existing FillASeat shows: {e}")
-            return {}
+    @_fallible(None, "fetching {label} show name")
+    def get_all_shows_name(self, platform: str, show_id: str) -> Optional[str]:
+        """Get show name by ID from a platform's all shows"""
+        response = self.client.table(f'{platform}_all_shows').select('name').eq('id', show_id).execute()
+        if response.data:
+            return response.data[0]['name']
+        return None
     
-    def delete_all_fillaseat_current_shows(self):
-        """Delete all current FillASeat shows"""
-        try:
-            response = self.client.table('fillaseat_current_shows').delete().neq('id', '').execute()
-            logger.info("Deleted all current FillASeat shows")
-        except Exception as e:
-            logger.error(f"Error deleting current FillASeat shows: {e}")
+    @_fallible(None, "fetching {label} current show name")
+    def get_current_shows_name(self, platform: str, show_id: str) -> Optional[str]:
+        """Get show name by ID from a platform's current shows"""
+        response = self.client.table(f'{platform}_current_shows').select('name').eq('id', show_id).execute()
+        if response.data:
+            return response.data[0]['name']
+        return None
     
-    def insert_fillaseat_current_shows(self, shows: Dict[str, Dict]):
-        """Insert current FillASeat shows"""
-        try:
-            data = [
-                {
-                    'id': show_id,
-                    'name': show_info['name'],
-                    'url': show_info['url'],
-                    'image_url': show_info['image_url']
-                }
-                for show_id, show_info in shows.items()
-            ]
-            if data:
-                response = self.client.table('fillaseat_current_shows').insert(data).execute()
-                logger.info(f"Inserted {len(data)} FillASeat current shows")
-        except Exception as e:
-            logger.error(f"Error inserting FillASeat current shows: {e}")
+    @_fallible(None, "fetching {label} first seen dates")
+    def get_first_seen_dates(self, platform: str) -> Optional[List[str]]:
+        """Get the first_seen_date of every show a platform has ever listed"""
+        rows = self._fetch_all_rows(f'{platform}_all_shows', 'id,first_seen_date', ('id',))
+        return [row['first_seen_date'] for row in rows]
     
-    def add_to_fillaseat_all_shows(self, shows: Dict[str, Dict]):
-        """Add shows to FillASeat all shows table (with upsert)"""
-        try:
-            data = [
-                {
-                    'id': show_id,
-                    'name': show_info['name'],
-                    'url': show_info['url'],
-                    'image_url': show_info['image_url']
-                }
-                for show_id, show_info in shows.items()
-            ]
-            if data:
-                response = self.client.table('fillaseat_all_shows').upsert(data, on_conflict='id').execute()
-                logger.info(f"Upserted {len(data)} FillASeat all shows")
-        except Exception as e:
-            logger.error(f"Error upserting FillASeat all shows: {e}")
+    # Blacklist operations
+    @_fallible(False, "adding to {label} blacklist")
+    def add_user_blacklist(self, platform: str, user_id: int, show_id: str) -> bool:
+        """Add a show to a user's blacklist for a platform"""
+        data = {'user_id': user_id, 'show_id': show_id}
+        self.client.table(f'{platform}_user_blacklists').upsert(data, on_conflict='user_id,show_id').execute()
+        logger.info(f"Added show {show_id} to user {user_id} {platform_label(platform)} blacklist")
+        return True
     
-    def add_fillaseat_user_blacklist(self, user_id: int, show_id: str):
-        """Add a show to user's FillASeat blacklist"""
-        try:
-            data = {'user_id': user_id, 'show_id': show_id}
-            response = self.client.table('fillaseat_user_blacklists').upsert(data, on_conflict='user_id,show_id').execute()
-            logger.info(f"Added show {show_id} to user {user_id} FillASeat blacklist")
-        except Exception as e:
-            logger.error(f"Error adding to FillASeat blacklist: {e}")
+    @_fallible(False, "removing from {label} blacklist")
+    def remove_user_blacklist(self, platform: str, user_id: int, show_id: str) -> bool:
+        """Remove a show from a user's blacklist for a platform"""
+        self.client.table(f'{platform}_user_blacklists').delete().eq('user_id', user_id).eq('show_id', show_id).execute()
+        logger.info(f"Removed show {show_id} from user {user_id} {platform_label(platform)} blacklist")
+        return True
     
-    def remove_fillaseat_user_blacklist(self, user_id: int, show_id: str):
-        """Remove a show from user's FillASeat blacklist"""
-        try:
-            response = self.client.table('fillaseat_user_blacklists').delete().eq('user_id', user_id).eq('show_id', show_id).execute()
-            logger.info(f"Removed show {show_id} from user {user_id} FillASeat blacklist")
-        except Exception as e:
-            logger.error(f"Error removing from FillASeat blacklist: {e}")
+    @_fallible(list, "fetching {label} user blacklists")
+    def get_user_blacklists(self, platform: str, user_id: int) -> List[str]:
+        """Get a user's blacklisted show IDs for a platform"""
+        response = self.client.table(f'{platform}_user_blacklists').select('show_id').eq('user_id', user_id).execute()
+        return [row['show_id'] for row in response.data]
     
-    def get_fillaseat_user_blacklists(self, user_id: int) -> List[str]:
-        """Get user's FillASeat blacklisted shows"""
-        try:
-            response = self.client.table('fillaseat_user_blacklists').select('show_id').eq('user_id', user_id).execute()
-            return [row['show_id'] for row in response.data]
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat user blacklists: {e}")
-            return []
+    @_fallible(None, "fetching all {label} user blacklists")
+    def get_all_user_blacklists(self, platform: str) -> Optional[List[Dict]]:
+        """Get every blacklist row for a platform (None on error)"""
+        return self._fetch_all_rows(f'{platform}_user_blacklists', 'user_id, show_id', ('user_id', 'show_id'))
     
-    def get_fillaseat_user_blacklists_for_shows(self, show_ids: List[str]) -> Dict[int, set]:
+    @_fallible(dict, "fetching {label} user blacklists for shows")
+    def get_user_blacklists_for_shows(self, platform: str, show_ids: List[str]) -> Dict[int, set]:
         """Get all user blacklists for specific show IDs"""
-        try:
-            response = self.client.table('fillaseat_user_blacklists').select('user_id, show_id').in_('show_id', show_ids).execute()
-            user_blacklists = {}
-            for row in response.data:
-                user_id = row['user_id']
-                show_id = row['show_id']
-                if user_id not in user_blacklists:
-                    user_blacklists[user_id] = set()
-                user_blacklists[user_id].add(show_id)
-            return user_blacklists
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat user blacklists for shows: {e}")
-            return {}
+        response = self.client.table(f'{platform}_user_blacklists').select('user_id, show_id').in_('show_id', show_ids).execute()
+        user_blacklists = {}
+        for row in response.data:
+            user_blacklists.setdefault(row['user_id'], set()).add(row['show_id'])
+        return user_blacklists
     
-    def get_fillaseat_all_shows_name(self, show_id: str) -> Optional[str]:
-        """Get show name by ID from FillASeat all shows"""
+    @_fallible(list, "fetching {label} user blacklist names")
+    def get_user_blacklists_names(self, platform: str, user_id: int) -> List[str]:
+        """Get names of a user's blacklisted shows for a platform"""
+        all_shows = f'{platform}_all_shows'
+        blacklists = self.client.table(f'{platform}_user_blacklists')
         try:
-            response = self.client.table('fillaseat_all_shows').select('name').eq('id', show_id).execute()
-            if response.data:
-                return response.data[0]['name']
-            return None
+            response = blacklists.select(f'{all_shows}(name)').eq('user_id', user_id).execute()
+            return [f"• **`{row[all_shows]['name']}`**" for row in response.data if row[all_shows]]
         except Exception as e:
-            logger.error(f"Error fetching FillASeat show name: {e}")
-            return None
+            logger.warning(f"Error joining {platform_label(platform)} user blacklist names, falling back to two queries: {e}")
+        
+        # Fallback method
+        response = blacklists.select('show_id').eq('user_id', user_id).execute()
+        show_ids = [row['show_id'] for row in response.data]
+        if not show_ids:
+            return []
+        shows_response = self.client.table(all_shows).select('name').in_('id', show_ids).execute()
+        return [f"• **`{row['name']}`**" for row in shows_response.data]
     
-    def get_fillaseat_current_shows_name(self, show_id: str) -> Optional[str]:
-        """Get show name by ID from FillASeat current shows"""
-        try:
-            response = self.client.table('fillaseat_current_shows').select('name').eq('id', show_id).execute()
-            if response.data:
-                return response.data[0]['name']
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat current show name: {e}")
-            return None
+    @_fallible(False, "adding {label} watch rule")
+    def add_user_watch_rule(self, platform: str, user_id: int, kind: str, pattern_type: str, pattern: str) -> bool:
+        """Add an include/exclude keyword or regex rule for a user on a platform"""
+        data = {'user_id': user_id, 'kind': kind, 'pattern_type': pattern_type, 'pattern': pattern}
+        self.client.table(f'{platform}_user_watch_rules').upsert(data, on_conflict='user_id,kind,pattern_type,pattern').execute()
+        logger.info(f"Added {kind} {pattern_type} watch rule for user {user_id} on {platform_label(platform)}")
+        return True
     
-    def get_fillaseat_user_blacklists_names(self, user_id: int) -> List[str]:
-        """Get names of user's blacklisted FillASeat shows"""
-        try:
-            response = self.client.table('fillaseat_user_blacklists').select('fillaseat_all_shows(name)').eq('user_id', user_id).execute()
-            return [f"• **`{row['fillaseat_all_shows']['name']}`**" for row in response.data if row['fillaseat_all_shows']]
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat user blacklist names: {e}")
-            # Fallback method
-            try:
-                blacklist_response = self.client.table('fillaseat_user_blacklists').select('show_id').eq('user_id', user_id).execute()
-                show_ids = [row['show_id'] for row in blacklist_response.data]
-                if show_ids:
-                    shows_response = self.client.table('fillaseat_all_shows').select('name').in_('id', show_ids).execute()
-                    return [f"• **`{row['name']}`**" for row in shows_response.data]
-                return []
-            except Exception as e2:
-                logger.error(f"Error in fallback method: {e2}")
-                return []
+    @_fallible(False, "removing {label} watch rule")
+    def remove_user_watch_rule(self, platform: str, user_id: int, kind: str, pattern_type: str, pattern: str) -> bool:
+        """Remove one of a user's watch rules for a platform"""
+        (self.client.table(f'{platform}_user_watch_rules').delete()
+            .eq('user_id', user_id).eq('kind', kind).eq('pattern_type', pattern_type).eq('pattern', pattern)
+            .execute())
+        logger.info(f"Removed {kind} {pattern_type} watch rule for user {user_id} on {platform_label(platform)}")
+        return True
     
-    def get_fillaseat_current_shows(self) -> List[Dict]:
-        """Get all FillASeat current shows"""
-        try:
-            response = self.client.table('fillaseat_current_shows').select('*').order('name').execute()
-            return response.data
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat current shows: {e}")
-            return []
+    @_fallible(None, "fetching all {label} watch rules")
+    def get_all_user_watch_rules(self, platform: str) -> Optional[List[Dict]]:
+        """Get every watch rule row for a platform (None on error)"""
+        return self._fetch_all_rows(
+            f'{platform}_user_watch_rules',
+            'user_id, kind, pattern_type, pattern',
+            ('user_id', 'kind', 'pattern_type', 'pattern')
+        )
     
-    def get_fillaseat_all_shows(self) -> List[Dict]:
-        """Get all FillASeat shows ever seen"""
-        try:
-            response = self.client.table('fillaseat_all_shows').select('*').order('first_seen_date', desc=True).execute()
-            return response.data
-        except Exception as e:
-            logger.error(f"Error fetching FillASeat all shows: {e}")
-            return [] 
\ No newline at end of file
+    @_fallible(False, "updating {label} subscriptions")
+    def set_subscription_status(self, platform: str, user_ids: List[int], status: str) -> bool:
+        """Subscribe, pause, resume or mark undeliverable one or more users' DMs for a platform"""
+        if not user_ids:
+            return True
+        now = datetime.now(timezone.utc).isoformat()
+        data = [{'user_id': user_id, 'status': status, 'updated_at': now} for user_id in user_ids]
+        self.client.table(f'{platform}_subscriptions').upsert(data, on_conflict='user_id').execute()
+        logger.info(f"Set {len(user_ids)} {platform_label(platform)} subscription(s) to {status}")
+        return True
+    
+    @_fallible(None, "fetching all {label} subscriptions")
+    def get_all_subscriptions(self, platform: str) -> Optional[List[Dict]]:
+        """Get every subscription row for a platform (None on error)"""
+        return self._fetch_all_rows(f'{platform}_subscriptions', 'user_id, status', ('user_id',))
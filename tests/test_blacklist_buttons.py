@@ -0,0 +1,13 @@
+from blacklist_buttons import blacklist_custom_id, parse_custom_id
+
+
+def test_custom_id_round_trips():
+    # Show IDs may contain underscores, user IDs never do
+    custom_id = blacklist_custom_id('show_12_b', 123456789012345678)
+    assert len(custom_id) <= 100
+    assert parse_custom_id(custom_id) == ('show_12_b', 123456789012345678)
+
+
+def test_foreign_and_malformed_custom_ids_are_rejected():
+    for custom_id in ('other_123', 'blacklist_123', 'blacklist_show_abc', ''):
+        assert parse_custom_id(custom_id) is None
@@ -0,0 +1,143 @@
+"""sql/schema.sql and sql/commit_show_cycle.sql against a throwaway Postgres.
+
+Set TEST_POSTGRES_DSN to a server the tests may create a database on, or
+have initdb/pg_ctl on PATH (or under /usr/lib/postgresql) to start a
+temporary cluster. The tests are skipped when neither is available.
+"""
+import os
+import glob
+import json
+import uuid
+import shutil
+import tempfile
+import subprocess
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+from psycopg2.extensions import make_dsn  # noqa: E402
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+
+
+def _pg_bin(name):
+    found = shutil.which(name)
+    if found:
+        return found
+    candidates = sorted(glob.glob(f'/usr/lib/postgresql/*/bin/{name}'))
+    return candidates[-1] if candidates else None
+
+
+@pytest.fixture(scope='module')
+def server_dsn():
+    dsn = os.environ.get('TEST_POSTGRES_DSN')
+    if dsn:
+        yield dsn
+        return
+
+    initdb, pg_ctl = _pg_bin('initdb'), _pg_bin('pg_ctl')
+    if not initdb or not pg_ctl:
+        pytest.skip('Postgres is not available (set TEST_POSTGRES_DSN or install initdb/pg_ctl)')
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        pytest.skip('initdb refuses to run as root; set TEST_POSTGRES_DSN instead')
+
+    workdir = tempfile.mkdtemp(prefix='ticketgenie-pg-')
+    data = os.path.join(workdir, 'data')
+    try:
+        subprocess.run([initdb, '-D', data, '-U', 'postgres', '-A', 'trust'], check=True, capture_output=True)
+        # Unix socket only, so parallel runs never fight over a port
+        subprocess.run(
+            [pg_ctl, '-D', data, '-w', '-l', os.path.join(workdir, 'log'),
+             '-o', f"-k {workdir} -c listen_addresses=''", 'start'],
+            check=True, capture_output=True
+        )
+        try:
+            yield make_dsn(host=workdir, user='postgres', dbname='postgres')
+        finally:
+            subprocess.run([pg_ctl, '-D', data, '-m', 'immediate', 'stop'], capture_output=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@pytest.fixture
+def conn(server_dsn):
+    name = f"ticketgenie_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(server_dsn)
+    admin.autocommit = True
+    admin.cursor().execute(f'create database {name}')
+    try:
+        connection = psycopg2.connect(make_dsn(server_dsn, dbname=name))
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            for script in ('schema.sql', 'commit_show_cycle.sql'):
+                with open(os.path.join(SQL_DIR, script), encoding='utf-8') as f:
+                    cursor.execute(f.read())
+        try:
+            yield connection
+        finally:
+            connection.close()
+    finally:
+        admin.cursor().execute(f'drop database if exists {name}')
+        admin.close()
+
+
+def show(show_id, name=None):
+    return {'id': show_id, 'name': name or f'Show {show_id}', 'url': f'https://example.com/{show_id}', 'image_url': None}
+
+
+def commit(conn, platform, shows):
+    with conn.cursor() as cursor:
+        cursor.execute('select commit_show_cycle(%s, %s::jsonb)', (platform, json.dumps(shows)))
+        return cursor.fetchone()[0]
+
+
+def rows(conn, table):
+    """id -> (name, xmin); xmin changes whenever a row is rewritten"""
+    with conn.cursor() as cursor:
+        cursor.execute(f'select id, name, xmin::text from {table}')
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def test_returns_new_ids_and_fills_both_tables(conn):
+    assert commit(conn, 'houseseats', [show('2'), show('1')]) == ['1', '2']
+    assert set(rows(conn, 'houseseats_current_shows')) == {'1', '2'}
+    assert set(rows(conn, 'houseseats_all_shows')) == {'1', '2'}
+
+    assert commit(conn, 'houseseats', [show('1'), show('2'), show('3')]) == ['3']
+
+
+def test_vanished_shows_leave_current_but_stay_in_history(conn):
+    commit(conn, 'fillaseat', [show('1'), show('2'), show('3')])
+
+    assert commit(conn, 'fillaseat', [show('1'), show('3')]) == []
+    assert set(rows(conn, 'fillaseat_current_shows')) == {'1', '3'}
+    assert set(rows(conn, 'fillaseat_all_shows')) == {'1', '2', '3'}
+
+    # A show that comes back is new again
+    assert commit(conn, 'fillaseat', [show('1'), show('2'), show('3')]) == ['2']
+
+
+def test_repeat_call_writes_nothing(conn):
+    shows = [show('1'), show('2')]
+    commit(conn, 'houseseats', shows)
+    current, history = rows(conn, 'houseseats_current_shows'), rows(conn, 'houseseats_all_shows')
+
+    assert commit(conn, 'houseseats', shows) == []
+    assert rows(conn, 'houseseats_current_shows') == current
+    assert rows(conn, 'houseseats_all_shows') == history
+
+
+def test_renamed_show_is_rewritten_but_not_new(conn):
+    commit(conn, 'houseseats', [show('1'), show('2')])
+    before = rows(conn, 'houseseats_current_shows')
+
+    assert commit(conn, 'houseseats', [show('1', 'Renamed'), show('2')]) == []
+    after = rows(conn, 'houseseats_current_shows')
+    assert after['1'][0] == 'Renamed' and after['1'][1] != before['1'][1]
+    assert after['2'] == before['2']
+    assert rows(conn, 'houseseats_all_shows')['1'][0] == 'Renamed'
+
+
+def test_unknown_platform_is_rejected(conn):
+    with pytest.raises(psycopg2.Error, match='Unknown platform'):
+        commit(conn, 'nosuchsite', [show('1')])
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import dm_fanout
+from dm_fanout import DMFanout, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock that asyncio.sleep in dm_fanout advances instantly"""
+    clock = SimpleNamespace(now=0.0, slept=0.0)
+
+    async def sleep(seconds):
+        clock.now += seconds
+        clock.slept += seconds
+
+    monkeypatch.setattr(dm_fanout, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(dm_fanout, 'asyncio', SimpleNamespace(Lock=asyncio.Lock, sleep=sleep))
+    return clock
+
+
+def acquire(limiter, times):
+    async def run():
+        for _ in range(times):
+            await limiter.acquire()
+    asyncio.run(run())
+
+
+def test_burst_is_capped_at_a_fifth_of_the_rate():
+    assert DMFanout('Test', rate_limit=50).limiter.capacity == 10
+    # Never below one request, or nothing could be sent
+    assert DMFanout('Test', rate_limit=2).limiter.capacity == 1
+
+
+def test_bucket_spends_the_burst_then_paces_at_the_rate(clock):
+    # Powers of two keep the fake clock's arithmetic exact
+    limiter = RateLimiter(8, burst=2)
+    acquire(limiter, 2)
+    assert clock.slept == 0
+    acquire(limiter, 6)
+    assert clock.slept == pytest.approx(0.75)
+
+
+def test_idle_time_refills_only_up_to_the_burst(clock):
+    limiter = RateLimiter(8, burst=2)
+    acquire(limiter, 2)
+    clock.now += 100
+    acquire(limiter, 3)
+    assert clock.slept == pytest.approx(0.125)
@@ -0,0 +1,32 @@
+import asyncio
+
+from http_client import HTTPResponse
+from house_seats_bot import SHOWS_URL_TEMPLATE, HouseSeatsSource, find_page_offsets
+
+
+def page(offset: int, *links: int) -> HTTPResponse:
+    body = ''.join(f'<a href="upcoming-shows.bv?search=&start={link}">{link}</a>' for link in links)
+    return HTTPResponse(200, SHOWS_URL_TEMPLATE.format(start=offset), {}, body.encode())
+
+
+def test_find_page_offsets_ignores_the_first_page():
+    text = '<a href="?start=0">1</a> <a href="?x=1&start=25">2</a> <a href="?start=50">3</a> <a href="?start=25">2</a>'
+    assert find_page_offsets(text) == {25, 50}
+    assert find_page_offsets('no pagination here') == set()
+
+
+def test_remaining_pages_are_followed_once_each_in_order():
+    site = {0: page(0, 25, 50), 25: page(25, 0, 50, 75), 50: page(50, 25, 75), 75: page(75, 0)}
+    requested = []
+
+    class FakeHTTP:
+        async def get(self, url, headers=None):
+            offset = int(url.rsplit('start=', 1)[1])
+            requested.append(offset)
+            return site[offset]
+
+    source = HouseSeatsSource.__new__(HouseSeatsSource)
+    source.http = FakeHTTP()
+    pages = asyncio.run(source.fetch_remaining_pages(site[0]))
+    assert pages == [site[25], site[50], site[75]]
+    assert sorted(requested) == [25, 50, 75]
@@ -0,0 +1,44 @@
+from http_client import HTTPResponse, ListingFingerprint
+
+
+def response(body: bytes, status: int = 200, **headers) -> HTTPResponse:
+    return HTTPResponse(status, 'https://example.test/listing', headers, body)
+
+
+def test_nothing_is_unchanged_before_the_first_commit():
+    fingerprint = ListingFingerprint('Test')
+    assert fingerprint.request_headers() == {}
+    assert not fingerprint.is_unchanged(response(b'<shows/>'))
+    # Not committed, so the same body is still new
+    assert not fingerprint.is_unchanged(response(b'<shows/>'))
+
+
+def test_committed_digest_skips_the_same_body():
+    fingerprint = ListingFingerprint('Test')
+    assert not fingerprint.is_unchanged(response(b'<shows/>'))
+    fingerprint.commit()
+    assert fingerprint.is_unchanged(response(b'<shows/>'))
+    assert not fingerprint.is_unchanged(response(b'<shows>new</shows>'))
+
+
+def test_validators_are_sent_and_304_is_unchanged():
+    fingerprint = ListingFingerprint('Test')
+    fingerprint.is_unchanged(response(b'<shows/>', ETag='"v1"', **{'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT'}))
+    fingerprint.commit()
+    assert fingerprint.request_headers() == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 05 Oct 2026 10:00:00 GMT'
+    }
+    assert fingerprint.is_unchanged(response(b'', status=304))
+    # A 304 leaves nothing pending, so committing keeps the baseline
+    fingerprint.commit()
+    assert fingerprint.request_headers()['If-None-Match'] == '"v1"'
+
+
+def test_multi_page_listings_rely_on_the_digest():
+    fingerprint = ListingFingerprint('Test')
+    pages = [response(b'page 1', ETag='"a"'), response(b'page 2', ETag='"b"')]
+    fingerprint.is_unchanged(*pages)
+    fingerprint.commit()
+    assert fingerprint.request_headers() == {}
+    assert fingerprint.is_unchanged(*pages)
+    assert not fingerprint.is_unchanged(pages[0], response(b'page 2 changed'))
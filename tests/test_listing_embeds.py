@@ -0,0 +1,19 @@
+import discord
+
+from listing_embeds import MESSAGE_CHAR_LIMIT, pack_messages
+
+
+def test_pack_messages_respects_the_embed_count_limit():
+    embeds = [discord.Embed(title=f"Page {number}") for number in range(13)]
+    assert [len(message) for message in pack_messages(embeds)] == [10, 3]
+
+
+def test_pack_messages_respects_the_character_limit():
+    embeds = [discord.Embed(description='x' * 2500) for _ in range(5)]
+    messages = pack_messages(embeds)
+    assert [len(message) for message in messages] == [2, 2, 1]
+    assert all(sum(len(embed) for embed in message) <= MESSAGE_CHAR_LIMIT for message in messages)
+
+
+def test_pack_messages_of_nothing_is_nothing():
+    assert pack_messages([]) == []
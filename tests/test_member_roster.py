@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from blacklist_buttons import BlacklistButtonHandler
+from member_roster import MemberRoster, RosterRecipient
+
+
+def make_guild(guild_id, member_ids):
+    def fetch_members(limit=None):
+        raise AssertionError("the roster should not have to fetch members")
+
+    members = [SimpleNamespace(id=member_id, bot=False) for member_id in member_ids]
+    return SimpleNamespace(id=guild_id, members=members + [SimpleNamespace(id=1, bot=True)], fetch_members=fetch_members)
+
+
+def make_bot(user_id, guilds):
+    return SimpleNamespace(user=SimpleNamespace(id=user_id), guilds=guilds)
+
+
+def test_a_bot_leaving_keeps_the_guild_for_the_other_bot():
+    shared, own = make_guild(1, [10, 11]), make_guild(2, [20])
+    first, second = make_bot(100, [shared, own]), make_bot(200, [shared])
+    roster = MemberRoster()
+    for guild in first.guilds:
+        roster.snapshot(guild, first.user.id)
+    roster.snapshot(shared, second.user.id)
+
+    roster.release(shared.id, first.user.id)
+    assert asyncio.run(roster.user_ids_for(second)) == {10, 11}
+
+    roster.release(shared.id, second.user.id)
+    roster.release(own.id, first.user.id)
+    assert roster.all_user_ids() == set()
+
+
+def test_dm_views_are_sent_as_bare_components():
+    sent = []
+
+    async def send_message(channel_id, content, **kwargs):
+        sent.append((channel_id, content, kwargs))
+
+    # No connection state: py-cord gets no chance to store the view
+    bot = SimpleNamespace(http=SimpleNamespace(send_message=send_message))
+
+    async def send():
+        # Views need a running loop
+        view = BlacklistButtonHandler('Test', None, None, None).view(5, [('s1', None)])
+        await RosterRecipient(bot, 5, {5: 99}).send(view=view, embeds=[discord.Embed(title='Magic')], nonce='k')
+
+    asyncio.run(send())
+
+    [(channel_id, content, kwargs)] = sent
+    assert (channel_id, content) == (99, None)
+    assert kwargs['nonce'] == 'k' and kwargs['embeds'][0]['title'] == 'Magic'
+    assert kwargs['components'][0]['components'][0]['custom_id'] == 'blacklist_s1_5'
@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+
+from outbox import NotificationOutbox, CHANNEL_POST, DM, message_key
+
+CHANNEL_ID = 99
+SHOWS = {
+    's1': {'name': 'Show One', 'url': 'https://example.com/1', 'image_url': None},
+    's2': {'name': 'Show Two', 'url': 'https://example.com/2', 'image_url': 'https://example.com/2.jpg'},
+}
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = NotificationOutbox(str(tmp_path / 'outbox.sqlite3'), max_attempts=2)
+    yield box
+    box.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def drain_writes(box):
+    # mark_sent / mark_pushover_sent write on the outbox thread; a queued no-op waits for them
+    await box._run(lambda conn: None)
+
+
+def test_enqueue_is_idempotent(outbox):
+    dm_batches = [(1, ['s1', 's2']), (2, ['s2'])]
+    assert run(outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, dm_batches)) == 5
+    assert run(outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, dm_batches)) == 0
+
+
+def test_claim_groups_rows_into_messages(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [(1, ['s1', 's2'])])
+        return await outbox.claim('houseseats')
+
+    messages, shows = run(scenario())
+    assert [(m.channel, m.recipient_id, m.show_ids) for m in messages] == [
+        (CHANNEL_POST, CHANNEL_ID, ['s1']),
+        (CHANNEL_POST, CHANNEL_ID, ['s2']),
+        (DM, 1, ['s1', 's2']),
+    ]
+    assert messages[2].key == message_key('houseseats', DM, 1, ['s2', 's1'])
+    assert len(messages[2].key) <= 25
+    assert shows['s2']['image_url'] == 'https://example.com/2.jpg'
+
+
+def test_claimed_messages_are_not_handed_out_twice(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [])
+        first, _ = await outbox.claim('houseseats')
+        second, _ = await outbox.claim('houseseats')
+        await outbox.release(m.key for m in first)
+        third, _ = await outbox.claim('houseseats')
+        return first, second, third
+
+    first, second, third = run(scenario())
+    assert len(first) == 2 and second == [] and len(third) == 2
+
+
+def test_sent_messages_are_not_claimed_again(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [(1, ['s1'])])
+        messages, _ = await outbox.claim('houseseats')
+        outbox.mark_sent(messages[0].key)
+        await drain_writes(outbox)
+        await outbox.release(m.key for m in messages)
+        return await outbox.claim('houseseats')
+
+    messages, _ = run(scenario())
+    assert [m.show_ids for m in messages] == [['s2'], ['s1']]
+
+
+def test_release_gives_up_after_max_attempts(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', {'s1': SHOWS['s1']}, CHANNEL_ID, [])
+        left = []
+        for _ in range(2):
+            messages, _ = await outbox.claim('houseseats')
+            assert len(messages) == 1
+            left.append(await outbox.release(m.key for m in messages))
+        # Still pending after the first drain, given up after the second
+        assert left == [1, 0]
+        return await outbox.claim('houseseats')
+
+    messages, _ = run(scenario())
+    assert messages == []
+
+
+def test_cancel_only_touches_pending_rows_of_the_platform(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [(1, ['s1'])])
+        await outbox.enqueue('fillaseat', SHOWS, CHANNEL_ID, [])
+        sent, _ = await outbox.claim('houseseats')
+        outbox.mark_sent(sent[0].key)
+        await drain_writes(outbox)
+        await outbox.release(m.key for m in sent)
+        cancelled = await outbox.cancel('houseseats', ['s1'])
+        return cancelled, await outbox.claim('houseseats'), await outbox.claim('fillaseat')
+
+    cancelled, (houseseats, _), (fillaseat, _) = run(scenario())
+    # The s1 channel post was sent and stays; only the pending s1 DM goes
+    assert cancelled == 1
+    assert [m.show_ids for m in houseseats] == [['s2']]
+    assert len(fillaseat) == 2
+
+
+def test_skip_finishes_messages_without_sending(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [(1, ['s1'])])
+        messages, _ = await outbox.claim('houseseats')
+        await outbox.skip(m.key for m in messages if m.channel == DM)
+        await outbox.release(m.key for m in messages)
+        return await outbox.claim('houseseats')
+
+    messages, _ = run(scenario())
+    assert all(m.channel == CHANNEL_POST for m in messages)
+
+
+def test_pushover_flag_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'outbox.sqlite3')
+
+    async def before_crash():
+        box = NotificationOutbox(path)
+        await box.enqueue('houseseats', {'s1': SHOWS['s1']}, CHANNEL_ID, [])
+        messages, _ = await box.claim('houseseats')
+        assert not messages[0].pushover_sent
+        box.mark_pushover_sent(messages[0].key)
+        await drain_writes(box)
+        # No release: the process dies mid-drain
+        box.close()
+
+    async def after_restart():
+        box = NotificationOutbox(path)
+        try:
+            return await box.claim('houseseats')
+        finally:
+            box.close()
+
+    run(before_crash())
+    messages, _ = run(after_restart())
+    assert len(messages) == 1 and messages[0].pushover_sent
+
+
+
+def test_a_show_that_comes_back_is_alerted_again(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', {'s1': SHOWS['s1']}, CHANNEL_ID, [(1, ['s1'])])
+        first, _ = await outbox.claim('houseseats')
+        for message in first:
+            outbox.mark_sent(message.key)
+        await drain_writes(outbox)
+        await outbox.release(m.key for m in first)
+
+        # Still listed: the finished rows stay and a repeat enqueue adds nothing
+        assert await outbox.prune('houseseats', ['s1']) == 0
+        assert await outbox.enqueue('houseseats', {'s1': SHOWS['s1']}, CHANNEL_ID, [(1, ['s1'])]) == 0
+        # Delisted, then listed again later
+        assert await outbox.prune('houseseats', []) == 2
+        assert await outbox.enqueue('houseseats', {'s1': SHOWS['s1']}, CHANNEL_ID, [(1, ['s1'])]) == 2
+        return await outbox.claim('houseseats')
+
+    messages, shows = run(scenario())
+    assert [(m.channel, m.show_ids) for m in messages] == [(CHANNEL_POST, ['s1']), (DM, ['s1'])]
+    assert shows['s1']['name'] == 'Show One'
+
+
+def test_prune_keeps_pending_rows_and_other_platforms(outbox):
+    async def scenario():
+        await outbox.enqueue('houseseats', SHOWS, CHANNEL_ID, [])
+        await outbox.enqueue('fillaseat', SHOWS, CHANNEL_ID, [])
+        sent, _ = await outbox.claim('fillaseat')
+        for message in sent:
+            outbox.mark_sent(message.key)
+        await drain_writes(outbox)
+        await outbox.release(m.key for m in sent)
+        pruned = await outbox.prune('houseseats', [])
+        return pruned, await outbox.claim('houseseats'), await outbox.prune('fillaseat', ['s1'], retention_days=0)
+
+    pruned, (houseseats, shows), pruned_old = run(scenario())
+    assert pruned == 0
+    assert len(houseseats) == 2 and set(shows) == {'s1', 's2'}
+    # s2 is delisted, s1 is past the retention period
+    assert pruned_old == 2
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from poll_scheduler import POLL_MAX_INTERVAL_SECONDS, POLL_MIN_INTERVAL_SECONDS, PST_TIMEZONE, PollScheduler
+
+
+async def _no_history():
+    return []
+
+
+def test_split_budget_favours_heavy_hours_within_the_bounds():
+    scheduler = PollScheduler('Test', _no_history, start_hour=6, end_hour=17, daily_budget=200)
+    weights = {hour: 1.0 for hour in range(6, 17)}
+    weights[9] = 50.0
+    polls = scheduler._split_budget(weights)
+    assert polls.keys() == weights.keys()
+    assert sum(polls.values()) <= 200 + 1e-9
+    for value in polls.values():
+        assert 3600 / POLL_MAX_INTERVAL_SECONDS - 1e-9 <= value <= 3600 / POLL_MIN_INTERVAL_SECONDS + 1e-9
+    assert max(polls, key=polls.get) == 9
+
+
+def test_split_budget_spreads_evenly_without_weights():
+    scheduler = PollScheduler('Test', _no_history, start_hour=6, end_hour=10, daily_budget=80)
+    polls = scheduler._split_budget({hour: 0.0 for hour in range(6, 10)})
+    assert polls == {hour: pytest.approx(20.0) for hour in range(6, 10)}
+
+
+def test_learn_polls_drop_hours_more_often():
+    last_week = datetime.now(PST_TIMEZONE) - timedelta(days=7)
+    drops = [last_week.replace(hour=9, minute=minute) for minute in range(0, 60, 5)]
+
+    async def load_first_seen():
+        return drops
+
+    scheduler = PollScheduler('Test', load_first_seen, start_hour=6, end_hour=17, daily_budget=200)
+    assert asyncio.run(scheduler.learn())
+    intervals = scheduler.intervals[drops[0].weekday()]
+    assert intervals[9] < intervals[14]
+    assert not scheduler.needs_relearn()
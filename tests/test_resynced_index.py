@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from blacklist_index import BlacklistIndex
+from subscriptions import SubscriberRegistry, ACTIVE, PAUSED
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_blacklist_changes_during_a_reload_are_replayed():
+    index = None
+
+    async def load_rows():
+        # A button click lands while the query is in flight
+        index.add(2, 's2')
+        index.remove(1, 's1')
+        return [{'user_id': 1, 'show_id': 's1'}, {'user_id': 1, 'show_id': 's3'}]
+
+    async def load_for_shows(show_ids):
+        raise AssertionError("the index is loaded")
+
+    index = BlacklistIndex('Test', load_rows, load_for_shows)
+    assert run(index.load()) and index.loaded
+    assert run(index.for_shows(['s1', 's2', 's3'])) == {1: {'s3'}, 2: {'s2'}}
+
+
+def test_failed_reload_keeps_the_current_registry():
+    results = [[{'user_id': 1, 'status': ACTIVE}], None]
+
+    async def load_rows():
+        return results.pop(0)
+
+    registry = SubscriberRegistry('Test', load_rows)
+    assert run(registry.load())
+    registry.set(2, ACTIVE)
+    assert not run(registry.load())
+    assert registry.active == {1, 2}
+
+
+def test_reads_go_to_the_database_before_the_first_load():
+    async def load_rows():
+        return [{'user_id': 1, 'status': ACTIVE}, {'user_id': 2, 'status': PAUSED}]
+
+    async def load_for_shows(show_ids):
+        return {7: set(show_ids)}
+
+    assert run(SubscriberRegistry('Test', load_rows).active_among([1, 2, 3])) == {1}
+    assert run(BlacklistIndex('Test', load_rows, load_for_shows).for_shows(['s1'])) == {7: {'s1'}}
+
+
+def test_fallback_read_failure_raises():
+    async def load_rows():
+        return None
+
+    with pytest.raises(Exception):
+        run(SubscriberRegistry('Test', load_rows).active_among([1]))
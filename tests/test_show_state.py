@@ -0,0 +1,73 @@
+import asyncio
+
+from show_state import ShowStateStore
+
+
+class FakeTable:
+    """Current shows table behind load/commit callables, counting reads"""
+
+    def __init__(self, shows=None):
+        self.shows = dict(shows or {})
+        self.loads = 0
+        self.fail_next_commit = False
+        self.fail_loads = False
+        self.existing_seen = []
+
+    async def load(self):
+        self.loads += 1
+        return None if self.fail_loads else dict(self.shows)
+
+    async def commit(self, scraped, existing):
+        self.existing_seen.append(existing)
+        if self.fail_next_commit:
+            self.fail_next_commit = False
+            return None
+        new_ids = sorted(scraped.keys() - self.shows.keys())
+        self.shows = dict(scraped)
+        return new_ids
+
+
+def show(name):
+    return {'name': name, 'url': f'u/{name}', 'image_url': f'i/{name}'}
+
+
+def test_commits_write_through_without_reading_back():
+    table = FakeTable({'a': show('a')})
+    state = ShowStateStore('Test', table.load, table.commit)
+    assert asyncio.run(state.warm())
+    assert asyncio.run(state.commit({'a': show('a'), 'b': show('b')})) == ['b']
+    assert asyncio.run(state.commit({'b': show('b'), 'c': show('c')})) == ['c']
+    assert table.loads == 1
+    # Each commit is diffed against the previous scrape held in memory
+    assert table.existing_seen[-1] == {'a': show('a'), 'b': show('b')}
+
+
+def test_failed_commit_resyncs_before_the_next_diff():
+    table = FakeTable({'a': show('a')})
+    state = ShowStateStore('Test', table.load, table.commit)
+    asyncio.run(state.warm())
+    table.fail_next_commit = True
+    assert asyncio.run(state.commit({'a': show('a'), 'b': show('b')})) is None
+    assert not state.is_warm
+    # Someone else wrote b in the meantime; the reload means it is not alerted again
+    table.shows['b'] = show('b')
+    assert asyncio.run(state.commit({'a': show('a'), 'b': show('b')})) == []
+    assert table.loads == 2
+
+
+def test_state_is_reloaded_once_the_resync_interval_passes():
+    table = FakeTable()
+    state = ShowStateStore('Test', table.load, table.commit, resync_minutes=0)
+    asyncio.run(state.commit({'a': show('a')}))
+    asyncio.run(state.commit({'a': show('a')}))
+    assert table.loads == 2
+
+
+def test_failed_load_leaves_the_diff_to_the_database():
+    table = FakeTable({'a': show('a')})
+    table.fail_loads = True
+    state = ShowStateStore('Test', table.load, table.commit)
+    assert asyncio.run(state.commit({'a': show('a'), 'b': show('b')})) == ['b']
+    assert table.existing_seen == [None]
+    # The committed set is known now, so the next cycle needs no read
+    assert state.is_warm and not state.needs_resync()
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from metrics import DB_CALL_ERRORS
+from supabase_client import SupabaseDB, diff_shows
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder: select() may fail, the rest chains"""
+
+    def __init__(self, rows, fail_when):
+        self.rows = rows
+        self.fail_when = fail_when
+
+    def select(self, columns):
+        if self.fail_when(columns):
+            raise RuntimeError(f"cannot select {columns}")
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def in_(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def range(self, *args):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def fake_db(tables, fail_when=lambda columns: False):
+    db = SupabaseDB.__new__(SupabaseDB)
+    db.client = SimpleNamespace(table=lambda name: FakeQuery(tables.get(name, []), fail_when))
+    return db
+
+
+def test_failed_call_returns_its_failure_value_and_is_counted():
+    db = fake_db({}, fail_when=lambda columns: True)
+    before = DB_CALL_ERRORS.value(method='get_all_subscriptions')
+    assert db.get_all_subscriptions('houseseats') is None
+    assert db.get_user_blacklists('houseseats', 1) == []
+    assert DB_CALL_ERRORS.value(method='get_all_subscriptions') == before + 1
+
+
+def test_recovered_fallback_is_not_counted():
+    db = fake_db(
+        {'houseseats_user_blacklists': [{'show_id': 's1'}], 'houseseats_all_shows': [{'name': 'Magic'}]},
+        # The embedded join is what fails
+        fail_when=lambda columns: '(' in columns
+    )
+    before = DB_CALL_ERRORS.value(method='get_user_blacklists_names')
+    assert db.get_user_blacklists_names('houseseats', 1) == ["• **`Magic`**"]
+    assert DB_CALL_ERRORS.value(method='get_user_blacklists_names') == before
+
+
+def test_diff_shows_splits_new_vanished_and_changed():
+    existing = {
+        'a': {'name': 'A', 'url': 'u/a', 'image_url': 'i/a'},
+        'b': {'name': 'B', 'url': 'u/b', 'image_url': 'i/b'},
+        'c': {'name': 'C', 'url': 'u/c', 'image_url': 'i/c'},
+    }
+    scraped = {
+        'b': {'name': 'B', 'url': 'u/b', 'image_url': 'i/b2'},
+        # Fields outside SHOW_FIELDS do not make a show changed
+        'c': {'name': 'C', 'url': 'u/c', 'image_url': 'i/c', 'extra': 1},
+        'd': {'name': 'D', 'url': 'u/d', 'image_url': 'i/d'},
+    }
+    assert diff_shows(scraped, existing) == ({'d'}, {'a'}, {'b'})
+    assert diff_shows(existing, existing) == (set(), set(), set())
@@ -0,0 +1,188 @@
+import re
+import time
+import random
+import asyncio
+
+import pytest
+
+from watch_rules import (
+    AhoCorasick, WatchRuleIndex, WatchRuleMatcher, WatchVerdict, validate_pattern,
+    INCLUDE, EXCLUDE, KEYWORD, REGEX
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def naive_match(rules, name):
+    """Every rule tried one by one, as the matcher must agree with"""
+    included, excluded = set(), set()
+    for user_id, kind, pattern_type, pattern in rules:
+        if pattern_type == REGEX:
+            hit = re.search(pattern, name, re.IGNORECASE) is not None
+        else:
+            hit = pattern.casefold() in name.casefold()
+        if hit:
+            (included if kind == INCLUDE else excluded).add(user_id)
+    return included, excluded
+
+
+def test_aho_corasick_finds_overlapping_keywords():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers', 'x'])
+    assert automaton.find('ushers') == {'he', 'she', 'hers'}
+    assert automaton.find('this') == {'his'}
+    assert automaton.find('') == set()
+
+
+def test_aho_corasick_agrees_with_substring_search():
+    rng = random.Random(3)
+    for _ in range(200):
+        keywords = {''.join(rng.choice('ab') for _ in range(rng.randint(1, 4))) for _ in range(6)}
+        text = ''.join(rng.choice('ab') for _ in range(rng.randint(0, 12)))
+        assert AhoCorasick(keywords).find(text) == {keyword for keyword in keywords if keyword in text}
+
+
+def test_backreferences_keep_their_meaning():
+    matcher = WatchRuleMatcher([
+        (1, INCLUDE, REGEX, '(jazz) night'),
+        (3, INCLUDE, REGEX, r'(\w)\1'),
+    ])
+    assert matcher.match("Hello") == ({3}, set())
+    assert matcher.match("Jazz Night") == ({1, 3}, set())
+    assert matcher.match("Blue Man") == (set(), set())
+
+
+def test_keywords_and_regexes_are_shared_across_users():
+    rules = [
+        (1, INCLUDE, KEYWORD, 'Magic'),
+        (2, INCLUDE, KEYWORD, 'magic'),
+        (2, EXCLUDE, REGEX, r'\bkids?\b'),
+        (3, EXCLUDE, REGEX, r'\bkids?\b'),
+        (4, INCLUDE, REGEX, r'comedy|improv\b'),
+    ]
+    matcher = WatchRuleMatcher(rules)
+    assert matcher.include_users == {1, 2, 4}
+    for name in ("MAGIC for Kids", "Improv Night", "Kidney Comedy", "Nothing"):
+        assert matcher.match(name) == naive_match(rules, name)
+
+
+def test_regex_triggers_cover_unicode_case_folding():
+    # re.IGNORECASE lets i, k and s match characters outside ASCII
+    rules = [(1, INCLUDE, REGEX, 'pink'), (2, INCLUDE, REGEX, 'kiss'), (3, INCLUDE, REGEX, 'ßa')]
+    matcher = WatchRuleMatcher(rules)
+    for name in ("PİNK", "pınk", "Kıſſ", "ẞA", "STRASSE"):
+        assert matcher.match(name) == naive_match(rules, name)
+
+
+def test_matcher_agrees_with_trying_every_rule():
+    rng = random.Random(7)
+    atoms = ['a', 'b', 'i', 'k', 's', 'ß', ' ', r'\w', '.', '[ab]', 'x?', r'\b', '(a|b)', '(?:ab|k)', r'(s)\1', '(?-i:A)']
+    alphabet = 'abABiIİıkKKsSſßẞx '
+    for _ in range(300):
+        rules = []
+        for user_id in range(6):
+            if rng.random() < 0.3:
+                rules.append((user_id, rng.choice([INCLUDE, EXCLUDE]), KEYWORD, rng.choice(['ab', 'K', 'ss', 'i'])))
+            else:
+                pattern = ''.join(rng.choice(atoms) for _ in range(rng.randint(1, 4)))
+                rules.append((user_id, rng.choice([INCLUDE, EXCLUDE]), REGEX, pattern))
+        matcher = WatchRuleMatcher(rules)
+        for _ in range(10):
+            name = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+            assert matcher.match(name) == naive_match(rules, name), (rules, name)
+
+
+def test_invalid_regexes_are_skipped():
+    matcher = WatchRuleMatcher([(1, INCLUDE, REGEX, '(unclosed'), (2, INCLUDE, REGEX, r'(?<=a+)b')])
+    assert matcher.match("ab (unclosed") == (set(), set())
+
+
+def test_verdict_applies_includes_and_excludes():
+    verdict = WatchVerdict({1, 2}, {'s1': ({1}, {2}), 's2': (set(), {3})})
+    assert verdict.allows(1, 's1') and not verdict.allows(1, 's2')
+    assert not verdict.allows(2, 's1')
+    assert not verdict.allows(3, 's2') and verdict.allows(3, 's1')
+    # No rules at all: every show
+    assert verdict.allows(4, 's1') and verdict.allows(4, 'unknown')
+
+
+@pytest.mark.parametrize('pattern', [
+    r'(a+)+', r'((a+))+', r'(a|a)*b', r'(a|aa)*b', r'(a?)*b', r'(?:a|b|ab)*c', r'(.*a){20}', r'(\w+\s)+x',
+])
+def test_validate_pattern_rejects_exponential_backtracking(pattern):
+    assert validate_pattern(REGEX, pattern) is not None
+    # The check must not have to run the regex to find out
+    start = time.perf_counter()
+    validate_pattern(REGEX, pattern)
+    assert time.perf_counter() - start < 0.1
+
+
+@pytest.mark.parametrize('pattern', [
+    r'comedy|improv\b', r'(jazz|blues)+ night', r'(\w|\d)*', r'(\d{2}){3}', r'\bmagic\b', r'(jazz) night (\w)\1',
+])
+def test_validate_pattern_accepts_ordinary_regexes(pattern):
+    assert validate_pattern(REGEX, pattern) is None
+
+
+def test_validate_pattern_checks_basics():
+    assert validate_pattern(KEYWORD, '   ') is not None
+    assert validate_pattern(KEYWORD, 'x' * 101) is not None
+    assert validate_pattern(REGEX, '(unclosed') is not None
+    assert validate_pattern(KEYWORD, '(unclosed') is None
+
+
+def test_evaluate_reads_the_database_before_the_first_load():
+    rows = [
+        {'user_id': 1, 'kind': INCLUDE, 'pattern_type': KEYWORD, 'pattern': 'magic'},
+        {'user_id': 2, 'kind': EXCLUDE, 'pattern_type': REGEX, 'pattern': r'\bkids\b'},
+    ]
+    calls = []
+
+    async def load_rows():
+        calls.append(None)
+        return rows
+
+    index = WatchRuleIndex('Test', load_rows)
+    shows = {'s1': {'name': 'Magic for Kids'}, 's2': {'name': 'Comedy'}}
+    verdict = run(index.evaluate(shows))
+    assert not index.loaded and len(calls) == 1
+    assert verdict.allows(1, 's1') and not verdict.allows(1, 's2')
+    assert not verdict.allows(2, 's1') and verdict.allows(2, 's2')
+
+
+def test_evaluate_raises_when_the_fallback_read_fails():
+    async def load_rows():
+        return None
+
+    with pytest.raises(Exception):
+        run(WatchRuleIndex('Test', load_rows).evaluate({'s1': {'name': 'Magic'}}))
+
+
+def test_changes_during_a_reload_are_replayed():
+    index = None
+
+    async def load_rows():
+        # A watch command lands while the query is in flight
+        index.add(2, INCLUDE, KEYWORD, 'jazz')
+        return [{'user_id': 1, 'kind': INCLUDE, 'pattern_type': KEYWORD, 'pattern': 'magic'}]
+
+    index = WatchRuleIndex('Test', load_rows)
+    assert run(index.load())
+    assert index.rules_for(1) == [(INCLUDE, KEYWORD, 'magic')]
+    assert index.rules_for(2) == [(INCLUDE, KEYWORD, 'jazz')]
+    index.remove(2, INCLUDE, KEYWORD, 'jazz')
+    assert index.rules_for(2) == []
+    assert run(index.evaluate({'s1': {'name': 'Jazz'}})).allows(2, 's1')
+
+
+def test_regexes_the_parser_cannot_handle_run_unfiltered(monkeypatch):
+    import watch_rules
+    monkeypatch.setattr(watch_rules, '_parse', lambda pattern, flags=0: None)
+    rules = [(1, INCLUDE, REGEX, r'\bmagic\b'), (2, EXCLUDE, REGEX, 'kids?'), (3, INCLUDE, KEYWORD, 'jazz')]
+    matcher = WatchRuleMatcher(rules)
+    for name in ("Magic for Kids", "Jazz Night", "Nothing"):
+        assert matcher.match(name) == naive_match(rules, name)
+    # Without a parse tree the backtracking check cannot run, so only re.compile decides
+    assert validate_pattern(REGEX, r'(a+)+') is None
+    assert validate_pattern(REGEX, '(unclosed') is not None
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# One JSON line per detected show, on the data volume when it exists (Docker), else locally
+if os.path.exists("/app/data"):
+    DROP_TRACE_PATH = os.environ.get('DROP_TRACE_PATH', '/app/data/drop_traces.jsonl')
+else:
+    DROP_TRACE_PATH = os.environ.get('DROP_TRACE_PATH', 'drop_traces.jsonl')
+
+# Order of the pipeline stages; each is measured from the start of the listing request
+STAGES = ('polled', 'fetched', 'parsed', 'committed', 'channel_posted', 'pushover_sent', 'dm_first', 'dm_last')
+
+ALERT_LATENCY = registry.histogram(
+    'ticketgenie_alert_latency_seconds',
+    'Seconds from requesting the listing that contained a new show to each pipeline stage',
+    ('platform', 'stage'),
+    buckets=(0.5, 1, 2, 5, 10, 15, 30, 60, 90, 120, 180, 300, 600)
+)
+
+_write_lock = threading.Lock()
+
+
+def _append(path: str, line: str):
+    with _write_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def _log_write_error(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Failed to write drop trace to {DROP_TRACE_PATH}: {future.exception()}")
+
+
+class DropTrace:
+    """Wall-clock timestamps of one new show on its way from the listing to users.
+
+    Parts of the notify pipeline that finish independently (the fan-out and
+    the Pushover worker) hold() the trace and release() it when done; the
+    trace is written out once the last holder lets go.
+    """
+
+    def __init__(self, platform: str, show_id: str, name: str, cycle_marks: Dict[str, float]):
+        self.platform = platform
+        self.show_id = show_id
+        self.name = name
+        self.marks: Dict[str, float] = dict(cycle_marks)
+        self.dms = 0
+        self._holders: List[str] = []
+        self._finished = False
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        """Record a stage the first time it is reached"""
+        if stage not in self.marks:
+            self.marks[stage] = at if at is not None else time.time()
+
+    def dm_delivered(self, at: Optional[float] = None):
+        at = at if at is not None else time.time()
+        self.mark('dm_first', at)
+        self.marks['dm_last'] = at
+        self.dms += 1
+        polled = self.marks.get('polled')
+        if polled is not None:
+            ALERT_LATENCY.observe(at - polled, platform=self.platform, stage='dm')
+
+    def hold(self, holder: str):
+        self._holders.append(holder)
+
+    def release(self, holder: str):
+        if holder in self._holders:
+            self._holders.remove(holder)
+        if not self._holders:
+            self.finish()
+
+    def latencies(self) -> Dict[str, float]:
+        polled = self.marks.get('polled')
+        if polled is None:
+            return {}
+        return {stage: round(self.marks[stage] - polled, 3) for stage in STAGES[1:] if stage in self.marks}
+
+    def finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        latencies = self.latencies()
+        for stage, seconds in latencies.items():
+            # Per-DM latencies were observed as they happened
+            if stage not in ('dm_first', 'dm_last'):
+                ALERT_LATENCY.observe(seconds, platform=self.platform, stage=stage)
+        record = {
+            'platform': self.platform,
+            'show_id': self.show_id,
+            'name': self.name,
+            'marks': {stage: round(self.marks[stage], 3) for stage in STAGES if stage in self.marks},
+            'latency': latencies,
+            'dms': self.dms,
+        }
+        logger.info(f"{self.platform} drop trace for {self.show_id}: {latencies}")
+        try:
+            line = json.dumps(record, ensure_ascii=False)
+            future = asyncio.get_running_loop().run_in_executor(None, _append, DROP_TRACE_PATH, line)
+            future.add_done_callback(_log_write_error)
+        except Exception as e:
+            logger.error(f"Failed to write {self.platform} drop trace: {e}")
@@ -0,0 +1,378 @@
+import os
+import re
+import sys
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from resynced_index import ResyncedIndex
+
+logger = logging.getLogger(__name__)
+
+# How often each rule index is reloaded from the database
+WATCH_RULES_RESYNC_MINUTES = float(os.environ.get('WATCH_RULES_RESYNC_MINUTES', '15'))
+# Limits on what one user can register
+WATCH_RULES_PER_USER = int(os.environ.get('WATCH_RULES_PER_USER', '50'))
+WATCH_PATTERN_MAX_LENGTH = 100
+
+INCLUDE = 'include'
+EXCLUDE = 'exclude'
+KEYWORD = 'keyword'
+REGEX = 'regex'
+
+# Parse tree opcodes, matched by name so nothing else depends on the parser's private constants
+AT, ATOMIC_GROUP, BRANCH, IN, LITERAL, SUBPATTERN = 'AT', 'ATOMIC_GROUP', 'BRANCH', 'IN', 'LITERAL', 'SUBPATTERN'
+_REPEATS = ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+
+
+def _parse(pattern: str, flags: int = 0):
+    """The parse tree of a pattern, or None if it cannot be had"""
+    # The re module has no public API for the parse tree the backtracking check and the
+    # literal prefilter walk, so this reaches into its private parser, which has moved before.
+    # A pattern it fails on is simply not analysed: it gets no prefilter and no backtracking check.
+    try:
+        if sys.version_info >= (3, 11):
+            from re import _parser as sre_parse
+        else:
+            import sre_parse
+        return sre_parse.parse(pattern, flags)
+    except Exception as e:
+        logger.debug(f"Could not parse regex {pattern!r}: {e}")
+        return None
+
+
+def _unbounded(high) -> bool:
+    # The parser's MAXREPEAT marks a repetition without an upper bound
+    return str(high) == 'MAXREPEAT'
+
+
+def _first_chars(items) -> Optional[Set[str]]:
+    """Lowercased characters a match of the items can start with, or None if unknown"""
+    for op, av in items:
+        op = str(op)
+        if op == LITERAL:
+            return {chr(av).lower()}
+        if op == IN and all(str(item_op) == LITERAL for item_op, _ in av):
+            return {chr(item_av).lower() for _, item_av in av}
+        if op == SUBPATTERN:
+            return _first_chars(av[-1])
+        if op == ATOMIC_GROUP:
+            return _first_chars(av)
+        if op == BRANCH:
+            branches = [_first_chars(branch) for branch in av[1]]
+            return None if None in branches else set().union(*branches)
+        if op in _REPEATS and av[0] >= 1:
+            return _first_chars(av[2])
+        if op == AT:
+            # Zero-width, the next item decides
+            continue
+        return None
+    return None
+
+
+def _backtracks(items, repeat: Optional[int] = None) -> bool:
+    """Whether items can backtrack exponentially; repeat is the max of the enclosing repetition"""
+    for op, av in items:
+        op = str(op)
+        if op in _REPEATS:
+            low, high, body = av
+            if _unbounded(repeat) and (low, high) != (1, 1):
+                # (a+)+, (a?)*: a run of a's splits across the two repetitions in many ways
+                return True
+            if repeat is not None and repeat > 1 and _unbounded(high):
+                return True
+            if _backtracks(body, high if repeat is None or _unbounded(high) else max(repeat, high)):
+                return True
+        elif op == BRANCH:
+            branches = av[1]
+            if _unbounded(repeat):
+                # (a|a)*, (a|aa)*: alternatives that can start alike give every run many parses
+                seen: Set[str] = set()
+                for branch in branches:
+                    chars = _first_chars(branch)
+                    if not chars or chars & seen:
+                        return True
+                    seen |= chars
+            if any(_backtracks(branch, repeat) for branch in branches):
+                return True
+        elif op == SUBPATTERN:
+            if _backtracks(av[-1], repeat):
+                return True
+        elif op == ATOMIC_GROUP:
+            if _backtracks(av, repeat):
+                return True
+    return False
+
+
+def validate_pattern(pattern_type: str, pattern: str) -> Optional[str]:
+    """Return why a rule pattern cannot be used, or None if it is fine"""
+    if not pattern.strip():
+        return "The pattern is empty."
+    if len(pattern) > WATCH_PATTERN_MAX_LENGTH:
+        return f"Patterns are limited to {WATCH_PATTERN_MAX_LENGTH} characters."
+    if pattern_type == REGEX:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return f"That is not a valid regular expression ({e})."
+        parsed = _parse(pattern)
+        if parsed is not None and _backtracks(parsed):
+            return "Repetition that can match the same text in several ways, such as `(a+)+` or `(a|aa)*`, is not allowed."
+    return None
+
+
+def _literal_char(code: int) -> Optional[str]:
+    # Under IGNORECASE 'i' also matches dotless i and dotted capital I, which casefold to something else;
+    # every other ASCII character only matches characters that casefold to it
+    char = chr(code).casefold()
+    return char if code < 128 and char != 'i' else None
+
+
+def _required_literals(items) -> List[FrozenSet[str]]:
+    """Sets of casefolded strings such that the casefolded text of any match contains one string from each"""
+    required: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in list(items) + [(None, None)]:
+        op = str(op)
+        char = _literal_char(av) if op == LITERAL else None
+        if char is not None:
+            run.append(char)
+            continue
+        if run:
+            required.append(frozenset({''.join(run)}))
+            run = []
+        if op == SUBPATTERN:
+            required += _required_literals(av[-1])
+        elif op == ATOMIC_GROUP:
+            required += _required_literals(av)
+        elif op in _REPEATS and av[0] >= 1:
+            required += _required_literals(av[2])
+        elif op == BRANCH:
+            # One alternative has to match, so its most selective set stands in for it
+            branches = [_required_literals(branch) for branch in av[1]]
+            if all(branches):
+                required.append(frozenset().union(*(
+                    max(sets, key=lambda strings: (min(map(len, strings)), -len(strings))) for sets in branches
+                )))
+    return list(dict.fromkeys(required))
+
+
+class AhoCorasick:
+    """Finds every keyword occurring in a text in a single pass over the text"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # Trie as parallel lists: child edges, failure link and the keywords ending at each node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str):
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = next_node
+        self._out[node] += (keyword,)
+
+    def _link(self):
+        # Breadth-first, so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        found = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class WatchRuleMatcher:
+    """Every user's include/exclude rules for one platform, compiled for one-pass matching.
+
+    Keywords (case-insensitive substrings) share one Aho-Corasick automaton
+    with the literal text every match of a regex must contain, so a single
+    scan of the show name finds the matching keywords and the few regexes
+    that can match at all. Only those are compiled and run, each on its own
+    so groups and backreferences keep their meaning; regexes without such
+    text are always run. Patterns are deduplicated across users.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[int, str, str, str]]):
+        # (kind, pattern) -> users, separately for keywords and regexes
+        keyword_users: Dict[Tuple[str, str], Set[int]] = {}
+        regex_users: Dict[Tuple[str, str], Set[int]] = {}
+        self.include_users: Set[int] = set()
+        for user_id, kind, pattern_type, pattern in rules:
+            if kind == INCLUDE:
+                self.include_users.add(user_id)
+            if pattern_type == REGEX:
+                regex_users.setdefault((kind, pattern), set()).add(user_id)
+            else:
+                keyword_users.setdefault((kind, pattern.casefold()), set()).add(user_id)
+        self._keyword_users = keyword_users
+
+        # (pattern, kind, users); each regex is compiled the first time its trigger text shows up
+        self._regexes: List[Tuple[str, str, Set[int]]] = []
+        self._compiled: Dict[int, Optional[re.Pattern]] = {}
+        # Literal text -> (index into _regexes, which of its required sets the text is in);
+        # a regex is run once the name contains text from every one of its sets
+        self._triggers: Dict[str, List[Tuple[int, int]]] = {}
+        self._required_sets: List[int] = []
+        self._untriggered: List[int] = []
+        for (kind, pattern), users in regex_users.items():
+            # Unparsed patterns (including invalid ones, skipped when first compiled) are always run
+            parsed = _parse(pattern, re.IGNORECASE)
+            required = _required_literals(parsed) if parsed is not None else []
+            index = len(self._regexes)
+            self._regexes.append((pattern, kind, users))
+            self._required_sets.append(len(required))
+            if not required:
+                self._untriggered.append(index)
+            for set_index, literals in enumerate(required):
+                for literal in literals:
+                    self._triggers.setdefault(literal, []).append((index, set_index))
+
+        self._automaton = AhoCorasick({keyword for _, keyword in keyword_users} | self._triggers.keys())
+
+    def match(self, name: str) -> Tuple[Set[int], Set[int]]:
+        """Users whose include rules and whose exclude rules match the show name"""
+        included: Set[int] = set()
+        excluded: Set[int] = set()
+        # Regex index -> which of its required sets the name has text from
+        satisfied: Dict[int, Set[int]] = {}
+        for found in self._automaton.find(name.casefold()):
+            for kind in (INCLUDE, EXCLUDE):
+                users = self._keyword_users.get((kind, found))
+                if users:
+                    (included if kind == INCLUDE else excluded).update(users)
+            for index, set_index in self._triggers.get(found, ()):
+                satisfied.setdefault(index, set()).add(set_index)
+        candidates = self._untriggered + [
+            index for index, sets in satisfied.items() if len(sets) == self._required_sets[index]
+        ]
+        for index in candidates:
+            regex = self._regex(index)
+            if regex is not None and regex.search(name):
+                _, kind, users = self._regexes[index]
+                (included if kind == INCLUDE else excluded).update(users)
+        return included, excluded
+
+    def _regex(self, index: int) -> Optional[re.Pattern]:
+        if index not in self._compiled:
+            pattern = self._regexes[index][0]
+            try:
+                self._compiled[index] = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"Skipping invalid watch regex {pattern!r}: {e}")
+                self._compiled[index] = None
+        return self._compiled[index]
+
+
+class WatchVerdict:
+    """Which users want which of a drop's shows according to their watch rules"""
+
+    def __init__(self, include_users: Set[int], matches: Dict[str, Tuple[Set[int], Set[int]]]):
+        self.include_users = include_users
+        self.matches = matches
+
+    def allows(self, user_id: int, show_id: str) -> bool:
+        included, excluded = self.matches.get(show_id, ((), ()))
+        if user_id in excluded:
+            return False
+        # Users without include rules get every show that is not excluded
+        return user_id not in self.include_users or user_id in included
+
+
+class WatchRuleIndex(ResyncedIndex):
+    """In-memory watch rules for one platform, loaded from *_user_watch_rules.
+
+    The watch commands update it alongside their database writes; the matcher
+    is rebuilt on the first drop after any change.
+    """
+
+    noun = 'watch rules'
+
+    def __init__(
+        self,
+        label: str,
+        load_rows: Callable[[], Awaitable[Optional[List[Dict]]]],
+        resync_minutes: float = WATCH_RULES_RESYNC_MINUTES
+    ):
+        super().__init__(label, load_rows, resync_minutes)
+
+    def _rebuild(self, rows: List[Dict]):
+        # user ID -> {(kind, pattern_type, pattern)}
+        self.by_user: Dict[int, Set[Tuple[str, str, str]]] = {}
+        for row in rows:
+            self.by_user.setdefault(row['user_id'], set()).add((row['kind'], row['pattern_type'], row['pattern']))
+        self._matcher: Optional[WatchRuleMatcher] = None
+
+    def _describe(self) -> str:
+        return f" for {len(self.by_user)} users"
+
+    def rules_for(self, user_id: int) -> List[Tuple[str, str, str]]:
+        return sorted(self.by_user.get(user_id, ()))
+
+    def add(self, user_id: int, kind: str, pattern_type: str, pattern: str):
+        self._change(self._add, user_id, (kind, pattern_type, pattern))
+
+    def remove(self, user_id: int, kind: str, pattern_type: str, pattern: str):
+        self._change(self._remove, user_id, (kind, pattern_type, pattern))
+
+    def _add(self, user_id: int, rule: Tuple[str, str, str]):
+        self.by_user.setdefault(user_id, set()).add(rule)
+        self._matcher = None
+
+    def _remove(self, user_id: int, rule: Tuple[str, str, str]):
+        rules = self.by_user.get(user_id)
+        if rules is not None:
+            rules.discard(rule)
+            if not rules:
+                del self.by_user[user_id]
+        self._matcher = None
+
+    @property
+    def matcher(self) -> WatchRuleMatcher:
+        if self._matcher is None:
+            self._matcher = WatchRuleMatcher(
+                (user_id, kind, pattern_type, pattern)
+                for user_id, rules in self.by_user.items()
+                for kind, pattern_type, pattern in rules
+            )
+        return self._matcher
+
+    async def evaluate(self, shows: Dict[str, Dict]) -> WatchVerdict:
+        """Match every show name once against all users' rules"""
+        if self.loaded:
+            matcher = self.matcher
+        else:
+            matcher = WatchRuleMatcher(
+                (row['user_id'], row['kind'], row['pattern_type'], row['pattern']) for row in await self._read_through()
+            )
+        return WatchVerdict(
+            matcher.include_users,
+            {show_id: matcher.match(show_info['name']) for show_id, show_info in shows.items()}
+        )